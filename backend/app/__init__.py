@@ -1,6 +1,7 @@
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from models.user import db
 from routes.auth import bp as auth_bp
 from routes.api_keys import bp as api_keys_bp
@@ -8,7 +9,29 @@ from routes.indoor_plants import indoor_plants_bp
 from routes.user_plants import user_plants_bp
 from routes.growth_journal import growth_journal_bp
 from routes.notifications import notifications_bp
+from services.token_cache import token_cache
+from services.identity_cache import identity_cache
+from services.credential_cache import credential_cache
+from services.revocation_store import revocation_store
+from services.password_hasher import password_hasher, calibrate_iterations
+from services.rate_limiter import rate_limiter
+from services.logging_config import configure_logging
+from services.metrics import render_prometheus, scrape_allowed
+from services.keyring import keyring, parse_keys
+from services.key_rotation import reencryption_job
+from services.usage_recorder import usage_recorder
+from services.weather_cache import weather_cache
+from services.http_client import weather_http
+from services.weather_prefetch import weather_prefetcher
+from services.weather_batch import weather_batch
+from services.weather_providers import OPENWEATHERMAP_URL, weather_observations, weather_providers
+from services.key_probe import key_prober, parse_service_map
+from services.catalog_search import catalog_search
+from services.catalog_pagination import catalog_pagination
+from services.species_cache import species_cache
 import os
+import tempfile
+from datetime import datetime
 
 # Import models to ensure they are registered with SQLAlchemy
 from models.user import User
@@ -17,6 +40,10 @@ from models.user_plant import UserPlant
 from models.watering_history import WateringHistory
 from models.growth_entry import GrowthEntry
 from models.notification import Notification, NotificationPreferences, NotificationTemplate, NotificationDeliveryLog
+from models.revoked_token import RevokedToken
+from models.weather_observation import WeatherObservation
+from models.catalog_version import CatalogVersion
+from app.cli import register_cli
 
 def create_app():
     app = Flask(__name__)
@@ -28,13 +55,174 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = db_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
+    # Nombre maximal de tokens JWT vérifiés conservés en mémoire (0 pour désactiver)
+    app.config['TOKEN_CACHE_SIZE'] = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+    # Cache des utilisateurs authentifiés : durée de vie (secondes) et taille maximale
+    app.config['IDENTITY_CACHE_TTL'] = float(os.environ.get('IDENTITY_CACHE_TTL', 30))
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.environ.get('IDENTITY_CACHE_SIZE', 10000))
+    # Cache mémoire des clés API déchiffrées pour les appels sortants : durée de vie (secondes) et taille
+    app.config['CREDENTIAL_CACHE_TTL'] = float(os.environ.get('CREDENTIAL_CACHE_TTL', 60))
+    app.config['CREDENTIAL_CACHE_SIZE'] = int(os.environ.get('CREDENTIAL_CACHE_SIZE', 10000))
+    # Cache météo partagé par cellule geohash : fraîcheur, fenêtre de service périmé (secondes), taille, précision
+    app.config['WEATHER_CACHE_TTL'] = float(os.environ.get('WEATHER_CACHE_TTL', 600))
+    app.config['WEATHER_CACHE_STALE_TTL'] = float(os.environ.get('WEATHER_CACHE_STALE_TTL', 3600))
+    app.config['WEATHER_CACHE_SIZE'] = int(os.environ.get('WEATHER_CACHE_SIZE', 10000))
+    app.config['WEATHER_CELL_PRECISION'] = int(os.environ.get('WEATHER_CELL_PRECISION', 5))
+    # Client HTTP météo : pool, délai (secondes), nouvelles tentatives et délai de base, disjoncteur
+    app.config['WEATHER_HTTP_POOL_SIZE'] = int(os.environ.get('WEATHER_HTTP_POOL_SIZE', 10))
+    app.config['WEATHER_HTTP_TIMEOUT'] = float(os.environ.get('WEATHER_HTTP_TIMEOUT', 5))
+    app.config['WEATHER_HTTP_RETRIES'] = int(os.environ.get('WEATHER_HTTP_RETRIES', 2))
+    app.config['WEATHER_HTTP_BACKOFF'] = float(os.environ.get('WEATHER_HTTP_BACKOFF', 0.2))
+    app.config['WEATHER_BREAKER_THRESHOLD'] = int(os.environ.get('WEATHER_BREAKER_THRESHOLD', 5))
+    app.config['WEATHER_BREAKER_RESET'] = float(os.environ.get('WEATHER_BREAKER_RESET', 30))
+    # Préchauffage météo avant chaque vague de notifications : appels simultanés, avance (minutes)
+    app.config['WEATHER_PREFETCH_WORKERS'] = int(os.environ.get('WEATHER_PREFETCH_WORKERS', 4))
+    app.config['WEATHER_PREFETCH_LEAD'] = float(os.environ.get('WEATHER_PREFETCH_LEAD', 15))
+    # Fournisseur météo (openweathermap, replay), enregistrement des observations et mode dégradé
+    app.config['WEATHER_PROVIDER'] = os.environ.get('WEATHER_PROVIDER', 'openweathermap')
+    app.config['WEATHER_API_URL'] = os.environ.get('WEATHER_API_URL', OPENWEATHERMAP_URL)
+    replay_at = os.environ.get('WEATHER_REPLAY_AT')
+    app.config['WEATHER_REPLAY_AT'] = datetime.fromisoformat(replay_at) if replay_at else None
+    app.config['WEATHER_RECORD_OBSERVATIONS'] = os.environ.get('WEATHER_RECORD_OBSERVATIONS', 'true').lower() == 'true'
+    app.config['WEATHER_DEGRADED_MAX_AGE'] = float(os.environ.get('WEATHER_DEGRADED_MAX_AGE', 21600))
+    app.config['WEATHER_OBSERVATION_RETENTION_DAYS'] = int(os.environ.get('WEATHER_OBSERVATION_RETENTION_DAYS', 30))
+    # Récupération météo groupée : appels simultanés, délai par cellule (secondes), quota du fournisseur (appels/minute, 0 = illimité)
+    app.config['WEATHER_BATCH_CONCURRENCY'] = int(os.environ.get('WEATHER_BATCH_CONCURRENCY', 16))
+    app.config['WEATHER_BATCH_TIMEOUT'] = float(os.environ.get('WEATHER_BATCH_TIMEOUT', 10))
+    app.config['WEATHER_QUOTA_PER_MINUTE'] = float(os.environ.get('WEATHER_QUOTA_PER_MINUTE', 600))
+    # Catalogue des plantes : taille de page par défaut et maximale, durée de cache des totaux (secondes)
+    app.config['INDOOR_PLANTS_PAGE_SIZE'] = int(os.environ.get('INDOOR_PLANTS_PAGE_SIZE', 50))
+    app.config['INDOOR_PLANTS_MAX_PAGE_SIZE'] = int(os.environ.get('INDOOR_PLANTS_MAX_PAGE_SIZE', 200))
+    app.config['INDOOR_PLANTS_COUNT_TTL'] = float(os.environ.get('INDOOR_PLANTS_COUNT_TTL', 60))
+    # Cache des espèces : taille, durée de vie (secondes), intervalle de relecture de la version du catalogue (secondes)
+    app.config['SPECIES_CACHE_SIZE'] = int(os.environ.get('SPECIES_CACHE_SIZE', 20000))
+    app.config['SPECIES_CACHE_TTL'] = float(os.environ.get('SPECIES_CACHE_TTL', 3600))
+    app.config['CATALOG_VERSION_INTERVAL'] = float(os.environ.get('CATALOG_VERSION_INTERVAL', 1))
+    # Import HTTP du catalogue : taille maximale du corps (octets) et nombre maximal d'enregistrements
+    app.config['CATALOG_IMPORT_MAX_BYTES'] = int(os.environ.get('CATALOG_IMPORT_MAX_BYTES', 32 * 1024 * 1024))
+    app.config['CATALOG_IMPORT_MAX_ROWS'] = int(os.environ.get('CATALOG_IMPORT_MAX_ROWS', 50000))
+    # Écriture différée de api_keys.last_used : intervalle de vidage du tampon (secondes, 0 = immédiat)
+    app.config['API_KEY_USAGE_FLUSH_INTERVAL'] = float(os.environ.get('API_KEY_USAGE_FLUSH_INTERVAL', 5))
+    # Sondes des clés API : threads, délai par défaut et échéance globale (secondes), surcharges par service
+    app.config['KEY_PROBE_WORKERS'] = int(os.environ.get('KEY_PROBE_WORKERS', 8))
+    app.config['KEY_PROBE_TIMEOUT'] = float(os.environ.get('KEY_PROBE_TIMEOUT', 5))
+    app.config['KEY_PROBE_DEADLINE'] = float(os.environ.get('KEY_PROBE_DEADLINE', 8))
+    app.config['KEY_PROBE_URLS'] = parse_service_map(os.environ.get('KEY_PROBE_URLS'))
+    app.config['KEY_PROBE_TIMEOUTS'] = {
+        service: float(timeout) for service, timeout in parse_service_map(os.environ.get('KEY_PROBE_TIMEOUTS')).items()
+    }
+    # Révocations partagées : resynchronisation du filtre de Bloom et purge des lignes expirées (secondes)
+    app.config['REVOCATION_SYNC_INTERVAL'] = float(os.environ.get('REVOCATION_SYNC_INTERVAL', 5))
+    app.config['REVOCATION_PURGE_INTERVAL'] = float(os.environ.get('REVOCATION_PURGE_INTERVAL', 3600))
+    app.config['REVOCATION_BLOOM_CAPACITY'] = int(os.environ.get('REVOCATION_BLOOM_CAPACITY', 100000))
+    # Pool de hachage des mots de passe : threads, file d'attente maximale, délais (secondes)
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    app.config['PASSWORD_HASH_RETRY_AFTER'] = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1))
+    # Coût cible d'un hachage (ms) pour calibrer les itérations pbkdf2, avec un plancher de sécurité
+    app.config['PASSWORD_HASH_BUDGET_MS'] = float(os.environ.get('PASSWORD_HASH_BUDGET_MS', 250))
+    app.config['PASSWORD_HASH_MIN_ITERATIONS'] = int(os.environ.get('PASSWORD_HASH_MIN_ITERATIONS', 310000))
+    # Limitation de débit : seaux partagés entre workers via un fichier SQLite local ('memory' pour un seul processus)
+    app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATELIMIT_STORAGE'] = os.environ.get(
+        'RATELIMIT_STORAGE', os.path.join(tempfile.gettempdir(), 'bloomzy-ratelimit.db'))
+    app.config['RATELIMIT_CAPACITY'] = float(os.environ.get('RATELIMIT_CAPACITY', 60))
+    app.config['RATELIMIT_REFILL_RATE'] = float(os.environ.get('RATELIMIT_REFILL_RATE', 1))
+    app.config['RATELIMIT_MEMORY_MAX_BUCKETS'] = int(os.environ.get('RATELIMIT_MEMORY_MAX_BUCKETS', 10000))
+    # Reverse proxies devant l'application : l'adresse du client est lue dans X-Forwarded-For (0 = aucun)
+    app.config['TRUSTED_PROXY_COUNT'] = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+    # Exposition /metrics : désactivable ; jeton porteur exigé s'il est défini, sinon requêtes locales seulement
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN') or None
+    # Journalisation JSON asynchrone : niveau, échantillonnage des logs INFO à fort volume, taille de la file
+    app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    app.config['LOG_SAMPLE_RATE'] = float(os.environ.get('LOG_SAMPLE_RATE', 0.1))
+    app.config['LOG_SAMPLED_LOGGERS'] = os.environ.get(
+        'LOG_SAMPLED_LOGGERS', 'werkzeug,services.notification_service').split(',')
+    app.config['LOG_QUEUE_SIZE'] = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    # Dump des en-têtes et corps de requête (débogage uniquement), vérifié à chaque requête
+    app.config['LOG_REQUEST_BODIES'] = os.environ.get('LOG_REQUEST_BODIES', 'false').lower() == 'true'
+    # Clés Fernet des clés API : la première chiffre, les suivantes servent pendant une rotation
+    app.config['ENCRYPTION_KEYS'] = parse_keys(os.environ.get('ENCRYPTION_KEY'))
+    # Re-chiffrement après rotation : lignes par lot et pause entre lots (secondes)
+    app.config['KEY_ROTATION_CHUNK_SIZE'] = int(os.environ.get('KEY_ROTATION_CHUNK_SIZE', 200))
+    app.config['KEY_ROTATION_PAUSE'] = float(os.environ.get('KEY_ROTATION_PAUSE', 0.05))
 
     # Configuration CORS pour permettre les requêtes depuis le frontend
-    CORS(app, origins=['http://localhost:8080'], supports_credentials=True)
+    CORS(app, origins=['http://localhost:8080'], supports_credentials=True,
+         expose_headers=['X-Next-Cursor', 'X-Total-Count', 'Link'])
 
     db.init_app(app)
+    token_cache.configure(app.config['TOKEN_CACHE_SIZE'])
+    identity_cache.configure(app.config['IDENTITY_CACHE_SIZE'], app.config['IDENTITY_CACHE_TTL'])
+    credential_cache.configure(app.config['CREDENTIAL_CACHE_SIZE'], app.config['CREDENTIAL_CACHE_TTL'])
+    weather_cache.configure(
+        app.config['WEATHER_CACHE_TTL'],
+        app.config['WEATHER_CACHE_STALE_TTL'],
+        app.config['WEATHER_CACHE_SIZE'],
+        app.config['WEATHER_CELL_PRECISION']
+    )
+    weather_http.configure(
+        app.config['WEATHER_HTTP_POOL_SIZE'],
+        app.config['WEATHER_HTTP_TIMEOUT'],
+        app.config['WEATHER_HTTP_RETRIES'],
+        app.config['WEATHER_HTTP_BACKOFF'],
+        app.config['WEATHER_BREAKER_THRESHOLD'],
+        app.config['WEATHER_BREAKER_RESET']
+    )
+    weather_prefetcher.configure(app.config['WEATHER_PREFETCH_WORKERS'], app.config['WEATHER_PREFETCH_LEAD'])
+    weather_providers.configure(
+        app.config['WEATHER_PROVIDER'],
+        app.config['WEATHER_API_URL'],
+        app.config['WEATHER_REPLAY_AT']
+    )
+    weather_observations.configure(app.config['WEATHER_RECORD_OBSERVATIONS'], app.config['WEATHER_DEGRADED_MAX_AGE'])
+    weather_batch.configure(
+        app.config['WEATHER_BATCH_CONCURRENCY'],
+        app.config['WEATHER_BATCH_TIMEOUT'],
+        app.config['WEATHER_QUOTA_PER_MINUTE']
+    )
+    catalog_pagination.configure(
+        app.config['INDOOR_PLANTS_PAGE_SIZE'],
+        app.config['INDOOR_PLANTS_MAX_PAGE_SIZE'],
+        app.config['INDOOR_PLANTS_COUNT_TTL']
+    )
+    species_cache.configure(
+        app.config['SPECIES_CACHE_SIZE'],
+        app.config['SPECIES_CACHE_TTL'],
+        app.config['CATALOG_VERSION_INTERVAL']
+    )
+    revocation_store.configure(
+        app.config['REVOCATION_SYNC_INTERVAL'],
+        app.config['REVOCATION_PURGE_INTERVAL'],
+        app.config['REVOCATION_BLOOM_CAPACITY']
+    )
+    password_hasher.configure(
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_MAX_PENDING'],
+        app.config['PASSWORD_HASH_TIMEOUT'],
+        app.config['PASSWORD_HASH_RETRY_AFTER'],
+        calibrate_iterations(app.config['PASSWORD_HASH_BUDGET_MS'], app.config['PASSWORD_HASH_MIN_ITERATIONS'])
+    )
+    keyring.configure(app.config['ENCRYPTION_KEYS'])
+    key_prober.configure(
+        app.config['KEY_PROBE_WORKERS'],
+        app.config['KEY_PROBE_TIMEOUT'],
+        app.config['KEY_PROBE_DEADLINE'],
+        app.config['KEY_PROBE_URLS'],
+        app.config['KEY_PROBE_TIMEOUTS']
+    )
+    reencryption_job.configure(app.config['KEY_ROTATION_CHUNK_SIZE'], app.config['KEY_ROTATION_PAUSE'])
+    configure_logging(app)
+    if app.config['TRUSTED_PROXY_COUNT']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'])
+    rate_limiter.init_app(app)
     with app.app_context():
         db.create_all()
+    catalog_search.init_app(app)
+    species_cache.init_app(app)
+    usage_recorder.init_app(app, app.config['API_KEY_USAGE_FLUSH_INTERVAL'])
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(api_keys_bp)
@@ -42,6 +230,7 @@ def create_app():
     app.register_blueprint(user_plants_bp)
     app.register_blueprint(growth_journal_bp)
     app.register_blueprint(notifications_bp, url_prefix='/api')
+    register_cli(app)
     
     @app.route('/health')
     def health_check():
@@ -50,5 +239,13 @@ def create_app():
             'service': 'bloomzy-backend',
             'database': 'connected'
         }), 200
+
+    @app.route('/metrics')
+    def metrics():
+        if not app.config['METRICS_ENABLED']:
+            return jsonify({'error': 'Ressource introuvable'}), 404
+        if not scrape_allowed(request.headers.get('Authorization'), request.remote_addr, app.config['METRICS_TOKEN']):
+            return jsonify({'error': 'Collecte des métriques non autorisée'}), 401
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
       
     return app
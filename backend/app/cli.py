@@ -0,0 +1,131 @@
+"""
+Commandes d'administration ``flask`` (``flask --app app <groupe> <commande>``).
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from services.catalog_import import CatalogImporter
+from services.catalog_search import catalog_search
+from services.user_provisioning import UserImporter, read_records
+from services.key_rotation import reencryption_job
+from services.weather_providers import weather_observations
+
+users_cli = AppGroup('users', help='Gestion des comptes utilisateurs.')
+keys_cli = AppGroup('keys', help='Chiffrement des clés API.')
+weather_cli = AppGroup('weather', help='Données météo.')
+catalog_cli = AppGroup('catalog', help='Catalogue des espèces.')
+
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default=None,
+              help="Format du fichier (déduit de l'extension par défaut).")
+@click.option('--batch-size', type=click.IntRange(min=1), default=500, show_default=True,
+              help='Enregistrements par lot et par transaction.')
+@click.option('--workers', type=click.IntRange(min=0), default=None,
+              help='Processus de hachage (nombre de CPU par défaut, 0 pour hacher dans le processus courant).')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), default=None,
+              help='Fichier de reprise (PATH.checkpoint par défaut).')
+@click.option('--errors', type=click.Path(dir_okay=False), default=None,
+              help='Fichier JSONL recevant les enregistrements rejetés.')
+def import_users(path, fmt, batch_size, workers, checkpoint, errors):
+    """Importe des comptes depuis un fichier JSONL ou CSV (colonnes email, password, username...)."""
+    started = time.monotonic()
+
+    def report(stats):
+        processed = stats['position'] - stats['resumed_from']
+        rate = processed / max(time.monotonic() - started, 1e-6)
+        click.echo(f"{stats['position']} enregistrements traités : {stats['imported']} importés, "
+                   f"{stats['duplicates']} doublons, {stats['invalid']} invalides ({rate:.0f}/s)")
+
+    importer = UserImporter(batch_size=batch_size, workers=workers, progress=report)
+    stats = importer.run(path, fmt=fmt, checkpoint_path=checkpoint, errors_path=errors)
+    resumed = f" (reprise après l'enregistrement {stats['resumed_from']})" if stats['resumed_from'] else ''
+    click.echo(f"Import terminé{resumed} : {stats['imported']} comptes créés, {stats['duplicates']} doublons, "
+               f"{stats['invalid']} invalides")
+
+
+@keys_cli.command('rotate')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=None,
+              help='Lignes re-chiffrées par transaction (KEY_ROTATION_CHUNK_SIZE par défaut).')
+def rotate_keys(chunk_size):
+    """Re-chiffre les clés API avec la clé primaire de ENCRYPTION_KEY, par lots, sans arrêt du service."""
+    if chunk_size:
+        reencryption_job.chunk_size = chunk_size
+
+    def report(progress):
+        click.echo(f"{progress['processed']}/{progress['total']} clés parcourues : "
+                   f"{progress['rotated']} re-chiffrées, {progress['failed']} indéchiffrables")
+
+    progress = reencryption_job.run(on_chunk=report)
+    if progress['status'] != 'done':
+        raise click.ClickException(f"Re-chiffrement interrompu après l'identifiant {progress['last_id']} : "
+                                   f"{progress['error']}")
+    click.echo(f"Rotation terminée : {progress['rotated']} clés re-chiffrées, {progress['failed']} indéchiffrables")
+
+
+@weather_cli.command('purge')
+@click.option('--days', type=click.IntRange(min=1), default=None,
+              help='Âge maximal des observations conservées (WEATHER_OBSERVATION_RETENTION_DAYS par défaut).')
+def purge_weather_observations(days):
+    """Supprime les observations météo enregistrées plus anciennes que la durée de conservation."""
+    days = days or current_app.config['WEATHER_OBSERVATION_RETENTION_DAYS']
+    deleted = weather_observations.purge(datetime.utcnow() - timedelta(days=days))
+    click.echo(f"{deleted} observations météo de plus de {days} jours supprimées")
+
+
+@catalog_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default=None,
+              help="Format du fichier (déduit de l'extension par défaut).")
+@click.option('--batch-size', type=click.IntRange(min=1), default=500, show_default=True,
+              help='Enregistrements validés et dédoublonnés ensemble.')
+@click.option('--commit-every', type=click.IntRange(min=1), default=2000, show_default=True,
+              help='Espèces insérées par transaction.')
+@click.option('--errors', type=click.Path(dir_okay=False), default=None,
+              help='Fichier JSONL recevant les enregistrements rejetés.')
+def import_catalog(path, fmt, batch_size, commit_every, errors):
+    """Importe des espèces depuis un fichier JSONL ou CSV (colonnes scientific_name, common_names...)."""
+    started = time.monotonic()
+    errors_file = open(errors, 'a', encoding='utf-8') if errors else None
+
+    def on_error(position, scientific_name, reason):
+        if errors_file:
+            errors_file.write(json.dumps({'position': position, 'scientific_name': scientific_name,
+                                          'reason': reason}, ensure_ascii=False) + '\n')
+
+    def report(stats):
+        rate = stats['position'] / max(time.monotonic() - started, 1e-6)
+        click.echo(f"{stats['position']} enregistrements traités : {stats['imported']} importés, "
+                   f"{stats['duplicates']} doublons, {stats['invalid']} invalides ({rate:.0f}/s)")
+
+    importer = CatalogImporter(batch_size=batch_size, commit_every=commit_every, on_error=on_error, progress=report)
+    try:
+        stats = importer.run(read_records(path, fmt))
+    finally:
+        if errors_file:
+            errors_file.close()
+    click.echo(f"Import terminé : {stats['imported']} espèces créées, {stats['duplicates']} doublons, "
+               f"{stats['invalid']} invalides")
+
+
+@catalog_cli.command('reindex')
+def reindex_catalog():
+    """Reconstruit l'index de recherche plein texte depuis la table des espèces."""
+    if catalog_search.reindex():
+        click.echo("Index de recherche du catalogue reconstruit")
+    else:
+        click.echo(f"Aucun index à reconstruire (mode de recherche : {catalog_search.mode})")
+
+
+def register_cli(app):
+    """Enregistre les groupes de commandes sur l'application."""
+    app.cli.add_command(users_cli)
+    app.cli.add_command(keys_cli)
+    app.cli.add_command(weather_cli)
+    app.cli.add_command(catalog_cli)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark : latence des routes non authentifiantes pendant une rafale de connexions.
+
+Démarre le backend sur un serveur WSGI multi-thread local (base SQLite
+temporaire), lance ``--storm`` clients qui se connectent en boucle, et mesure
+pendant ce temps la latence de ``GET /indoor-plants/``. Comparer par exemple :
+
+    python benchmarks/login_storm.py --hash-workers 2 --max-pending 8
+    python benchmarks/login_storm.py --hash-workers 64 --max-pending 100000
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--storm', type=int, default=32, help='clients de connexion concurrents')
+    parser.add_argument('--duration', type=float, default=10, help='durée de la mesure (secondes)')
+    parser.add_argument('--hash-workers', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=8)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_file.name}'
+    os.environ['PASSWORD_HASH_WORKERS'] = str(args.hash_workers)
+    os.environ['PASSWORD_HASH_MAX_PENDING'] = str(args.max_pending)
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    app = create_app()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    credentials = {'email': 'storm@example.com', 'password': 'Password123!'}
+    requests.post(f'{base_url}/auth/signup', json=credentials)
+
+    stop = threading.Event()
+    login_statuses = []
+
+    def login_loop():
+        session = requests.Session()
+        while not stop.is_set():
+            response = session.post(f'{base_url}/auth/login', json=credentials)
+            login_statuses.append(response.status_code)
+            if response.status_code == 503:
+                time.sleep(float(response.headers.get('Retry-After', 1)) / 10)
+
+    storm = [threading.Thread(target=login_loop, daemon=True) for _ in range(args.storm)]
+    for thread in storm:
+        thread.start()
+
+    latencies = []
+    session = requests.Session()
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        session.get(f'{base_url}/indoor-plants/')
+        latencies.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.01)
+
+    stop.set()
+    for thread in storm:
+        thread.join()
+    server.shutdown()
+    os.unlink(db_file.name)
+
+    print(f"Pool de hachage : {args.hash_workers} threads, file max {args.max_pending}")
+    print(f"Connexions : {login_statuses.count(200)} réussies, {login_statuses.count(503)} refusées (503)")
+    print(f"GET /indoor-plants/ pendant la rafale ({len(latencies)} requêtes) :")
+    print(f"  p50 = {statistics.median(latencies):.1f} ms")
+    print(f"  p99 = {percentile(latencies, 99):.1f} ms")
+    print(f"  max = {max(latencies):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
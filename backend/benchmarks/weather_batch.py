@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark : récupération météo séquentielle contre récupération groupée.
+
+Démarre un fournisseur OpenWeatherMap factice local avec une latence injectée,
+puis récupère la météo de ``--cells`` cellules distinctes, d'abord une par une
+(``get_weather_data``), puis en un lot (``get_weather_batch``), cache vidé
+entre les deux. Comparer par exemple :
+
+    python benchmarks/weather_batch.py --cells 500 --latency 0.05 --concurrency 8
+    python benchmarks/weather_batch.py --cells 500 --latency 0.05 --concurrency 64
+    python benchmarks/weather_batch.py --cells 500 --quota 3000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cells', type=int, default=200, help='cellules distinctes à récupérer')
+    parser.add_argument('--latency', type=float, default=0.05, help='latence du fournisseur (secondes)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--quota', type=float, default=0, help='appels par minute (0 = illimité)')
+    parser.add_argument('--skip-sequential', action='store_true', help='ne mesurer que la récupération groupée')
+    args = parser.parse_args()
+
+    from tests.stub_provider import StubServer
+    server = StubServer(latency=args.latency).start()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_file.name}'
+    os.environ['WEATHER_API_URL'] = server.base_url
+    os.environ['WEATHER_BATCH_CONCURRENCY'] = str(args.concurrency)
+    os.environ['WEATHER_QUOTA_PER_MINUTE'] = str(args.quota)
+    os.environ['WEATHER_HTTP_POOL_SIZE'] = str(args.concurrency)
+    os.environ['WEATHER_RECORD_OBSERVATIONS'] = 'false'
+    os.environ['API_KEY_USAGE_FLUSH_INTERVAL'] = '60'
+
+    from app import create_app
+    from models.api_key import ApiKey
+    from models.user import User, db
+    from services.usage_recorder import usage_recorder
+    from services.weather_batch import weather_batch
+    from services.weather_cache import weather_cache
+    from services.weather_service import WeatherService
+
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    with app.app_context():
+        user = User(email='benchmark@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        key = ApiKey(user_id=user.id, service_name='openweathermap', key_name='Benchmark')
+        key.encrypt_key('a' * 32)
+        db.session.add(key)
+        db.session.commit()
+
+        # Une cellule par degré de latitude/longitude : aucune réponse partagée
+        locations = [(user.id, -60 + index // 180, -90 + index % 180) for index in range(args.cells)]
+        service = WeatherService()
+
+        if not args.skip_sequential:
+            started = time.monotonic()
+            for user_id, latitude, longitude in locations:
+                service.get_weather_data(user_id, latitude, longitude)
+            sequential = time.monotonic() - started
+            print(f"Séquentiel : {args.cells} cellules en {sequential:.2f} s "
+                  f"({args.cells / sequential:.0f} cellules/s)")
+            weather_cache.clear()
+
+        started = time.monotonic()
+        results = service.get_weather_batch(locations)
+        batched = time.monotonic() - started
+        ok = sum(1 for weather_data in results.values() if weather_data is not None)
+        print(f"Groupé (concurrence {args.concurrency}) : {ok}/{len(results)} cellules en {batched:.2f} s "
+              f"({len(results) / batched:.0f} cellules/s)")
+        print(f"Statistiques : {weather_batch.stats()}")
+        usage_recorder.flush()
+
+    server.stop()
+    os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
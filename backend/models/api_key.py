@@ -1,7 +1,8 @@
 from models.user import db
 from datetime import datetime
-from cryptography.fernet import Fernet
-import os
+from services.keyring import keyring
+from services.usage_recorder import usage_recorder
+from services.key_probe import key_prober
 
 class ApiKey(db.Model):
     __tablename__ = 'api_keys'
@@ -18,34 +19,24 @@ class ApiKey(db.Model):
     # Contrainte d'unicité : un utilisateur ne peut avoir qu'une clé active par service
     __table_args__ = (db.UniqueConstraint('user_id', 'service_name', 'is_active', name='unique_active_key_per_service'),)
     
-    @staticmethod
-    def get_encryption_key():
-        """Récupère ou génère la clé de chiffrement"""
-        key = os.environ.get('ENCRYPTION_KEY')
-        if not key:
-            # En développement, génère une clé temporaire
-            key = Fernet.generate_key()
-            os.environ['ENCRYPTION_KEY'] = key.decode()
-        return key if isinstance(key, bytes) else key.encode()
-    
     def encrypt_key(self, api_key):
-        """Chiffre une clé API"""
-        fernet = Fernet(self.get_encryption_key())
-        self.encrypted_key = fernet.encrypt(api_key.encode()).decode()
+        """Chiffre une clé API avec la clé primaire du trousseau"""
+        self.encrypted_key = keyring.encrypt(api_key)
     
     def decrypt_key(self):
-        """Déchiffre une clé API"""
-        fernet = Fernet(self.get_encryption_key())
-        return fernet.decrypt(self.encrypted_key.encode()).decode()
+        """Déchiffre une clé API (clé primaire ou clés de rotation)"""
+        return keyring.decrypt(self.encrypted_key)
     
     def to_dict(self, include_key=False):
         """Convertit en dictionnaire, sans exposer la clé par défaut"""
+        # Utilisation récente pas encore écrite en base par le tampon différé
+        last_used = max(filter(None, [self.last_used, usage_recorder.pending_for(self.id)]), default=None)
         result = {
             'id': self.id,
             'service_name': self.service_name,
             'key_name': self.key_name,
             'is_active': self.is_active,
-            'last_used': self.last_used.isoformat() if self.last_used else None,
+            'last_used': last_used.isoformat() if last_used else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -65,6 +56,5 @@ class ApiKey(db.Model):
         ).first()
     
     def test_connection(self):
-        """Teste la connexion avec la clé API (à implémenter selon le service)"""
-        # Placeholder - à implémenter selon le service
-        return True
\ No newline at end of file
+        """Teste la clé auprès du fournisseur ; retourne le résultat de la sonde"""
+        return key_prober.probe(self.service_name, self.decrypt_key())
@@ -0,0 +1,30 @@
+from app import db
+from sqlalchemy import insert, select, update
+
+# Nom du compteur du catalogue des espèces
+INDOOR_PLANTS = 'indoor_plants'
+
+
+class CatalogVersion(db.Model):
+    """Compteur de version d'un catalogue partagé, incrémenté à chaque écriture"""
+    __tablename__ = 'catalog_versions'
+
+    name = db.Column(db.String(32), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def read(connection, name=INDOOR_PLANTS):
+        """Version courante du catalogue (0 s'il n'a jamais été modifié)"""
+        version = connection.execute(
+            select(CatalogVersion.version).where(CatalogVersion.name == name)
+        ).scalar()
+        return version or 0
+
+    @staticmethod
+    def bump(connection, name=INDOOR_PLANTS):
+        """Incrémente la version dans la transaction de l'écriture qui la motive"""
+        result = connection.execute(
+            update(CatalogVersion).where(CatalogVersion.name == name).values(version=CatalogVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(CatalogVersion).values(name=name, version=1))
@@ -3,6 +3,8 @@ from datetime import datetime
 
 class GrowthEntry(db.Model):
     __tablename__ = 'growth_entries'
+    # Validateurs ETag : count/max(updated_at) par plante via l'index
+    __table_args__ = (db.Index('ix_growth_entries_plant_updated', 'plant_id', 'updated_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     plant_id = db.Column(db.Integer, db.ForeignKey('user_plants.id'), nullable=False)
@@ -2,6 +2,7 @@ from app import db
 
 class IndoorPlant(db.Model):
     __tablename__ = 'indoor_plants'
+    __table_args__ = (db.Index('ix_indoor_plants_scientific_name_id', 'scientific_name', 'id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     scientific_name = db.Column(db.String(128), nullable=False)
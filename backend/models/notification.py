@@ -43,6 +43,7 @@ class Notification(db.Model):
     contenu et métadonnées associées.
     """
     __tablename__ = 'notifications'
+    __table_args__ = (db.Index('ix_notifications_user_updated', 'user_id', 'updated_at'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -146,6 +147,7 @@ class NotificationPreferences(db.Model):
     pour différents types de notifications.
     """
     __tablename__ = 'notification_preferences'
+    __table_args__ = (db.Index('ix_notification_preferences_user_updated', 'user_id', 'updated_at'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
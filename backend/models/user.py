@@ -1,8 +1,21 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import re
 
 db = SQLAlchemy()
 
+EMAIL_REGEX = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+
+def credentials_error(email, password):
+    """Valide un couple email / mot de passe d'inscription ; retourne le message d'erreur ou None"""
+    if not email or not password:
+        return 'Champs obligatoires manquants'
+    if not EMAIL_REGEX.match(email):
+        return 'Email invalide'
+    if len(password) < 8 or password.isdigit() or password.isalpha():
+        return 'Mot de passe trop faible'
+    return None
+
 class User(db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True)
@@ -1,8 +1,11 @@
 from app import db
 from datetime import datetime
+from services.species_cache import species_cache
 
 class UserPlant(db.Model):
     __tablename__ = 'user_plants'
+    # Validateurs ETag : count/max(updated_at) par utilisateur via l'index
+    __table_args__ = (db.Index('ix_user_plants_user_updated', 'user_id', 'updated_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -53,8 +56,16 @@ class UserPlant(db.Model):
             'last_repotting': self.last_repotting.isoformat() if self.last_repotting else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'species': self.species.to_dict() if self.species else None
+            'species': self.species_dict()
         }
+
+    def species_dict(self):
+        """Espèce sérialisée depuis le cache du catalogue, sans charger la relation"""
+        cached = species_cache.to_dict(self.species_id)
+        if cached is not None:
+            return cached
+        # Espèce pas encore validée en base (même transaction) : relation classique
+        return self.species.to_dict() if self.species else None
     
     def validate(self):
         """Validate user plant data"""
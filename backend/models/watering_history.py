@@ -3,6 +3,8 @@ from datetime import datetime
 
 class WateringHistory(db.Model):
     __tablename__ = 'watering_history'
+    # Dernier arrosage d'une plante (préchauffage météo) lu par l'index
+    __table_args__ = (db.Index('ix_watering_history_plant_watered', 'plant_id', 'watered_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     plant_id = db.Column(db.Integer, db.ForeignKey('user_plants.id'), nullable=False)
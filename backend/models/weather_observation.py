@@ -0,0 +1,44 @@
+from app import db
+from datetime import datetime
+
+class WeatherObservation(db.Model):
+    """Observation météo reçue du fournisseur pour une cellule geohash"""
+    __tablename__ = 'weather_observations'
+    # Dernière observation d'une cellule (mode dégradé, rejeu) : parcours inverse de l'index
+    __table_args__ = (db.Index('ix_weather_observations_cell_observed', 'cell', 'observed_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    cell = db.Column(db.String(12), nullable=False)
+    observed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    temperature = db.Column(db.Float, nullable=False)
+    humidity = db.Column(db.SmallInteger, nullable=False)
+    pressure = db.Column(db.SmallInteger, nullable=True)
+    wind_speed = db.Column(db.Float, nullable=True)
+    weather_main = db.Column(db.String(32), nullable=True)
+    weather_description = db.Column(db.String(64), nullable=True)
+
+    @staticmethod
+    def row_from_weather_data(cell, weather_data, observed_at=None):
+        """Colonnes d'une observation à partir des données formatées par le service météo"""
+        return {
+            'cell': cell,
+            'observed_at': observed_at or datetime.utcnow(),
+            'temperature': weather_data['temperature'],
+            'humidity': weather_data['humidity'],
+            'pressure': weather_data.get('pressure'),
+            'wind_speed': weather_data.get('wind_speed'),
+            'weather_main': weather_data.get('weather_main'),
+            'weather_description': (weather_data.get('weather_description') or '')[:64] or None,
+        }
+
+    def to_weather_data(self):
+        """Données au format du service météo (voir WeatherService.get_weather_data)"""
+        return {
+            'temperature': self.temperature,
+            'humidity': self.humidity,
+            'pressure': self.pressure,
+            'weather_main': self.weather_main,
+            'weather_description': self.weather_description,
+            'wind_speed': self.wind_speed if self.wind_speed is not None else 0,
+            'timestamp': self.observed_at.isoformat()
+        }
@@ -3,12 +3,15 @@ from flask import Blueprint, request, jsonify, current_app
 from models.user import User
 from models.api_key import ApiKey, db
 from routes.auth import get_current_user, jwt_required
+from services.credential_cache import credential_cache
+from services.usage_recorder import usage_recorder
+from services.key_probe import key_prober
+from cryptography.fernet import InvalidToken
 import re
-from datetime import datetime
 
 bp = Blueprint('api_keys', __name__, url_prefix='/api/keys')
 
-SUPPORTED_SERVICES = ['openai', 'claude', 'gemini', 'huggingface']
+SUPPORTED_SERVICES = ['openai', 'claude', 'gemini', 'huggingface', 'openweathermap']
 
 def validate_service_name(service_name):
     """Valide le nom du service"""
@@ -24,6 +27,8 @@ def validate_api_key_format(service_name, api_key):
         return len(api_key) > 20  # Format générique
     elif service_name == 'huggingface':
         return api_key.startswith('hf_') and len(api_key) > 20
+    elif service_name == 'openweathermap':
+        return len(api_key) == 32 and api_key.isalnum()
     return False
 
 @bp.route('/', methods=['GET'])
@@ -83,6 +88,7 @@ def create_api_key():
     try:
         db.session.add(new_key)
         db.session.commit()
+        credential_cache.invalidate(user.id, service_name)
         return jsonify(new_key.to_dict()), 201
     except Exception as e:
         db.session.rollback()
@@ -129,6 +135,7 @@ def update_api_key(key_id):
     
     try:
         db.session.commit()
+        credential_cache.invalidate(user.id, api_key.service_name)
         return jsonify(api_key.to_dict()), 200
     except Exception as e:
         db.session.rollback()
@@ -149,6 +156,7 @@ def delete_api_key(key_id):
     try:
         db.session.delete(api_key)
         db.session.commit()
+        credential_cache.invalidate(user.id, api_key.service_name)
         return jsonify({'message': 'Clé API supprimée'}), 200
     except Exception as e:
         db.session.rollback()
@@ -169,18 +177,50 @@ def test_api_key(key_id):
     if not api_key.is_active:
         return jsonify({'error': 'Clé API désactivée'}), 400
     
-    # Test de connexion (placeholder)
+    # Test de connexion auprès du fournisseur
     try:
-        success = api_key.test_connection()
-        if success:
-            api_key.last_used = datetime.utcnow()
-            db.session.commit()
-            return jsonify({'message': 'Clé API fonctionnelle', 'status': 'success'}), 200
+        result = api_key.test_connection()
+        if result['status'] == 'ok':
+            usage_recorder.record(api_key.id)
+            return jsonify({'message': 'Clé API fonctionnelle', 'status': 'success', 'probe': result}), 200
         else:
-            return jsonify({'message': 'Échec du test de connexion', 'status': 'error'}), 400
+            return jsonify({'message': 'Échec du test de connexion', 'status': 'error', 'probe': result}), 400
     except Exception as e:
         return jsonify({'error': 'Erreur lors du test'}), 500
 
+@bp.route('/test-all', methods=['POST'])
+@jwt_required
+def test_all_api_keys():
+    """Teste en parallèle toutes les clés actives de l'utilisateur"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Utilisateur non trouvé'}), 404
+    
+    keys = ApiKey.query.filter_by(user_id=user.id, is_active=True).all()
+    probes = []
+    results = {}
+    for key in keys:
+        try:
+            probes.append((key.id, key.service_name, key.decrypt_key()))
+        except InvalidToken:
+            results[key.id] = {'status': 'error', 'http_status': None, 'latency_ms': 0,
+                               'message': 'Clé indéchiffrable'}
+    
+    # Toutes les sondes partent ensemble : la durée est celle de la plus lente
+    results.update(key_prober.probe_all(probes))
+    for key_id, result in results.items():
+        if result['status'] == 'ok':
+            usage_recorder.record(key_id)
+    
+    return jsonify({
+        'results': [
+            {'id': key.id, 'service_name': key.service_name, 'key_name': key.key_name, **results[key.id]}
+            for key in keys
+        ],
+        'total': len(keys),
+        'healthy': sum(1 for result in results.values() if result['status'] == 'ok')
+    }), 200
+
 @bp.route('/services', methods=['GET'])
 @jwt_required
 def get_supported_services():
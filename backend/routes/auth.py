@@ -1,34 +1,79 @@
 
 from functools import wraps
-from flask import Blueprint, request, jsonify, current_app
-from werkzeug.security import generate_password_hash, check_password_hash
-import jwt, datetime, re
-from models.user import db, User
+from flask import Blueprint, request, jsonify, current_app, g
+import jwt, datetime, uuid, logging
+from models.user import db, User, credentials_error
+from services.token_cache import token_cache
+from services.identity_cache import identity_cache
+from services.revocation_store import revocation_store, token_identifier, DEFAULT_TOKEN_LIFETIME
+from services.password_hasher import password_hasher, HashingOverloaded
+from services.conditional import resource_validators, not_modified, with_validators
 
-# Blacklist JWT en mémoire (à remplacer par une solution persistante en prod)
-jwt_blacklist = set()
+logger = logging.getLogger(__name__)
 
 bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+# Champs masqués dans les dumps de requêtes
+REDACTED_HEADERS = {'authorization', 'cookie'}
+REDACTED_FIELDS = {'password', 'access_token', 'token'}
+
+def _log_request_dump():
+    """Journalise en-têtes et corps de la requête si LOG_REQUEST_BODIES est activé (débogage)"""
+    if not current_app.config.get('LOG_REQUEST_BODIES'):
+        return
+    headers = {key: ('***' if key.lower() in REDACTED_HEADERS else value) for key, value in request.headers.items()}
+    body = request.get_json(silent=True)
+    if isinstance(body, dict):
+        body = {key: ('***' if key in REDACTED_FIELDS else value) for key, value in body.items()}
+    logger.info(f"{request.method} {request.path} reçu", extra={'headers': headers, 'body': body})
+
+def _get_bearer_token():
+    """Extrait le token Bearer de l'en-tête Authorization"""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+def decode_token(token):
+    """Décode un token JWT en s'appuyant sur le cache des tokens déjà vérifiés
+
+    Lève ``jwt.ExpiredSignatureError`` ou ``jwt.InvalidTokenError`` comme ``jwt.decode``.
+    """
+    secret = current_app.config.get('SECRET_KEY', 'dev-secret-key')
+    if not isinstance(token, str):
+        raise jwt.InvalidTokenError('Token invalide')
+    payload = token_cache.get(token, secret)
+    if payload is None:
+        payload = jwt.decode(token, secret, algorithms=['HS256'])
+        token_cache.put(token, secret, payload)
+    return payload
+
+def is_token_revoked(token, payload):
+    """Vérifie la révocation d'un token décodé (filtre de Bloom puis base partagée)"""
+    return revocation_store.is_revoked(token_identifier(token, payload))
+
+def _hashing_overloaded_response(error):
+    """Réponse rapide quand le pool de hachage est saturé"""
+    response = jsonify({'error': 'Service temporairement surchargé, réessayez plus tard'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
 def jwt_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
+        token = _get_bearer_token()
         if not token:
             return jsonify({'error': 'Token manquant'}), 401
-        secret = current_app.config.get('SECRET_KEY', 'dev-secret-key')
-        if token in jwt_blacklist:
-            return jsonify({'error': 'Token révoqué'}), 401
         try:
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
+            payload = decode_token(token)
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token expiré'}), 401
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Token invalide'}), 401
+        if is_token_revoked(token, payload):
+            return jsonify({'error': 'Token révoqué'}), 401
+        # Claims vérifiés une seule fois par requête ; l'utilisateur est chargé à la demande
+        g.auth_context = {'token': token, 'payload': payload}
         return f(*args, **kwargs)
     return decorated
 
@@ -39,10 +84,7 @@ def protected():
 
 @bp.route('/signup', methods=['POST'])
 def signup():
-    print('--- POST /auth/signup reçu ---')
-    print('Headers:', dict(request.headers))
-    print('Body:', request.get_data(as_text=True))
-    print('DEBUG: Début de la fonction signup')
+    _log_request_dump()
     data = request.get_json()
     email = data.get('email')
     password = data.get('password')
@@ -50,25 +92,22 @@ def signup():
     # Désactivation temporaire du captcha (sera géré via l'admin)
     # La vérification du captcha est désactivée pour le développement
 
-    if not email or not password:
-        return jsonify({'error': 'Champs obligatoires manquants'}), 400
-
-    email_regex = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-    if not re.match(email_regex, email):
-        return jsonify({'error': 'Email invalide'}), 400
-
-    if len(password) < 8 or password.isdigit() or password.isalpha():
-        return jsonify({'error': 'Mot de passe trop faible'}), 400
+    error = credentials_error(email, password)
+    if error:
+        return jsonify({'error': error}), 400
 
     # if recaptcha is None:
     #     return jsonify({'error': 'Captcha requis'}), 400
-    
-    print("DEBUG: Validation du captcha passée, vérification utilisateur existant")
+
 
     if User.query.filter_by(email=email).first():
         return jsonify({'error': 'Email existe déjà'}), 409
 
-    user = User(email=email, password_hash=generate_password_hash(password, method='pbkdf2:sha256'))
+    try:
+        password_hash = password_hasher.hash(password)
+    except HashingOverloaded as e:
+        return _hashing_overloaded_response(e)
+    user = User(email=email, password_hash=password_hash)
     db.session.add(user)
     db.session.commit()
 
@@ -80,13 +119,24 @@ def login():
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Email et mot de passe requis.'}), 400
     user = User.query.filter_by(email=data['email']).first()
-    if not user or not check_password_hash(user.password_hash, data['password']):
+    try:
+        valid_password = bool(user) and password_hasher.verify(user.password_hash, data['password'])
+    except HashingOverloaded as e:
+        return _hashing_overloaded_response(e)
+    if not valid_password:
         return jsonify({'error': 'Identifiants invalides.'}), 401
+    # Mise à niveau transparente des hachages aux paramètres périmés
+    if password_hasher.rehash_if_needed(user, data['password']):
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
     # Génération du token JWT
     payload = {
         'user_id': user.id,
         'email': user.email,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
+        'exp': datetime.datetime.utcnow() + DEFAULT_TOKEN_LIFETIME,
+        'jti': uuid.uuid4().hex
     }
     secret = current_app.config.get('SECRET_KEY', 'dev-secret-key')
     token = jwt.encode(payload, secret, algorithm='HS256')
@@ -97,14 +147,15 @@ def refresh():
     token = data.get('access_token') or data.get('token')
     secret = current_app.config.get('SECRET_KEY', 'dev-secret-key')
     try:
-        if token in jwt_blacklist:
+        payload = decode_token(token)
+        if is_token_revoked(token, payload):
             return jsonify({'error': 'Token révoqué'}), 401
-        payload = jwt.decode(token, secret, algorithms=['HS256'])
         # Générer un nouveau token avec nouvelle expiration
         new_payload = {
             'user_id': payload['user_id'],
             'email': payload['email'],
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
+            'exp': datetime.datetime.utcnow() + DEFAULT_TOKEN_LIFETIME,
+            'jti': uuid.uuid4().hex
         }
         new_token = jwt.encode(new_payload, secret, algorithm='HS256')
         return jsonify({'access_token': new_token}), 200
@@ -119,30 +170,44 @@ def logout():
     token = data.get('access_token') or data.get('token')
     if not token:
         return jsonify({'error': 'Token requis'}), 400
-    jwt_blacklist.add(token)
+    try:
+        payload = decode_token(token)
+    except jwt.InvalidTokenError:
+        payload = None  # Token expiré ou invalide : déjà refusé, rien à révoquer
+    if payload:
+        if 'exp' in payload:
+            expires_at = datetime.datetime.utcfromtimestamp(payload['exp'])
+        else:
+            expires_at = datetime.datetime.utcnow() + DEFAULT_TOKEN_LIFETIME
+        revocation_store.revoke(token_identifier(token, payload), expires_at)
+        token_cache.evict(token, current_app.config.get('SECRET_KEY', 'dev-secret-key'))
     return jsonify({'message': 'Déconnexion réussie'}), 200
 
 def get_current_user():
-    """Récupère l'utilisateur courant à partir du token JWT"""
-    token = None
-    if 'Authorization' in request.headers:
-        auth_header = request.headers['Authorization']
-        if auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-    
+    """Récupère l'utilisateur courant à partir du token JWT
+
+    Dans une route protégée par ``jwt_required``, réutilise les claims déjà
+    vérifiés et mémorise l'utilisateur dans ``g.auth_context``. Le contexte est
+    lié au token pour ne jamais resservir l'utilisateur d'une autre requête
+    partageant le même contexte d'application.
+    """
+    token = _get_bearer_token()
     if not token:
         return None
-    
-    secret = current_app.config.get('SECRET_KEY', 'dev-secret-key')
-    if token in jwt_blacklist:
-        return None
-    
-    try:
-        payload = jwt.decode(token, secret, algorithms=['HS256'])
-        user = db.session.get(User, payload['user_id'])
-        return user
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
-        return None
+
+    auth_context = g.get('auth_context')
+    if not auth_context or auth_context['token'] != token:
+        try:
+            payload = decode_token(token)
+        except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
+            return None
+        if is_token_revoked(token, payload):
+            return None
+        auth_context = g.auth_context = {'token': token, 'payload': payload}
+
+    if 'user' not in auth_context:
+        auth_context['user'] = identity_cache.get_user(auth_context['payload']['user_id'])
+    return auth_context['user']
 
 @bp.route('/profile', methods=['GET'])
 @jwt_required
@@ -150,12 +215,20 @@ def get_profile():
     user = get_current_user()
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
-    return jsonify(user.to_dict()), 200
+    etag, last_modified = resource_validators(user.updated_at, user.id)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    return with_validators(jsonify(user.to_dict()), etag, last_modified), 200
 
 @bp.route('/profile', methods=['PUT'])
 @jwt_required
 def update_profile():
-    user = get_current_user()
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({'error': 'Utilisateur non trouvé'}), 404
+    # L'utilisateur courant est un instantané en lecture seule : charger l'instance de la session
+    user = db.session.get(User, current_user.id)
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
     
@@ -190,6 +263,7 @@ def update_profile():
     
     try:
         db.session.commit()
+        identity_cache.invalidate(user.id)
         return jsonify(user.to_dict()), 200
     except Exception as e:
         db.session.rollback()
@@ -5,6 +5,7 @@ from models.growth_entry import GrowthEntry
 from routes.auth import jwt_required, get_current_user
 from datetime import datetime, date
 from sqlalchemy import func
+from services.conditional import collection_validators, not_modified, with_validators
 
 growth_journal_bp = Blueprint('growth_journal', __name__, url_prefix='/api/plants')
 
@@ -40,6 +41,11 @@ def get_growth_entries(plant_id):
         if end_date:
             query = query.filter(GrowthEntry.entry_date <= datetime.strptime(end_date, '%Y-%m-%d').date())
         
+        etag, last_modified = collection_validators(query, GrowthEntry.updated_at, user.id, plant_id)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
         # Order by date descending
         query = query.order_by(GrowthEntry.entry_date.desc())
         
@@ -48,11 +54,12 @@ def get_growth_entries(plant_id):
         
         entries = query.all()
         
-        return jsonify({
+        response = jsonify({
             'plant_id': plant_id,
             'entries': [entry.to_dict() for entry in entries],
             'total': len(entries)
-        }), 200
+        })
+        return with_validators(response, etag, last_modified), 200
     except ValueError as e:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     except Exception as e:
@@ -1,7 +1,40 @@
 
-from flask import Blueprint, request, jsonify, make_response
+import io
+from flask import Blueprint, Response, current_app, request, jsonify, make_response, stream_with_context, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
 from models.indoor_plant import IndoorPlant
 from app import db
+from routes.auth import jwt_required
+from services.catalog_export import FORMATS, export_chunks, gzip_chunks
+from services.catalog_import import CatalogImporter
+from services.catalog_pagination import catalog_pagination, filters_fingerprint
+from services.catalog_search import CATALOG_ORDER, catalog_search
+from services.species_cache import species_cache
+from services.user_provisioning import parse_records
+
+# Rejets détaillés dans la réponse d'un import (les suivants sont seulement comptés)
+MAX_REPORTED_ERRORS = 1000
+
+
+class BoundedBody(io.RawIOBase):
+    """Corps de requête lu en flux, RequestEntityTooLarge au-delà de ``limit`` octets."""
+
+    def __init__(self, stream, limit: int):
+        self._stream = stream
+        self.limit = limit
+        self.consumed = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(min(len(buffer), self.limit - self.consumed + 1))
+        self.consumed += len(data)
+        if self.consumed > self.limit:
+            raise RequestEntityTooLarge()
+        buffer[:len(data)] = data
+        return len(data)
+
 
 indoor_plants_bp = Blueprint('indoor_plants', __name__, url_prefix='/indoor-plants')
 
@@ -63,15 +96,70 @@ def create_indoor_plant():
         # DEBUG: retourner le message d'erreur pour analyse (à retirer en prod)
         return jsonify({'error': 'Failed to create plant', 'details': str(e)}), 500
 
+@indoor_plants_bp.route('/import', methods=['POST'])
+@jwt_required
+def import_indoor_plants():
+    """Importe des espèces en masse depuis le corps de la requête (JSONL ou CSV), lu en flux.
+
+    Format : paramètre ``format`` (jsonl, csv), sinon déduit du Content-Type.
+    Les enregistrements invalides ou déjà présents sont rejetés sans
+    interrompre l'import et listés dans ``errors``. L'import est validé en une
+    seule transaction : au-delà de ``CATALOG_IMPORT_MAX_BYTES`` octets ou
+    ``CATALOG_IMPORT_MAX_ROWS`` enregistrements, réponse 413 et rien n'est importé.
+    """
+    fmt = request.args.get('format') or ('csv' if 'csv' in (request.mimetype or '') else 'jsonl')
+    if fmt not in ('jsonl', 'csv'):
+        return jsonify({'error': 'Format must be jsonl or csv'}), 400
+    max_bytes = current_app.config['CATALOG_IMPORT_MAX_BYTES']
+    max_rows = current_app.config['CATALOG_IMPORT_MAX_ROWS']
+    too_large = {'error': f'Import limited to {max_bytes} bytes and {max_rows} records'}
+    if request.content_length is not None and request.content_length > max_bytes:
+        return jsonify(too_large), 413
+
+    errors = []
+
+    def on_error(position, scientific_name, reason):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'position': position, 'scientific_name': scientific_name, 'reason': reason})
+
+    def capped(records):
+        for position, record in records:
+            if position > max_rows:
+                raise RequestEntityTooLarge()
+            yield position, record
+
+    # Corps sans Content-Length (chunked) : la limite est vérifiée pendant la lecture
+    body = BoundedBody(request.stream, max_bytes)
+    stream = io.TextIOWrapper(io.BufferedReader(body), encoding='utf-8', newline='')
+    try:
+        stats = CatalogImporter(commit_every=max_rows + 1, on_error=on_error).run(capped(parse_records(stream, fmt)))
+    except UnicodeDecodeError:
+        return jsonify({'error': 'Body must be UTF-8 encoded'}), 400
+    except RequestEntityTooLarge:
+        return jsonify(too_large), 413
+    rejected = stats['duplicates'] + stats['invalid']
+    return jsonify({
+        'imported': stats['imported'],
+        'duplicates': stats['duplicates'],
+        'invalid': stats['invalid'],
+        'errors': errors,
+        'errors_truncated': rejected > len(errors)
+    }), 200
+
 @indoor_plants_bp.route('/', methods=['GET'])
 def list_indoor_plants():
+    """Liste paginée du catalogue.
+
+    Paramètres : search, difficulty, family, limit (borné par le serveur),
+    cursor (en-tête X-Next-Cursor de la page précédente), count=true pour
+    obtenir X-Total-Count.
+    """
     query = IndoorPlant.query
+    order = CATALOG_ORDER
     search = request.args.get('search')
     if search:
-        query = query.filter(
-            IndoorPlant.scientific_name.ilike(f'%{search}%') |
-            IndoorPlant.common_names.ilike(f'%{search}%')
-        )
+        # Index plein texte, résultats classés par pertinence
+        query, order = catalog_search.apply(query, search)
     
     difficulty = request.args.get('difficulty')
     if difficulty:
@@ -80,9 +168,46 @@ def list_indoor_plants():
     family = request.args.get('family')
     if family:
         query = query.filter(IndoorPlant.family == family)
-    
-    plants = query.all()
-    return jsonify([p.to_dict() for p in plants]), 200
+
+    fingerprint = filters_fingerprint({'search': search, 'difficulty': difficulty, 'family': family})
+    limit = catalog_pagination.page_limit(request.args.get('limit', type=int))
+    try:
+        plants, next_cursor = catalog_pagination.page(
+            query.add_columns(*(key for key, _ in order)), order, limit, request.args.get('cursor'), fingerprint
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify([p.to_dict() for p in plants])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        params = {key: value for key, value in request.args.items() if key != 'cursor'}
+        params['cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for(".list_indoor_plants", **params)}>; rel="next"'
+    if request.args.get('count', '').lower() == 'true':
+        # Total mis en cache pour cette version du catalogue
+        total = catalog_pagination.total(f'{fingerprint}:{species_cache.version()}', query.order_by(None).count)
+        response.headers['X-Total-Count'] = str(total)
+    return response, 200
+
+@indoor_plants_bp.route('/export', methods=['GET'])
+def export_indoor_plants():
+    """Exporte tout le catalogue en flux (JSONL ou CSV), compressé si le client accepte gzip."""
+    fmt = request.args.get('format', 'jsonl')
+    if fmt not in FORMATS:
+        return jsonify({'error': 'Format must be jsonl or csv'}), 400
+
+    chunks = export_chunks(fmt)
+    compress = request.accept_encodings['gzip'] > 0
+    if compress:
+        chunks = gzip_chunks(chunks)
+    # Pas de Content-Length : envoi par morceaux (chunked) au fil du curseur
+    response = Response(stream_with_context(chunks), mimetype=FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="indoor-plants.{fmt}"'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
 
 @indoor_plants_bp.route('/<int:plant_id>', methods=['GET'])
 def get_indoor_plant(plant_id):
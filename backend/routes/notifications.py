@@ -12,10 +12,9 @@ from models.notification import (
 from routes.auth import jwt_required, get_current_user
 from services.notification_service import NotificationService
 from services.notification_scheduler import NotificationScheduler
+from services.conditional import collection_validators, not_modified, with_validators
 import logging
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 notifications_bp = Blueprint('notifications', __name__)
@@ -63,6 +62,12 @@ def get_user_notifications():
             except ValueError:
                 return jsonify({'error': 'Type de notification invalide'}), 400
         
+        # Validateur calculé avant tout chargement : 304 sans sérialisation
+        etag, last_modified = collection_validators(query, Notification.updated_at, user.id)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
         # Tri par date de création décroissante
         query = query.order_by(Notification.created_at.desc())
         
@@ -72,12 +77,13 @@ def get_user_notifications():
         # Conversion en dictionnaire
         notifications_data = [notif.to_dict() for notif in notifications]
         
-        return jsonify({
+        response = jsonify({
             'notifications': notifications_data,
             'total': query.count(),
             'limit': limit,
             'offset': offset
-        }), 200
+        })
+        return with_validators(response, etag, last_modified), 200
         
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des notifications: {str(e)}")
@@ -243,19 +249,25 @@ def get_notification_preferences():
         if not user:
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
         
-        preferences = NotificationPreferences.query.filter_by(
-            user_id=user.id
-        ).all()
+        query = NotificationPreferences.query.filter_by(user_id=user.id)
+        etag, last_modified = collection_validators(query, NotificationPreferences.updated_at, user.id)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
+        preferences = query.all()
         
         # Créer des préférences par défaut si elles n'existent pas
         if not preferences:
             preferences = notification_service.create_default_preferences(user.id)
+            etag, last_modified = collection_validators(query, NotificationPreferences.updated_at, user.id)
         
         preferences_data = [pref.to_dict() for pref in preferences]
         
-        return jsonify({
+        response = jsonify({
             'preferences': preferences_data
-        }), 200
+        })
+        return with_validators(response, etag, last_modified), 200
         
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des préférences: {str(e)}")
@@ -5,6 +5,8 @@ from models.user_plant import UserPlant
 from models.watering_history import WateringHistory
 from routes.auth import jwt_required, get_current_user
 from services.watering_algorithm import WateringAlgorithm
+from services.conditional import collection_validators, not_modified, with_validators
+from services.species_cache import species_cache
 from datetime import datetime, date
 import os
 
@@ -18,12 +20,20 @@ def get_my_plants():
         user = get_current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
-        plants = UserPlant.query.filter_by(user_id=user.id).all()
-        
-        return jsonify({
+        query = UserPlant.query.filter_by(user_id=user.id)
+        # Les espèces sont incluses dans la réponse : la version du catalogue entre dans l'ETag
+        etag, last_modified = collection_validators(query, UserPlant.updated_at, user.id, species_cache.version())
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        plants = query.all()
+        species_cache.get_many(plant.species_id for plant in plants)
+        
+        response = jsonify({
             'plants': [plant.to_dict() for plant in plants],
             'total': len(plants)
-        }), 200
+        })
+        return with_validators(response, etag, last_modified), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
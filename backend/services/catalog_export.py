@@ -0,0 +1,84 @@
+"""
+Export en flux du catalogue des espèces (JSONL ou CSV).
+
+Exporter via ``list_indoor_plants`` matérialiserait toutes les lignes puis une
+seule chaîne JSON géante. Ici, les lignes sont lues par un curseur côté
+serveur (``yield_per``, ``EXPORT_BATCH_SIZE`` lignes en mémoire au plus),
+formatées au fil de l'eau et regroupées en morceaux d'environ
+``EXPORT_CHUNK_BYTES`` octets, éventuellement compressés en gzip par un
+compresseur incrémental. La mémoire utilisée ne dépend pas de la taille du
+catalogue. Les colonnes et valeurs sont celles qu'accepte l'import
+(``flask catalog import``) : un export se réimporte tel quel.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+
+from models.indoor_plant import IndoorPlant
+from models.user import db
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+COLUMNS = [column.key for column in IndoorPlant.__table__.columns]
+
+
+def iter_species() -> Iterator[dict]:
+    """Parcourt le catalogue par identifiant croissant, lot par lot sur un curseur côté serveur."""
+    result = db.session.execute(
+        select(IndoorPlant.__table__).order_by(IndoorPlant.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for row in result.mappings():
+        yield dict(row)
+
+
+def _format_rows(rows: Iterable[dict], fmt: str) -> Iterator[str]:
+    if fmt == 'jsonl':
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([
+            ('true' if value else 'false') if isinstance(value, bool) else ('' if value is None else value)
+            for value in (row[column] for column in COLUMNS)
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_chunks(fmt: str, rows: Iterable[dict] = None) -> Iterator[bytes]:
+    """Morceaux UTF-8 de l'export, d'environ ``EXPORT_CHUNK_BYTES`` octets."""
+    pending, size = [], 0
+    for text in _format_rows(iter_species() if rows is None else rows, fmt):
+        data = text.encode('utf-8')
+        pending.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b''.join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b''.join(pending)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compresse un flux de morceaux au format gzip sans le matérialiser."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,151 @@
+"""
+Pagination par curseur (keyset) du catalogue des plantes d'intérieur.
+
+``GET /indoor-plants/`` sérialisait tout le catalogue à chaque appel. Les pages
+sont désormais bornées (``INDOOR_PLANTS_MAX_PAGE_SIZE``) et la suivante est
+désignée par un curseur opaque : les clés de tri de la dernière ligne servie
+(``scientific_name, id`` par défaut, pertinence puis ``id`` pour une
+recherche), encodées en base64. La page suivante reprend par
+``WHERE (clés) > (curseur)`` sur l'index, sans OFFSET : son coût ne dépend ni
+de la taille du catalogue ni de la profondeur de la page. Le curseur porte
+l'empreinte des filtres de la requête qui l'a produit et est refusé avec
+d'autres filtres.
+
+Le total n'est calculé que sur demande (``count=true``) et mis en cache par
+jeu de filtres et version du catalogue pendant ``INDOOR_PLANTS_COUNT_TTL``
+secondes : toute modification du catalogue, sur n'importe quel worker, change
+la clé.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+
+from services.metrics import register_collector
+
+# Clé de tri : (expression, décroissant)
+SortKey = Tuple[Any, bool]
+
+
+def filters_fingerprint(filters: Dict[str, Optional[str]]) -> str:
+    """Empreinte courte des filtres d'une requête, liée au curseur."""
+    canonical = json.dumps(filters, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+
+def encode_cursor(values: Sequence[Any], fingerprint: str) -> str:
+    payload = json.dumps([fingerprint, list(values)], separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, fingerprint: str, size: int) -> List[Any]:
+    """Retourne les clés de tri du curseur ; ValueError s'il est invalide ou d'une autre requête."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        owner, values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError('Curseur invalide') from e
+    if owner != fingerprint or not isinstance(values, list) or len(values) != size:
+        raise ValueError('Curseur invalide pour cette requête')
+    # Les clés sont des colonnes texte ou numériques, l'identifiant en dernier (bool exclu : sous-classe d'int)
+    if any(isinstance(value, bool) or not isinstance(value, (str, int, float)) for value in values) \
+            or not isinstance(values[-1], int):
+        raise ValueError('Curseur invalide')
+    return values
+
+
+def keyset_filter(order: Sequence[SortKey], values: Sequence[Any]):
+    """Condition « après ``values`` » dans l'ordre ``order``."""
+    if all(descending == order[0][1] for _, descending in order):
+        row, after = tuple_(*(key for key, _ in order)), tuple_(*values)
+        return row < after if order[0][1] else row > after
+    # Directions mélangées (pertinence décroissante, id croissant) : forme développée
+    clauses = []
+    for index, (key, descending) in enumerate(order):
+        equal = [previous == value for (previous, _), value in zip(order[:index], values)]
+        clauses.append(and_(*equal, key < values[index] if descending else key > values[index]))
+    return or_(*clauses)
+
+
+class CatalogPaginator:
+    """Découpe les requêtes du catalogue en pages bornées et met en cache les totaux."""
+
+    def __init__(self, page_size: int = 50, max_page_size: int = 200, count_ttl: float = 60,
+                 max_counts: int = 1000):
+        self._lock = threading.Lock()
+        self._counts = OrderedDict()
+        self.max_counts = max_counts
+        self.configure(page_size, max_page_size, count_ttl)
+
+    def configure(self, page_size: int, max_page_size: int, count_ttl: float):
+        with self._lock:
+            self.max_page_size = max(1, max_page_size)
+            self.page_size = max(1, min(page_size, self.max_page_size))
+            self.count_ttl = count_ttl
+            self._counts.clear()
+            self.pages = 0
+            self.count_hits = 0
+            self.count_misses = 0
+
+    def page_limit(self, requested: Optional[int]) -> int:
+        """Taille de page effective : valeur demandée bornée par le maximum du serveur."""
+        if not requested or requested < 1:
+            return self.page_size
+        return min(requested, self.max_page_size)
+
+    def page(self, query, order: Sequence[SortKey], limit: int, cursor: Optional[str],
+             fingerprint: str) -> Tuple[List[Any], Optional[str]]:
+        """Retourne les lignes de la page et le curseur de la suivante (None en fin de liste).
+
+        ``query`` doit exposer chaque clé de tri en colonne supplémentaire après
+        l'entité ; ValueError si ``cursor`` est invalide.
+        """
+        if cursor:
+            query = query.filter(keyset_filter(order, decode_cursor(cursor, fingerprint, len(order))))
+        ordered = [key.desc() if descending else key.asc() for key, descending in order]
+        rows = query.order_by(*ordered).limit(limit + 1).all()
+        with self._lock:
+            self.pages += 1
+        if len(rows) <= limit:
+            return [row[0] for row in rows], None
+        rows = rows[:limit]
+        return [row[0] for row in rows], encode_cursor(rows[-1][1:], fingerprint)
+
+    def total(self, key: str, count: Callable[[], int]) -> int:
+        """Nombre total de résultats pour la clé ``key``, recalculé au plus toutes les ``count_ttl`` secondes."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None and entry[1] > now:
+                self._counts.move_to_end(key)
+                self.count_hits += 1
+                return entry[0]
+            self.count_misses += 1
+        value = count()
+        with self._lock:
+            if self.count_ttl > 0:
+                self._counts[key] = (value, now + self.count_ttl)
+                self._counts.move_to_end(key)
+                while len(self._counts) > self.max_counts:
+                    self._counts.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'pages': self.pages,
+                'count_hits': self.count_hits,
+                'count_misses': self.count_misses,
+                'cached_counts': len(self._counts),
+            }
+
+
+# Instance globale de la pagination du catalogue
+catalog_pagination = CatalogPaginator()
+register_collector('catalog_pagination', catalog_pagination.stats)
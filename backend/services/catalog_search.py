@@ -0,0 +1,201 @@
+"""
+Recherche plein texte dans le catalogue des plantes d'intérieur.
+
+La recherche ``ilike('%terme%')`` parcourait toute la table à chaque frappe
+dans le champ de recherche. Sous SQLite, une table virtuelle FTS5
+(``indoor_plants_fts``, contenu externe ``indoor_plants``) indexe le nom
+scientifique et les noms communs avec le tokenizer ``unicode61
+remove_diacritics 2`` : « fougere » trouve « Fougère ». Des triggers la
+tiennent à jour à chaque INSERT, UPDATE et DELETE, y compris hors ORM. Elle
+n'est reconstruite au démarrage que si elle vient d'être créée ou si ses
+triggers manquent (table ``indoor_plants`` supprimée puis recréée : l'index
+ne correspond plus à son contenu), ou à la demande par ``flask catalog
+reindex``. Chaque mot recherché est un préfixe (« monst » trouve
+« Monstera ») et les résultats sont classés par BM25, le nom scientifique
+pesant plus que les noms communs. Un index de mots ne trouve pas un fragment
+pris au milieu d'un mot (« stera ») : quand aucun mot indexé ne correspond,
+la recherche retombe sur la comparaison ``ilike`` historique.
+
+Sous MySQL, un index FULLTEXT sur les mêmes colonnes joue ce rôle (mode
+booléen, préfixes, classement par pertinence ; les collations ``*_ci`` ignorent
+déjà les accents). Sur les autres bases, ou si SQLite n'a pas FTS5, la
+recherche reste la comparaison ``ilike`` historique.
+"""
+import logging
+import re
+import threading
+from typing import Dict, List
+
+from sqlalchemy import column, false, literal_column, table, text
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.exc import OperationalError
+
+from models.indoor_plant import IndoorPlant
+from models.user import db
+from services.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'indoor_plants_fts'
+MYSQL_INDEX = 'ft_indoor_plants_search'
+
+# Poids BM25 des colonnes indexées : nom scientifique, noms communs
+BM25_WEIGHTS = (2.0, 1.0)
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        scientific_name, common_names,
+        content='indoor_plants', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS indoor_plants_fts_insert AFTER INSERT ON indoor_plants BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, scientific_name, common_names)
+        VALUES (new.id, new.scientific_name, new.common_names);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS indoor_plants_fts_delete AFTER DELETE ON indoor_plants BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, scientific_name, common_names)
+        VALUES ('delete', old.id, old.scientific_name, old.common_names);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS indoor_plants_fts_update AFTER UPDATE ON indoor_plants BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, scientific_name, common_names)
+        VALUES ('delete', old.id, old.scientific_name, old.common_names);
+        INSERT INTO {FTS_TABLE}(rowid, scientific_name, common_names)
+        VALUES (new.id, new.scientific_name, new.common_names);
+    END""",
+]
+
+# Réaligne l'index sur la table (base restaurée, table recréée...)
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+fts_table = table(FTS_TABLE, column('rowid'))
+
+# Ordre du catalogue hors recherche (index ix_indoor_plants_scientific_name_id)
+CATALOG_ORDER = [(IndoorPlant.scientific_name, False), (IndoorPlant.id, False)]
+
+
+def search_terms(search: str) -> List[str]:
+    """Découpe la saisie en mots ; la ponctuation et les opérateurs sont ignorés."""
+    return re.findall(r'\w+', search)
+
+
+class CatalogSearch:
+    """Filtre et classe les requêtes du catalogue selon la stratégie de la base."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.mode = 'like'
+        self.searches = 0
+        self.fallbacks = 0
+        self.rebuilds = 0
+
+    def init_app(self, app):
+        """Crée l'index plein texte adapté à la base de l'application."""
+        with app.app_context():
+            dialect = db.engine.dialect.name
+            rebuilt = False
+            try:
+                if dialect == 'sqlite':
+                    with db.engine.begin() as connection:
+                        # Les triggers disparaissent avec indoor_plants : leur absence signale un index périmé
+                        existing = set(connection.execute(text(
+                            "SELECT name FROM sqlite_master WHERE name IN (:table, :trigger)"
+                        ), {'table': FTS_TABLE, 'trigger': 'indoor_plants_fts_insert'}).scalars())
+                        for statement in SQLITE_DDL:
+                            connection.execute(text(statement))
+                        if len(existing) < 2:
+                            connection.execute(text(SQLITE_REBUILD))
+                            rebuilt = True
+                    mode = 'fts5'
+                elif dialect in ('mysql', 'mariadb'):
+                    with db.engine.begin() as connection:
+                        exists = connection.execute(text(
+                            "SELECT COUNT(*) FROM information_schema.statistics "
+                            "WHERE table_schema = DATABASE() AND table_name = 'indoor_plants' "
+                            "AND index_name = :name"
+                        ), {'name': MYSQL_INDEX}).scalar()
+                        if not exists:
+                            connection.execute(text(
+                                f"ALTER TABLE indoor_plants ADD FULLTEXT INDEX {MYSQL_INDEX} "
+                                "(scientific_name, common_names)"
+                            ))
+                    mode = 'fulltext'
+                else:
+                    mode = 'like'
+            except OperationalError as e:
+                logger.warning(f"Index plein texte indisponible, recherche par ilike : {e}")
+                mode = 'like'
+        with self._lock:
+            self.mode = mode
+            self.rebuilds += int(rebuilt)
+
+    def reindex(self) -> bool:
+        """Reconstruit l'index FTS5 depuis la table ; False si la base n'en a pas besoin."""
+        if self.mode != 'fts5':
+            return False
+        with db.engine.begin() as connection:
+            connection.execute(text(SQLITE_REBUILD))
+        with self._lock:
+            self.rebuilds += 1
+        return True
+
+    @staticmethod
+    def _like(query, search: str):
+        return query.filter(
+            IndoorPlant.scientific_name.ilike(f'%{search}%') |
+            IndoorPlant.common_names.ilike(f'%{search}%')
+        ), CATALOG_ORDER
+
+    def _fallback(self, query, search: str):
+        with self._lock:
+            self.fallbacks += 1
+        return self._like(query, search)
+
+    def apply(self, query, search: str):
+        """Restreint ``query`` aux plantes correspondant à ``search``.
+
+        Retourne la requête et son ordre (clés de tri, les plus pertinentes d'abord).
+        """
+        with self._lock:
+            self.searches += 1
+            mode = self.mode
+        if mode == 'like':
+            return self._like(query, search)
+
+        terms = search_terms(search)
+        if not terms:
+            return query.filter(false()), CATALOG_ORDER
+
+        # Aucun mot indexé ne correspond (fragment pris au milieu d'un mot) : recherche par sous-chaîne
+        if mode == 'fts5':
+            fts = literal_column(FTS_TABLE)
+            matched = fts.op('MATCH')(' '.join(f'"{term}"*' for term in terms))
+            if db.session.query(fts_table.c.rowid).filter(matched).limit(1).first() is None:
+                return self._fallback(query, search)
+            ranked = db.session.query(
+                fts_table.c.rowid.label('plant_id'),
+                db.func.bm25(fts, *BM25_WEIGHTS).label('rank')
+            ).filter(matched).subquery()
+            return query.join(ranked, ranked.c.plant_id == IndoorPlant.id), [(ranked.c.rank, False), (IndoorPlant.id, False)]
+
+        relevance = mysql_match(
+            IndoorPlant.scientific_name, IndoorPlant.common_names,
+            against=' '.join(f'+{term}*' for term in terms)
+        ).in_boolean_mode()
+        if db.session.query(IndoorPlant.id).filter(relevance).limit(1).first() is None:
+            return self._fallback(query, search)
+        return query.filter(relevance), [(relevance, True), (IndoorPlant.id, False)]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'searches': self.searches,
+                'fallbacks': self.fallbacks,
+                'rebuilds': self.rebuilds,
+                'fts5': int(self.mode == 'fts5'),
+                'fulltext': int(self.mode == 'fulltext'),
+            }
+
+
+# Instance globale de la recherche dans le catalogue
+catalog_search = CatalogSearch()
+register_collector('catalog_search', catalog_search.stats)
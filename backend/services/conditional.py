@@ -0,0 +1,70 @@
+"""
+Réponses conditionnelles (ETag / Last-Modified) pour les routes de lecture.
+
+Le validateur d'une collection est dérivé d'une seule requête agrégée
+``count(*), max(updated_at)`` sur la requête filtrée (sans tri ni pagination),
+servie par les index composites ``(propriétaire, updated_at)``. Toute création,
+modification ou suppression change l'un des deux termes, donc l'ETag. Quand
+l'en-tête ``If-None-Match`` correspond, la route répond 304 sans charger ni
+sérialiser les lignes.
+"""
+import hashlib
+from datetime import datetime
+from typing import Optional, Tuple
+
+from flask import Response, request
+from sqlalchemy import func
+
+# Les réponses dépendent de l'utilisateur : pas de cache partagé, revalidation systématique
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts) -> str:
+    """Condense des éléments arbitraires (compteurs, dates, paramètres) en ETag."""
+    raw = '|'.join(repr(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def collection_validators(query, updated_column, *scope) -> Tuple[str, Optional[datetime]]:
+    """Calcule ``(etag, last_modified)`` d'une requête de collection.
+
+    ``scope`` distingue les réponses d'une même collection (utilisateur,
+    ressource parente) et doit porter la version de toute donnée incluse dans
+    la réponse hors de ``query`` (espèces de ``my-plants``) ; les paramètres de
+    la requête HTTP sont toujours inclus pour que chaque filtre ou page ait son
+    propre validateur.
+    """
+    count, last_modified = (
+        query.order_by(None)
+        .with_entities(func.count(), func.max(updated_column))
+        .one()
+    )
+    args = sorted(request.args.items(multi=True))
+    return make_etag(count, last_modified, args, *scope), last_modified
+
+
+def resource_validators(updated_at: Optional[datetime], *scope) -> Tuple[str, Optional[datetime]]:
+    """Calcule ``(etag, last_modified)`` d'une ressource unitaire déjà chargée."""
+    return make_etag(updated_at, *scope), updated_at
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """Retourne une réponse 304 si ``If-None-Match`` correspond à l'ETag, sinon None.
+
+    Seul ``If-None-Match`` est évalué : ``max(updated_at)`` ne change pas quand
+    une ligne plus ancienne est supprimée, ``If-Modified-Since`` servirait alors
+    une réponse périmée.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Ajoute ETag faible, Last-Modified et Cache-Control à une réponse."""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
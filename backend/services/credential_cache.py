@@ -0,0 +1,68 @@
+"""
+Cache mémoire des identifiants de services externes déchiffrés.
+
+Chaque appel sortant (météo, IA...) cherchait la clé API active de
+l'utilisateur puis la déchiffrait ; le scheduler répète ces opérations pour
+chaque plante. Ce cache conserve la clé en clair quelques dizaines de
+secondes, indexée par ``(user_id, service_name)``, uniquement en mémoire du
+processus. L'absence de clé est aussi mémorisée. Les routes ``/api/keys``
+invalident l'entrée à chaque création, modification ou suppression ; la durée
+de vie borne le décalage entre workers.
+"""
+import logging
+from typing import Optional, Tuple
+
+from cryptography.fernet import InvalidToken
+
+from models.api_key import ApiKey
+from services.metrics import register_collector
+from services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CredentialCache:
+    """Cache TTL des clés API déchiffrées, indexé par ``(user_id, service_name)``."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def configure(self, max_size: int, ttl: float):
+        self._cache.configure(max_size=max_size, ttl=ttl)
+
+    def lookup(self, user_id, service_name: str) -> Optional[Tuple[int, str]]:
+        """Retourne ``(identifiant, clé déchiffrée)`` de la clé active, ou None si l'utilisateur n'en a pas."""
+        key = (user_id, service_name)
+        credential = self._cache.get(key, _MISSING)
+        if credential is not _MISSING:
+            return credential
+        record = ApiKey.get_active_key_for_service(user_id, service_name)
+        credential = None
+        if record:
+            try:
+                credential = (record.id, record.decrypt_key())
+            except InvalidToken:
+                logger.error(f"Clé API {record.id} indéchiffrable avec le trousseau courant")
+        self._cache.set(key, credential)
+        return credential
+
+    def get(self, user_id, service_name: str) -> Optional[str]:
+        """Retourne la clé active déchiffrée, ou None si l'utilisateur n'en a pas."""
+        credential = self.lookup(user_id, service_name)
+        return credential[1] if credential else None
+
+    def invalidate(self, user_id, service_name: str):
+        self._cache.invalidate((user_id, service_name))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+# Instance globale du cache d'identifiants
+credential_cache = CredentialCache()
+register_collector('credential_cache', credential_cache.stats)
@@ -0,0 +1,161 @@
+"""
+Client HTTP sortant mutualisé : pool de connexions, nouvelles tentatives et disjoncteur.
+
+Une ``requests.Session`` partagée garde les connexions ouvertes vers le
+fournisseur (keep-alive) au lieu d'ouvrir une connexion TLS par appel. Les
+erreurs transitoires (réseau, délai, 429, 5xx) sont retentées un nombre borné
+de fois avec un délai exponentiel à gigue aléatoire, pour ne pas synchroniser
+les workers. Après ``failure_threshold`` échecs consécutifs, le disjoncteur
+s'ouvre : les appels échouent immédiatement (``CircuitOpenError``) pendant
+``reset_timeout`` secondes, puis un seul appel d'essai décide de sa fermeture.
+Les réponses 4xx (clé refusée...) ne comptent pas comme des pannes.
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.metrics import register_collector
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Le disjoncteur est ouvert : le fournisseur n'est pas appelé."""
+
+
+class CircuitBreaker:
+    """Disjoncteur fermé / ouvert / semi-ouvert à seuil d'échecs consécutifs."""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self._lock = threading.Lock()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Indique si un appel peut partir ; en semi-ouvert, un seul appel d'essai passe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """Session HTTP partagée avec nouvelles tentatives à gigue et disjoncteur."""
+
+    def __init__(self, pool_size: int = 10, timeout: float = 5, retries: int = 2, backoff: float = 0.2,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        self._lock = threading.Lock()
+        self._session = None
+        # Appelé avant chaque tentative (quota du fournisseur), peut bloquer
+        self.throttle: Optional[Callable[[], None]] = None
+        self.configure(pool_size, timeout, retries, backoff, failure_threshold, reset_timeout)
+
+    def configure(self, pool_size: int, timeout: float, retries: int, backoff: float,
+                  failure_threshold: int, reset_timeout: float):
+        """Recrée la session et referme le disjoncteur avec de nouvelles limites."""
+        with self._lock:
+            old_session = self._session
+            self._session = None
+            self.pool_size = pool_size
+            self.timeout = timeout
+            self.retries = retries
+            self.backoff = backoff
+            self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+            self.counts = {'requests': 0, 'retries': 0, 'failures': 0, 'short_circuits': 0}
+        if old_session:
+            old_session.close()
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """GET avec nouvelles tentatives ; lève ``CircuitOpenError`` sans appel si le disjoncteur est ouvert.
+
+        Les autres erreurs sont celles de ``requests`` (``raise_for_status`` est
+        appelé sur la dernière réponse).
+        """
+        breaker = self.breaker
+        if not breaker.allow():
+            self._count('short_circuits')
+            raise CircuitOpenError(f"Circuit ouvert pour {url}")
+        kwargs.setdefault('timeout', self.timeout)
+        session = self._get_session()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count('retries')
+                # Délai exponentiel à gigue complète
+                time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+            if self.throttle:
+                self.throttle()
+            self._count('requests')
+            try:
+                response = session.get(url, params=params, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                failure = error
+                continue
+            except requests.exceptions.RequestException:
+                self._count('failures')
+                breaker.record_failure()
+                raise
+            if response.status_code in RETRYABLE_STATUSES:
+                failure = None
+                continue
+            breaker.record_success()
+            response.raise_for_status()
+            return response
+        self._count('failures')
+        breaker.record_failure()
+        if failure is not None:
+            raise failure
+        response.raise_for_status()
+        return response
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.counts)
+        stats['circuit_open'] = int(self.breaker.state != CircuitBreaker.CLOSED)
+        stats['circuit_trips'] = self.breaker.trips
+        return stats
+
+
+# Client partagé des appels au fournisseur météo
+weather_http = HttpClient()
+register_collector('weather_http', weather_http.stats)
@@ -0,0 +1,68 @@
+"""
+Cache d'identité des utilisateurs authentifiés.
+
+Chaque requête authentifiée chargeait la ligne ``users`` par clé primaire ;
+ce cache conserve pour une courte durée une copie détachée de l'utilisateur
+afin que la plupart des lectures n'interrogent pas la table. Les copies sont
+en lecture seule : toute modification doit passer par une instance chargée
+depuis la session, puis invalider le cache.
+"""
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+from models.user import db, User
+from services.metrics import register_collector
+from services.ttl_cache import TTLCache
+
+
+class IdentityCache:
+    """Cache TTL d'instantanés détachés de ``User`` indexés par identifiant."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def configure(self, max_size: int, ttl: float):
+        self._cache.configure(max_size=max_size, ttl=ttl)
+
+    @staticmethod
+    def _snapshot(user: User) -> User:
+        """Copie les colonnes chargées dans une instance détachée indépendante de la session."""
+        values = {column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs}
+        snapshot = User(**values)
+        make_transient_to_detached(snapshot)
+        return snapshot
+
+    def get_user(self, user_id) -> Optional[User]:
+        """Retourne l'utilisateur depuis le cache, ou le charge et le mémorise."""
+        snapshot = self._cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = self._snapshot(user)
+        self._cache.set(user_id, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id):
+        self._cache.invalidate(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+# Instance globale du cache d'identité
+identity_cache = IdentityCache()
+register_collector('identity_cache', identity_cache.stats)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_write(mapper, connection, target):
+    """Filet de sécurité : toute écriture ORM sur un utilisateur (désactivation comprise) l'invalide."""
+    identity_cache.invalidate(target.id)
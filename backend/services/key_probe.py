@@ -0,0 +1,176 @@
+"""
+Vérification des clés API auprès des fournisseurs.
+
+Chaque service déclare une requête de sonde peu coûteuse (liste des modèles,
+identité du compte...). Les sondes d'un utilisateur s'exécutent en parallèle
+sur un pool de threads borné partagé par le processus, avec une session HTTP
+persistante par service (connexions réutilisées), un délai propre à chaque
+service et une échéance globale : l'appelant attend la sonde la plus lente,
+pas la somme des sondes. Les URL des sondes sont configurables
+(``KEY_PROBE_URLS``) pour pointer vers un proxy ou un serveur de test.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.metrics import register_collector
+
+# Requête de sonde par service ; ``{key}`` est remplacé par la clé en clair
+PROBES = {
+    'openai': {
+        'url': 'https://api.openai.com/v1/models',
+        'headers': {'Authorization': 'Bearer {key}'},
+    },
+    'claude': {
+        'url': 'https://api.anthropic.com/v1/models',
+        'headers': {'x-api-key': '{key}', 'anthropic-version': '2023-06-01'},
+    },
+    'gemini': {
+        'url': 'https://generativelanguage.googleapis.com/v1beta/models',
+        'params': {'key': '{key}'},
+    },
+    'huggingface': {
+        'url': 'https://huggingface.co/api/whoami-v2',
+        'headers': {'Authorization': 'Bearer {key}'},
+    },
+    'openweathermap': {
+        'url': 'https://api.openweathermap.org/data/2.5/weather',
+        'params': {'q': 'Paris', 'appid': '{key}'},
+        'timeout': 3,
+    },
+}
+
+
+def parse_service_map(value: Optional[str]) -> Dict[str, str]:
+    """Lit une liste ``service=valeur`` séparée par des virgules (``KEY_PROBE_URLS``, ``KEY_PROBE_TIMEOUTS``)."""
+    mapping = {}
+    for item in (value or '').split(','):
+        service, _, setting = item.partition('=')
+        if service.strip() and setting.strip():
+            mapping[service.strip()] = setting.strip()
+    return mapping
+
+
+class KeyProber:
+    """Sonde des clés API en parallèle avec délais par service et échéance globale."""
+
+    def __init__(self, workers: int = 8, timeout: float = 5, deadline: float = 8):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._sessions: Dict[str, requests.Session] = {}
+        self.workers = workers
+        self.timeout = timeout
+        self.deadline = deadline
+        self.urls: Dict[str, str] = {}
+        self.timeouts: Dict[str, float] = {}
+        self.counts = {'ok': 0, 'invalid': 0, 'error': 0, 'timeout': 0}
+
+    def configure(self, workers: int, timeout: float, deadline: float,
+                  urls: Dict[str, str] = None, timeouts: Dict[str, float] = None):
+        """Recrée le pool et les sessions avec de nouvelles limites."""
+        with self._lock:
+            old_executor, old_sessions = self._executor, self._sessions
+            self._executor = None
+            self._sessions = {}
+            self.workers = workers
+            self.timeout = timeout
+            self.deadline = deadline
+            self.urls = dict(urls or {})
+            self.timeouts = dict(timeouts or {})
+        if old_executor:
+            old_executor.shutdown(wait=False)
+        for session in old_sessions.values():
+            session.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='key-probe')
+            return self._executor
+
+    def _session(self, service_name: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(service_name)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[service_name] = session
+            return session
+
+    def timeout_for(self, service_name: str) -> float:
+        probe = PROBES.get(service_name, {})
+        return self.timeouts.get(service_name, probe.get('timeout', self.timeout))
+
+    def probe(self, service_name: str, api_key: str) -> Dict:
+        """Sonde une clé ; retourne ``status`` (ok, invalid, error, timeout), ``http_status`` et ``latency_ms``."""
+        spec = PROBES.get(service_name)
+        if spec is None:
+            return self._result('error', None, 0, 'Service sans sonde')
+
+        def fill(values):
+            return {name: value.format(key=api_key) for name, value in values.items()}
+
+        started = time.monotonic()
+        try:
+            response = self._session(service_name).get(
+                self.urls.get(service_name, spec['url']),
+                headers=fill(spec.get('headers', {})),
+                params=fill(spec.get('params', {})),
+                timeout=self.timeout_for(service_name),
+            )
+        except requests.exceptions.Timeout:
+            return self._result('timeout', None, started, 'Délai dépassé')
+        except requests.exceptions.RequestException:
+            return self._result('error', None, started, 'Fournisseur injoignable')
+        if response.ok:
+            return self._result('ok', response.status_code, started)
+        if response.status_code in (401, 403):
+            return self._result('invalid', response.status_code, started, 'Clé refusée par le fournisseur')
+        return self._result('error', response.status_code, started, 'Réponse inattendue du fournisseur')
+
+    def _result(self, status: str, http_status: Optional[int], started: float, message: str = None) -> Dict:
+        with self._lock:
+            self.counts[status] += 1
+        return {
+            'status': status,
+            'http_status': http_status,
+            'latency_ms': round((time.monotonic() - started) * 1000) if started else 0,
+            'message': message,
+        }
+
+    def probe_all(self, keys: List[Tuple[int, str, str]]) -> Dict[int, Dict]:
+        """Sonde ``(identifiant, service, clé)`` en parallèle ; retourne les résultats par identifiant.
+
+        Les sondes non terminées à l'échéance globale sont rapportées en
+        ``timeout`` ; elles s'arrêtent d'elles-mêmes au délai de leur service.
+        """
+        executor = self._get_executor()
+        futures = {key_id: executor.submit(self.probe, service_name, api_key)
+                   for key_id, service_name, api_key in keys}
+        wait(futures.values(), timeout=self.deadline)
+        results = {}
+        for key_id, future in futures.items():
+            if future.done():
+                results[key_id] = future.result()
+            else:
+                future.cancel()
+                with self._lock:
+                    self.counts['timeout'] += 1
+                results[key_id] = {'status': 'timeout', 'http_status': None,
+                                   'latency_ms': round(self.deadline * 1000), 'message': 'Échéance globale dépassée'}
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.counts)
+
+
+# Instance globale du sondeur de clés
+key_prober = KeyProber()
+register_collector('key_probe', key_prober.stats)
@@ -0,0 +1,157 @@
+"""
+Re-chiffrement en ligne des clés API après une rotation de ``ENCRYPTION_KEY``.
+
+Les lignes ``api_keys`` sont parcourues par identifiant croissant, par lots
+bornés validés chacun dans sa propre transaction : le verrou d'écriture n'est
+tenu que le temps d'un lot et l'application continue de servir pendant la
+rotation. Chaque ligne est mise à jour par comparaison-échange
+(``WHERE encrypted_key = <ancienne valeur>``) pour ne jamais écraser une clé
+modifiée entre la lecture et l'écriture.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy import select, update
+
+from models.api_key import ApiKey, db
+from services.keyring import keyring
+from services.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+
+class ReencryptionJob:
+    """Re-chiffre les clés API avec la clé primaire, par lots, avec suivi de progression."""
+
+    def __init__(self, chunk_size: int = 200, pause: float = 0.0):
+        self.chunk_size = chunk_size
+        # Pause entre deux lots pour laisser passer les écritures de l'application
+        self.pause = pause
+        self._lock = threading.Lock()
+        self._thread = None
+        self._reset()
+
+    def configure(self, chunk_size: int, pause: float):
+        self.chunk_size = chunk_size
+        self.pause = pause
+
+    def _reset(self):
+        self.status = 'idle'
+        self.total = 0
+        self.processed = 0
+        self.rotated = 0
+        self.failed = 0
+        self.last_id = 0
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+
+    def progress(self) -> Dict:
+        with self._lock:
+            return {
+                'status': self.status,
+                'total': self.total,
+                'processed': self.processed,
+                'rotated': self.rotated,
+                'failed': self.failed,
+                'last_id': self.last_id,
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'error': self.error,
+            }
+
+    def run(self, on_chunk: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Exécute le re-chiffrement complet dans le contexte d'application courant."""
+        with self._lock:
+            if self.status == 'running':
+                raise RuntimeError('Re-chiffrement déjà en cours')
+            self._reset()
+            self.status = 'running'
+            self.started_at = datetime.utcnow()
+        try:
+            self.total = db.session.execute(select(db.func.count(ApiKey.id))).scalar()
+            while self._run_chunk():
+                if on_chunk:
+                    on_chunk(self.progress())
+                if self.pause:
+                    time.sleep(self.pause)
+            status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Erreur lors du re-chiffrement des clés API: {str(e)}")
+            with self._lock:
+                self.error = str(e)
+            status = 'failed'
+        with self._lock:
+            self.status = status
+            self.finished_at = datetime.utcnow()
+        return self.progress()
+
+    def _run_chunk(self) -> bool:
+        rows = db.session.execute(
+            select(ApiKey.id, ApiKey.encrypted_key)
+            .where(ApiKey.id > self.last_id)
+            .order_by(ApiKey.id)
+            .limit(self.chunk_size)
+        ).all()
+        if not rows:
+            return False
+        rotated = failed = 0
+        for key_id, encrypted_key in rows:
+            if not keyring.needs_rotation(encrypted_key):
+                continue
+            try:
+                new_value = keyring.rotate(encrypted_key)
+            except InvalidToken:
+                failed += 1
+                logger.warning(f"Clé API {key_id} indéchiffrable avec le trousseau courant")
+                continue
+            result = db.session.execute(
+                update(ApiKey)
+                .where(ApiKey.id == key_id, ApiKey.encrypted_key == encrypted_key)
+                .values(encrypted_key=new_value, updated_at=ApiKey.updated_at)
+            )
+            rotated += result.rowcount
+        db.session.commit()
+        with self._lock:
+            self.processed += len(rows)
+            self.rotated += rotated
+            self.failed += failed
+            self.last_id = rows[-1][0]
+        return True
+
+    def start(self, app) -> bool:
+        """Lance le re-chiffrement dans un thread d'arrière-plan ; False s'il tourne déjà."""
+        with self._lock:
+            if self.status == 'running' or (self._thread and self._thread.is_alive()):
+                return False
+
+            def target():
+                with app.app_context():
+                    self.run()
+
+            self._thread = threading.Thread(target=target, name='api-key-reencryption', daemon=True)
+            self._thread.start()
+        return True
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'running': 1 if self.status == 'running' else 0,
+                'processed': self.processed,
+                'rotated': self.rotated,
+                'failed': self.failed,
+            }
+
+
+# Instance globale du job de rotation
+reencryption_job = ReencryptionJob()
+register_collector('key_rotation', reencryption_job.stats)
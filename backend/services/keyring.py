@@ -0,0 +1,69 @@
+"""
+Trousseau de clés Fernet partagé par tout le processus.
+
+``ENCRYPTION_KEY`` contient une ou plusieurs clés Fernet séparées par des
+virgules : la première chiffre, toutes déchiffrent (``MultiFernet``). Pour une
+rotation, la nouvelle clé est placée en tête et l'ancienne conservée derrière
+le temps que ``flask keys rotate`` re-chiffre les lignes ``api_keys`` ; elle
+peut ensuite être retirée. Les objets de chiffrement sont construits une seule
+fois, pas à chaque appel.
+"""
+import os
+import threading
+from typing import List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+
+def parse_keys(value: Optional[str]) -> List[bytes]:
+    """Découpe la valeur de ``ENCRYPTION_KEY`` en liste de clés (la primaire en tête)."""
+    return [key.strip().encode() for key in (value or '').split(',') if key.strip()]
+
+
+class Keyring:
+    """Chiffrement / déchiffrement avec une clé primaire et des clés de rotation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._primary = None
+        self._multi = None
+
+    def configure(self, keys: List[bytes]):
+        """Reconstruit le trousseau ; sans clé, en génère une temporaire (développement)."""
+        if not keys:
+            key = Fernet.generate_key()
+            os.environ['ENCRYPTION_KEY'] = key.decode()
+            keys = [key]
+        fernets = [Fernet(key) for key in keys]
+        with self._lock:
+            self._primary = fernets[0]
+            self._multi = MultiFernet(fernets)
+
+    def _ciphers(self):
+        if self._multi is None:
+            self.configure(parse_keys(os.environ.get('ENCRYPTION_KEY')))
+        return self._primary, self._multi
+
+    def encrypt(self, plaintext: str) -> str:
+        return self._ciphers()[1].encrypt(plaintext.encode()).decode()
+
+    def decrypt(self, token: str) -> str:
+        """Déchiffre avec n'importe quelle clé du trousseau (lève ``InvalidToken`` sinon)."""
+        return self._ciphers()[1].decrypt(token.encode()).decode()
+
+    def needs_rotation(self, token: str) -> bool:
+        """Indique si un jeton n'est pas chiffré avec la clé primaire."""
+        primary, _ = self._ciphers()
+        try:
+            primary.decrypt(token.encode())
+        except InvalidToken:
+            return True
+        return False
+
+    def rotate(self, token: str) -> str:
+        """Re-chiffre un jeton avec la clé primaire (lève ``InvalidToken`` si aucune clé ne convient)."""
+        return self._ciphers()[1].rotate(token.encode()).decode()
+
+
+# Instance globale du trousseau
+keyring = Keyring()
@@ -0,0 +1,170 @@
+"""
+Journalisation structurée JSON, asynchrone et échantillonnée.
+
+Les enregistrements sont déposés dans une file par un ``QueueHandler`` (sans
+entrée/sortie sur le thread de requête) puis formatés et écrits par un thread
+d'arrière-plan. Chaque enregistrement porte l'identifiant de corrélation de
+la requête (en-tête ``X-Request-ID``), et les logs INFO des loggers à fort
+volume sont échantillonnés.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+from services.metrics import register_collector
+
+# Attributs standards d'un LogRecord, exclus des champs additionnels
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'method', 'path',
+                                                             'exception'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate un enregistrement en une ligne JSON."""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        if getattr(record, 'path', None):
+            entry['method'] = record.method
+            entry['path'] = record.path
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif getattr(record, 'exception', None):
+            entry['exception'] = record.exception
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute l'identifiant de corrélation et la route de la requête courante."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.path = request.path
+        else:
+            record.request_id = None
+            record.path = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Ne conserve qu'une fraction des logs INFO (et inférieurs) des loggers à fort volume."""
+
+    def __init__(self, rate=1.0, loggers=()):
+        super().__init__()
+        self.rate = rate
+        self.loggers = tuple(loggers)
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or self.rate >= 1.0:
+            return True
+        if not any(record.name == name or record.name.startswith(name + '.') for name in self.loggers):
+            return True
+        if random.random() < self.rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui abandonne l'enregistrement plutôt que de bloquer quand la file est pleine."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        """Copie déposée dans la file : message fusionné, trace d'exception gardée à part.
+
+        L'implémentation de base fusionne la trace dans ``message`` puis efface
+        ``exc_info`` et ``exc_text`` : le ``JsonFormatter`` du thread d'écriture
+        ne pouvait plus produire le champ ``exception``.
+        """
+        exception = record.exc_text
+        if record.exc_info:
+            exception = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.exception = exception
+        return record
+
+
+_handler = None
+_listener = None
+_sampling = SamplingFilter()
+
+
+def configure_logging(app):
+    """Installe la journalisation asynchrone (une seule fois par processus) et les hooks de corrélation."""
+    global _handler, _listener
+    _sampling.rate = app.config['LOG_SAMPLE_RATE']
+    _sampling.loggers = tuple(app.config['LOG_SAMPLED_LOGGERS'])
+
+    root = logging.getLogger()
+    root.setLevel(app.config['LOG_LEVEL'])
+    if _listener is None:
+        log_queue = queue.Queue(maxsize=app.config['LOG_QUEUE_SIZE'])
+        _handler = NonBlockingQueueHandler(log_queue)
+        _handler.addFilter(RequestContextFilter())
+        _handler.addFilter(_sampling)
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JsonFormatter())
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        root.addHandler(_handler)
+
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
+
+
+def _assign_request_id():
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+
+def _echo_request_id(response):
+    if g.get('request_id'):
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+
+def stats():
+    return {
+        'sampled_out': _sampling.dropped,
+        'queue_dropped': _handler.dropped if _handler else 0,
+        'queue_size': _handler.queue.qsize() if _handler else 0,
+    }
+
+
+register_collector('logging', stats)
@@ -0,0 +1,48 @@
+"""
+Registre minimal de métriques exposées au format texte Prometheus.
+
+Les caches et services du backend enregistrent une fonction qui retourne
+leurs compteurs ; la route ``/metrics`` les agrège à chaque collecte. Elle
+n'est servie qu'aux collecteurs autorisés (``scrape_allowed``) : jeton porteur
+``METRICS_TOKEN`` s'il est défini, sinon requêtes locales uniquement.
+"""
+import hmac
+import ipaddress
+import threading
+from typing import Callable, Dict, Optional
+
+_collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+_lock = threading.Lock()
+
+
+def register_collector(name: str, collector: Callable[[], Dict[str, float]]):
+    """Enregistre (ou remplace) un collecteur de métriques nommé."""
+    with _lock:
+        _collectors[name] = collector
+
+
+def collect() -> Dict[str, Dict[str, float]]:
+    """Retourne les métriques courantes de chaque collecteur."""
+    with _lock:
+        collectors = dict(_collectors)
+    return {name: collector() for name, collector in collectors.items()}
+
+
+def render_prometheus() -> str:
+    """Formate les métriques au format d'exposition texte Prometheus."""
+    lines = []
+    for name, values in sorted(collect().items()):
+        for key, value in sorted(values.items()):
+            lines.append(f"bloomzy_{name}_{key} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def scrape_allowed(authorization: Optional[str], remote_addr: Optional[str], token: Optional[str]) -> bool:
+    """Vrai si la collecte est autorisée : jeton porteur attendu ou, sans jeton configuré, adresse locale."""
+    if token:
+        scheme, _, supplied = (authorization or '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(supplied.strip().encode(), token.encode())
+    try:
+        return ipaddress.ip_address(remote_addr or '').is_loopback
+    except ValueError:
+        return False
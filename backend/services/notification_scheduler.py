@@ -10,6 +10,7 @@ from models.user_plant import UserPlant
 from models.watering_history import WateringHistory
 from services.notification_service import NotificationService
 from services.watering_algorithm import WateringAlgorithm
+from services.weather_prefetch import weather_prefetcher
 import threading
 import time
 
@@ -49,6 +50,9 @@ class NotificationScheduler:
                 # Vérifier les notifications à envoyer
                 self.process_scheduled_notifications()
                 
+                # Préchauffer le cache météo avant la prochaine vague d'arrosage
+                weather_prefetcher.run_due_wave()
+                
                 # Générer de nouvelles notifications d'arrosage
                 self.generate_watering_notifications()
                 
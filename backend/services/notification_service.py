@@ -12,11 +12,61 @@ from models.notification import (
 )
 from models.user import User
 from models.user_plant import UserPlant
-from services.weather_service import WeatherService
+from services.weather_service import WeatherService, plant_coordinates
+from services.species_cache import species_cache
 import json
 
 logger = logging.getLogger(__name__)
 
+# Préférences par défaut pour chaque type de notification
+DEFAULT_PREFERENCE_SETTINGS = {
+    NotificationType.WATERING: {
+        'enabled': True,
+        'preferred_channels': ['push', 'web'],
+        'preferred_hour': 9,
+        'frequency': 'normal'
+    },
+    NotificationType.HARVEST: {
+        'enabled': True,
+        'preferred_channels': ['push', 'web'],
+        'preferred_hour': 8,
+        'frequency': 'normal'
+    },
+    NotificationType.PLANTING: {
+        'enabled': True,
+        'preferred_channels': ['push', 'web'],
+        'preferred_hour': 9,
+        'frequency': 'normal'
+    },
+    NotificationType.MAINTENANCE: {
+        'enabled': True,
+        'preferred_channels': ['push', 'web'],
+        'preferred_hour': 10,
+        'frequency': 'reduced'
+    },
+    NotificationType.WEATHER_ALERT: {
+        'enabled': True,
+        'preferred_channels': ['push', 'email'],
+        'preferred_hour': 7,
+        'frequency': 'normal'
+    },
+    NotificationType.PLANT_CARE_GUIDE: {
+        'enabled': True,
+        'preferred_channels': ['web'],
+        'preferred_hour': 11,
+        'frequency': 'reduced'
+    }
+}
+
+
+def default_preference_rows(user_id) -> List[Dict]:
+    """Colonnes des préférences par défaut d'un utilisateur (création unitaire ou insertion en masse)."""
+    return [
+        {'user_id': user_id, 'notification_type': notification_type, **settings,
+         'preferred_channels': list(settings['preferred_channels'])}
+        for notification_type, settings in DEFAULT_PREFERENCE_SETTINGS.items()
+    ]
+
 
 class NotificationService:
     """Service principal pour la gestion des notifications."""
@@ -31,55 +81,8 @@ class NotificationService:
         try:
             preferences = []
             
-            # Préférences par défaut pour chaque type de notification
-            default_settings = {
-                NotificationType.WATERING: {
-                    'enabled': True,
-                    'preferred_channels': ['push', 'web'],
-                    'preferred_hour': 9,
-                    'frequency': 'normal'
-                },
-                NotificationType.HARVEST: {
-                    'enabled': True,
-                    'preferred_channels': ['push', 'web'],
-                    'preferred_hour': 8,
-                    'frequency': 'normal'
-                },
-                NotificationType.PLANTING: {
-                    'enabled': True,
-                    'preferred_channels': ['push', 'web'],
-                    'preferred_hour': 9,
-                    'frequency': 'normal'
-                },
-                NotificationType.MAINTENANCE: {
-                    'enabled': True,
-                    'preferred_channels': ['push', 'web'],
-                    'preferred_hour': 10,
-                    'frequency': 'reduced'
-                },
-                NotificationType.WEATHER_ALERT: {
-                    'enabled': True,
-                    'preferred_channels': ['push', 'email'],
-                    'preferred_hour': 7,
-                    'frequency': 'normal'
-                },
-                NotificationType.PLANT_CARE_GUIDE: {
-                    'enabled': True,
-                    'preferred_channels': ['web'],
-                    'preferred_hour': 11,
-                    'frequency': 'reduced'
-                }
-            }
-            
-            for notification_type, settings in default_settings.items():
-                preference = NotificationPreferences(
-                    user_id=user_id,
-                    notification_type=notification_type,
-                    enabled=settings['enabled'],
-                    preferred_channels=settings['preferred_channels'],
-                    preferred_hour=settings['preferred_hour'],
-                    frequency=settings['frequency']
-                )
+            for row in default_preference_rows(user_id):
+                preference = NotificationPreferences(**row)
                 preferences.append(preference)
                 db.session.add(preference)
             
@@ -184,17 +187,19 @@ class NotificationService:
         try:
             # Déterminer le niveau d'urgence
             if urgency_level >= 8:
-                title = f"🚨 {user_plant.name} a soif !"
+                title = f"🚨 {user_plant.custom_name} a soif !"
                 priority = 9
             elif urgency_level >= 6:
-                title = f"💧 Temps d'arroser {user_plant.name}"
+                title = f"💧 Temps d'arroser {user_plant.custom_name}"
                 priority = 7
             else:
-                title = f"🌱 {user_plant.name} aura bientôt besoin d'eau"
+                title = f"🌱 {user_plant.custom_name} aura bientôt besoin d'eau"
                 priority = 5
             
             # Contenu avec conseils contextuels
-            content = f"Votre {user_plant.species.common_name} "
+            species = species_cache.get(user_plant.species_id) or user_plant.species
+            species_name = (species.common_names or species.scientific_name).split(',')[0].strip()
+            content = f"Votre {species_name} "
             
             if urgency_level >= 8:
                 content += "semble avoir vraiment soif. Un arrosage est recommandé dès maintenant."
@@ -203,11 +208,12 @@ class NotificationService:
             else:
                 content += "aura bientôt besoin d'eau. Préparez-vous pour l'arrosage."
             
-            # Ajouter des conseils météo si disponible
+            # Ajouter des conseils météo si disponible (cache préchauffé, jamais d'appel réseau ici)
             try:
-                weather_data = self.weather_service.get_current_weather()
+                latitude, longitude = plant_coordinates(user_plant)
+                weather_data = self.weather_service.get_cached_weather(user_plant.user_id, latitude, longitude)
                 if weather_data:
-                    content += self.add_weather_context(content, weather_data, 'watering')
+                    content = self.add_weather_context(content, weather_data, 'watering')
             except Exception:
                 pass  # Continuer sans contexte météo
             
@@ -222,7 +228,7 @@ class NotificationService:
                 channels=self.get_preferred_channels(user_plant.user_id, NotificationType.WATERING),
                 data={
                     'plant_id': user_plant.id,
-                    'plant_name': user_plant.name,
+                    'plant_name': user_plant.custom_name,
                     'urgency_level': urgency_level
                 }
             )
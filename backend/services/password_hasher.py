@@ -0,0 +1,162 @@
+"""
+Pool dédié au hachage et à la vérification des mots de passe.
+
+Le hachage pbkdf2 est volontairement coûteux : exécuté directement sur les
+threads de requêtes, une rafale de connexions affame toutes les autres routes.
+Les calculs passent par un pool de taille fixe, et au-delà d'une profondeur de
+file maximale les appels sont refusés immédiatement (``HashingOverloaded``)
+pour que la route réponde 503 avec ``Retry-After`` au lieu de s'empiler.
+
+Le nombre d'itérations pbkdf2 est calibré au démarrage pour qu'un hachage
+coûte environ ``PASSWORD_HASH_BUDGET_MS`` sur la machine courante ; les
+hachages dont les paramètres s'en écartent sont recalculés à la connexion.
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from services.metrics import register_collector
+
+# Écart relatif toléré entre les itérations d'un hachage stocké et la cible
+REHASH_TOLERANCE = 0.25
+# Itérations par défaut de werkzeug quand la méthode n'en précise pas
+WERKZEUG_DEFAULT_ITERATIONS = 600000
+
+_calibrations = {}
+
+
+def calibrate_iterations(budget_ms: float, min_iterations: int, sample_iterations: int = 20000) -> int:
+    """Nombre d'itérations pbkdf2-sha256 tenant dans le budget de latence (jamais sous le plancher)."""
+    key = (budget_ms, min_iterations)
+    if key not in _calibrations:
+        salt = os.urandom(16)
+        elapsed = min(_time_pbkdf2(salt, sample_iterations) for _ in range(3))
+        iterations = int(sample_iterations * (budget_ms / 1000) / elapsed)
+        _calibrations[key] = max(min_iterations, iterations // 1000 * 1000)
+    return _calibrations[key]
+
+
+def _time_pbkdf2(salt: bytes, iterations: int) -> float:
+    started = time.perf_counter()
+    hashlib.pbkdf2_hmac('sha256', b'calibration', salt, iterations)
+    return time.perf_counter() - started
+
+
+class HashingOverloaded(Exception):
+    """Le pool de hachage est saturé ; le client doit réessayer plus tard."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Pool de hachage des mots de passe saturé")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Exécute le hachage des mots de passe sur un pool borné avec contrôle d'admission."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 32, timeout: float = 10, retry_after: int = 1):
+        self._lock = threading.Lock()
+        self._executor = None
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.iterations = WERKZEUG_DEFAULT_ITERATIONS
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    @property
+    def method(self) -> str:
+        return f'pbkdf2:sha256:{self.iterations}'
+
+    def configure(self, workers: int, max_pending: int, timeout: float, retry_after: int,
+                  iterations: int = None):
+        """Recrée le pool avec de nouvelles limites."""
+        with self._lock:
+            if iterations:
+                self.iterations = iterations
+            old_executor = self._executor
+            self._executor = None
+            self.workers = workers
+            self.max_pending = max_pending
+            self.timeout = timeout
+            self.retry_after = retry_after
+        if old_executor:
+            old_executor.shutdown(wait=False)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hasher')
+        return self._executor
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingOverloaded(self.retry_after)
+            self.pending += 1
+            future = self._get_executor().submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingOverloaded(self.retry_after)
+
+    def _on_done(self, future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def hash(self, password: str, method: str = None) -> str:
+        return self._run(generate_password_hash, password, method or self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Indique si un hachage stocké utilise des paramètres périmés."""
+        method = password_hash.split('$', 1)[0].split(':')
+        if method[:2] != ['pbkdf2', 'sha256']:
+            return True
+        try:
+            iterations = int(method[2]) if len(method) > 2 else WERKZEUG_DEFAULT_ITERATIONS
+        except ValueError:
+            return True
+        return abs(iterations - self.iterations) > self.iterations * REHASH_TOLERANCE
+
+    def rehash_if_needed(self, user, password: str) -> bool:
+        """Recalcule le hachage d'un utilisateur authentifié si ses paramètres sont périmés.
+
+        Le nouveau hachage est seulement assigné : l'appelant valide la transaction.
+        """
+        if not self.needs_rehash(user.password_hash):
+            return False
+        try:
+            user.password_hash = self.hash(password)
+        except HashingOverloaded:
+            return False  # Réessayé à la prochaine connexion
+        with self._lock:
+            self.rehashed += 1
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'rehashed': self.rehashed,
+                'workers': self.workers,
+                'iterations': self.iterations,
+            }
+
+
+# Instance globale du pool de hachage
+password_hasher = PasswordHasher()
+register_collector('password_hasher', password_hasher.stats)
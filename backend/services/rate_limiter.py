@@ -0,0 +1,229 @@
+"""
+Limitation de débit par seau à jetons, pondérée par coût de route.
+
+Chaque client (utilisateur authentifié, sinon adresse IP) dispose d'un seau
+de ``RATELIMIT_CAPACITY`` jetons rechargé à ``RATELIMIT_REFILL_RATE`` jetons
+par seconde. Chaque requête consomme le coût de sa route : une connexion
+(hachage coûteux) vaut bien plus qu'une lecture du catalogue. Les seaux sont
+stockés dans un fichier SQLite local afin d'être partagés entre les workers
+d'une même machine. Derrière un reverse proxy, ``TRUSTED_PROXY_COUNT`` fait
+résoudre l'adresse du client depuis ``X-Forwarded-For`` (``ProxyFix``) : sans
+cela, tous les clients anonymes partageraient le seau du proxy. La clé d'un
+client peut aussi être remplacée par ``init_app(app, key_func=...)``.
+"""
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import jwt
+from flask import current_app, g, jsonify, request
+
+from services.metrics import register_collector
+
+# Coût par défaut de chaque blueprint, en jetons
+BLUEPRINT_COSTS = {
+    'auth': 1,
+    'api_keys': 2,
+    'indoor_plants': 0.5,
+    'user_plants': 1,
+    'growth_journal': 1,
+    'notifications': 1,
+}
+
+# Surcharges par endpoint (routes coûteuses : hachage, appels externes)
+ENDPOINT_COSTS = {
+    'auth.login': 10,
+    'auth.signup': 10,
+    'auth.refresh': 2,
+    'api_keys.test_api_key': 5,
+    # Une sonde sortante par clé active, au plus une par service supporté (5)
+    'api_keys.test_all_api_keys': 25,
+    'user_plants.get_watering_schedule': 3,
+    'indoor_plants.import_indoor_plants': 20,
+    'indoor_plants.export_indoor_plants': 10,
+}
+
+# Routes d'infrastructure jamais limitées
+EXEMPT_ENDPOINTS = {'health_check', 'metrics', 'static'}
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """Seaux en mémoire du processus (tests, worker unique), bornés en nombre."""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, max_buckets: int = 10000):
+        # Du moins au plus récemment utilisé
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._calls = 0
+        self.max_buckets = max_buckets
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buckets)
+
+    def consume(self, key: str, cost: float, capacity: float, rate: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            self._calls += 1
+            if self._calls % self.PURGE_EVERY == 0:
+                self._purge_idle(now - capacity / rate)
+            # Au-delà du plafond, le seau le moins récent est oublié (il repartira plein)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return allowed, tokens
+
+    def _purge_idle(self, idle_before: float):
+        # Un seau inactif depuis le temps de recharge complet est plein : inutile de le garder
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if updated >= idle_before:
+                break
+            del self._buckets[key]
+
+
+class SQLiteBucketStore:
+    """Seaux stockés dans un fichier SQLite local, partagés entre les processus."""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def consume(self, key: str, cost: float, capacity: float, rate: float, now: float) -> Tuple[bool, float]:
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = _refill(row[0], row[1], now, capacity, rate) if row else capacity
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            connection.execute(
+                'INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now)
+            )
+            self._calls += 1
+            if self._calls % self.PURGE_EVERY == 0:
+                # Un seau inactif depuis le temps de recharge complet est plein : inutile de le garder
+                connection.execute('DELETE FROM buckets WHERE updated < ?', (now - capacity / rate,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+
+class RateLimiter:
+    """Limiteur de débit branché sur ``before_request``/``after_request``."""
+
+    def __init__(self):
+        self.store = MemoryBucketStore()
+        self.capacity = 60.0
+        self.rate = 1.0
+        self.key_func: Callable[[], str] = self._client_key
+        self.allowed = 0
+        self.limited = 0
+
+    def configure(self, storage: str, capacity: float, rate: float, max_buckets: int = 10000):
+        """``storage`` vaut ``memory`` ou le chemin du fichier SQLite partagé."""
+        self.store = MemoryBucketStore(max_buckets) if storage == 'memory' else SQLiteBucketStore(storage)
+        self.capacity = capacity
+        self.rate = rate
+        self.allowed = self.limited = 0
+
+    def init_app(self, app, key_func: Optional[Callable[[], str]] = None):
+        """``key_func`` identifie le client de la requête courante (utilisateur du token, sinon adresse IP)."""
+        self.configure(
+            app.config['RATELIMIT_STORAGE'],
+            app.config['RATELIMIT_CAPACITY'],
+            app.config['RATELIMIT_REFILL_RATE'],
+            app.config['RATELIMIT_MEMORY_MAX_BUCKETS']
+        )
+        self.key_func = key_func or self._client_key
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    @staticmethod
+    def cost_for(endpoint: str) -> float:
+        if endpoint in ENDPOINT_COSTS:
+            return ENDPOINT_COSTS[endpoint]
+        return BLUEPRINT_COSTS.get(endpoint.split('.', 1)[0], 1)
+
+    @staticmethod
+    def _client_key() -> str:
+        """Identifie le client : utilisateur du token s'il est valide, sinon adresse IP (résolue par ProxyFix)."""
+        from routes.auth import _get_bearer_token, decode_token
+        token = _get_bearer_token()
+        if token:
+            try:
+                return f"user:{decode_token(token)['user_id']}"
+            except (jwt.InvalidTokenError, KeyError):
+                pass
+        return f"ip:{request.remote_addr}"
+
+    def _before_request(self):
+        if not current_app.config.get('RATELIMIT_ENABLED'):
+            return None
+        if request.method == 'OPTIONS' or not request.endpoint or request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+
+        allowed, tokens = self.store.consume(
+            self.key_func(), self.cost_for(request.endpoint), self.capacity, self.rate, time.time()
+        )
+        g.rate_limit = tokens
+        if allowed:
+            self.allowed += 1
+            return None
+
+        self.limited += 1
+        cost = self.cost_for(request.endpoint)
+        response = jsonify({'error': 'Trop de requêtes, réessayez plus tard'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, math.ceil((cost - tokens) / self.rate)))
+        return response
+
+    def _after_request(self, response):
+        tokens = g.pop('rate_limit', None)
+        if tokens is not None:
+            response.headers['RateLimit-Limit'] = str(int(self.capacity))
+            response.headers['RateLimit-Remaining'] = str(int(tokens))
+            response.headers['RateLimit-Reset'] = str(math.ceil((self.capacity - tokens) / self.rate))
+        return response
+
+    def stats(self) -> Dict[str, float]:
+        return {'allowed': self.allowed, 'limited': self.limited}
+
+
+# Instance globale du limiteur
+rate_limiter = RateLimiter()
+register_collector('rate_limiter', rate_limiter.stats)
@@ -0,0 +1,187 @@
+"""
+Stockage persistant des tokens révoqués, précédé d'un filtre de Bloom.
+
+La table ``revoked_tokens`` est partagée par tous les workers. Chaque worker
+garde en mémoire un filtre de Bloom des identifiants révoqués : le cas
+courant (token non révoqué) est tranché sans aller-retour en base, et seule
+une réponse positive du filtre est confirmée par une requête. Le filtre est
+resynchronisé périodiquement avec les révocations faites par les autres
+workers, et les lignes expirées sont purgées.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from models.user import db
+from models.revoked_token import RevokedToken
+from services.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie des tokens émis par /auth/login et /auth/refresh
+DEFAULT_TOKEN_LIFETIME = timedelta(hours=24)
+
+
+def token_identifier(token: str, payload: Dict) -> str:
+    """Identifiant de révocation : le claim ``jti``, ou l'empreinte des anciens tokens qui n'en ont pas."""
+    return payload.get('jti') or hashlib.sha256(token.encode()).hexdigest()
+
+
+class BloomFilter:
+    """Filtre de Bloom à double hachage sur un ``bytearray``."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    """Révocations persistées en base avec un filtre de Bloom par worker."""
+
+    def __init__(self, sync_interval: float = 5, purge_interval: float = 3600, capacity: int = 100000):
+        self.sync_interval = sync_interval
+        self.purge_interval = purge_interval
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._bloom: Optional[BloomFilter] = None
+        self._synced_at: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_purge = time.monotonic() + self.purge_interval
+        self.bloom_negatives = 0
+        self.db_checks = 0
+        self.false_positives = 0
+
+    def configure(self, sync_interval: float, purge_interval: float, capacity: int):
+        """Modifie les paramètres et force une reconstruction du filtre au prochain appel."""
+        with self._lock:
+            self.sync_interval = sync_interval
+            self.purge_interval = purge_interval
+            self.capacity = capacity
+            self._reset()
+
+    def revoke(self, jti: str, expires_at: datetime):
+        """Enregistre la révocation d'un token jusqu'à son expiration."""
+        if expires_at <= datetime.utcnow():
+            return  # Un token expiré est déjà refusé
+        if not RevokedToken.query.filter_by(jti=jti).first():
+            try:
+                db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()  # Révoqué en parallèle par un autre worker
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Indique si un token est révoqué ; ne touche la base que si le filtre répond positivement."""
+        self._maybe_sync()
+        with self._lock:
+            if jti not in self._bloom:
+                self.bloom_negatives += 1
+                return False
+            self.db_checks += 1
+        revoked = db.session.query(
+            RevokedToken.query.filter(
+                RevokedToken.jti == jti,
+                RevokedToken.expires_at > datetime.utcnow()
+            ).exists()
+        ).scalar()
+        if not revoked:
+            with self._lock:
+                self.false_positives += 1
+        return revoked
+
+    def _maybe_sync(self):
+        now = time.monotonic()
+        if self._bloom is not None and now < self._next_sync:
+            return
+        if now >= self._next_purge:
+            self.purge_expired()
+        with self._lock:
+            if self._bloom is None:
+                self._rebuild()
+            else:
+                self._sync_recent()
+            self._next_sync = now + self.sync_interval
+
+    def _rebuild(self):
+        """Recharge le filtre avec toutes les révocations encore valides."""
+        started_at = datetime.utcnow()
+        rows = db.session.query(RevokedToken.jti).filter(RevokedToken.expires_at > started_at).all()
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2))
+        for (jti,) in rows:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._synced_at = started_at
+
+    def _sync_recent(self):
+        """Ajoute au filtre les révocations faites depuis la dernière synchronisation (tous workers)."""
+        started_at = datetime.utcnow()
+        # Marge pour les transactions concurrentes validées après notre dernière lecture
+        since = self._synced_at - timedelta(seconds=max(self.sync_interval, 1))
+        rows = db.session.query(RevokedToken.jti).filter(RevokedToken.revoked_at >= since).all()
+        for (jti,) in rows:
+            self._bloom.add(jti)
+        self._synced_at = started_at
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild()
+
+    def purge_expired(self) -> int:
+        """Supprime les révocations expirées et reconstruit le filtre."""
+        try:
+            deleted = RevokedToken.query.filter(
+                RevokedToken.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Erreur lors de la purge des tokens révoqués: {str(e)}")
+            deleted = 0
+        with self._lock:
+            self._next_purge = time.monotonic() + self.purge_interval
+            self._rebuild()
+        if deleted:
+            logger.info(f"Purgé {deleted} tokens révoqués expirés")
+        return deleted
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'bloom_negatives': self.bloom_negatives,
+                'db_checks': self.db_checks,
+                'false_positives': self.false_positives,
+                'bloom_entries': self._bloom.count if self._bloom else 0,
+            }
+
+
+# Instance globale du stockage des révocations
+revocation_store = RevocationStore()
+register_collector('revocation', revocation_store.stats)
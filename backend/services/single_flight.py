@@ -0,0 +1,65 @@
+"""
+Regroupement des appels concurrents identiques (« single flight »).
+
+Quand plusieurs threads demandent la même clé au même moment, seul le premier
+exécute la fonction ; les autres attendent la fin de cet appel et reçoivent
+son résultat (ou son exception). Rien n'est mémorisé après la fin de l'appel :
+la mise en cache reste l'affaire de l'appelant.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Exécute au plus un appel en cours par clé et partage son résultat."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Retourne ``fn()``, ou le résultat de l'appel déjà en cours pour ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def reset_counters(self):
+        with self._lock:
+            self.executed = 0
+            self.shared = 0
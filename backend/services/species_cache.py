@@ -0,0 +1,186 @@
+"""
+Cache en lecture du catalogue des espèces (``indoor_plants``).
+
+Les espèces changent rarement mais sont lues partout : ``UserPlant.to_dict``
+chargeait ``species`` pour chaque plante de ``/api/plants/my-plants`` et
+l'algorithme d'arrosage relisait l'espèce à chaque calcul. Ce cache garde, par
+identifiant, une copie détachée de la ligne et son dictionnaire déjà sérialisé
+(à ne pas modifier : il est partagé entre les réponses).
+
+La fraîcheur repose sur un compteur ``catalog_versions`` incrémenté dans la
+transaction de toute écriture ORM sur une espèce (après chaque flush). Chaque
+worker relit ce compteur au plus toutes les ``CATALOG_VERSION_INTERVAL``
+secondes, une lecture par clé primaire, et vide son cache quand il a changé ;
+le worker auteur de l'écriture le relit dès le commit. Les lignes sont lues
+hors de la session courante, donc jamais avant leur commit. Les écritures hors
+ORM (import en masse) doivent appeler ``CatalogVersion.bump`` elles-mêmes.
+"""
+import threading
+import time
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from models.catalog_version import INDOOR_PLANTS, CatalogVersion
+from models.indoor_plant import IndoorPlant
+from models.user import db
+from services.metrics import register_collector
+from services.ttl_cache import TTLCache
+
+# (copie détachée, dictionnaire sérialisé)
+SpeciesEntry = Tuple[IndoorPlant, Dict]
+
+
+class SpeciesCache:
+    """Cache des espèces par identifiant, invalidé par la version du catalogue."""
+
+    def __init__(self, max_size: int = 20000, ttl: float = 3600, version_interval: float = 1):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._lock = threading.Lock()
+        self.configure(max_size, ttl, version_interval)
+
+    def configure(self, max_size: int, ttl: float, version_interval: float):
+        self._cache.configure(max_size=max_size, ttl=ttl)
+        with self._lock:
+            self.version_interval = version_interval
+            self._version = None
+            self._checked_at = 0.0
+            self.version_checks = 0
+            self.invalidations = 0
+            self.loads = 0
+
+    def init_app(self, app):
+        """Crée la ligne du compteur pour que les écritures n'aient qu'à l'incrémenter."""
+        with app.app_context():
+            try:
+                with db.engine.begin() as connection:
+                    exists = connection.execute(
+                        select(CatalogVersion.name).where(CatalogVersion.name == INDOOR_PLANTS)
+                    ).first()
+                    if exists is None:
+                        connection.execute(CatalogVersion.__table__.insert().values(name=INDOOR_PLANTS, version=0))
+            except IntegrityError:
+                pass  # Un autre worker l'a créée au même moment
+
+    def version(self) -> int:
+        """Version du catalogue, relue en base au plus toutes les ``version_interval`` secondes."""
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._checked_at < self.version_interval:
+                return self._version
+        with db.engine.connect() as connection:
+            current = CatalogVersion.read(connection)
+        with self._lock:
+            self.version_checks += 1
+            if current != self._version:
+                if self._version is not None:
+                    self.invalidations += 1
+                self._cache.clear()
+                self._version = current
+            self._checked_at = now
+            return current
+
+    def expire(self):
+        """Force la relecture de la version au prochain accès (écriture locale validée)."""
+        with self._lock:
+            self._checked_at = float('-inf')
+
+    @staticmethod
+    def _snapshot(values: Dict) -> IndoorPlant:
+        snapshot = IndoorPlant(**values)
+        make_transient_to_detached(snapshot)
+        return snapshot
+
+    def get_many(self, species_ids: Iterable[int]) -> Dict[int, SpeciesEntry]:
+        """Entrées des espèces demandées ; les absentes du cache sont chargées en une requête."""
+        version = self.version()
+        found, missing = {}, []
+        for species_id in set(species_ids):
+            entry = self._cache.get(species_id)
+            if entry is None:
+                missing.append(species_id)
+            else:
+                found[species_id] = entry
+        if not missing:
+            return found
+
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                select(IndoorPlant.__table__).where(IndoorPlant.id.in_(missing))
+            ).mappings().all()
+        entries = [(snapshot, snapshot.to_dict()) for snapshot in (self._snapshot(dict(row)) for row in rows)]
+        with self._lock:
+            self.loads += 1
+            # Version changée pendant la lecture : servir les lignes sans les garder
+            if self._version == version:
+                for entry in entries:
+                    self._cache.set(entry[0].id, entry)
+        found.update((entry[0].id, entry) for entry in entries)
+        return found
+
+    def get(self, species_id: Optional[int]) -> Optional[IndoorPlant]:
+        """Copie détachée (lecture seule) de l'espèce, ou None."""
+        if species_id is None:
+            return None
+        entry = self.get_many([species_id]).get(species_id)
+        return entry[0] if entry else None
+
+    def to_dict(self, species_id: Optional[int]) -> Optional[Dict]:
+        """Dictionnaire sérialisé de l'espèce, ou None."""
+        if species_id is None:
+            return None
+        entry = self.get_many([species_id]).get(species_id)
+        return entry[1] if entry else None
+
+    def clear(self):
+        self._cache.clear()
+        self.expire()
+
+    def stats(self) -> Dict[str, float]:
+        stats = self._cache.stats()
+        with self._lock:
+            stats.update({
+                'version': self._version or 0,
+                'version_checks': self.version_checks,
+                'invalidations': self.invalidations,
+                'loads': self.loads,
+            })
+        return stats
+
+
+# Instance globale du cache des espèces
+species_cache = SpeciesCache()
+register_collector('species_cache', species_cache.stats)
+
+
+def _catalog_changed(session) -> bool:
+    """Vrai si le flush en cours insère, modifie ou supprime une espèce."""
+    if any(isinstance(target, IndoorPlant) for target in chain(session.new, session.deleted)):
+        return True
+    # Une plante utilisateur ajoutée modifie la collection ``user_plants`` de son espèce, pas l'espèce
+    return any(
+        isinstance(target, IndoorPlant) and session.is_modified(target, include_collections=False)
+        for target in session.dirty
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_catalog_version(session, flush_context):
+    """Incrémente la version dans la transaction de l'écriture."""
+    if _catalog_changed(session):
+        CatalogVersion.bump(session.connection())
+        session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _expire_after_commit(session):
+    if session.info.pop('catalog_changed', False):
+        species_cache.expire()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('catalog_changed', None)
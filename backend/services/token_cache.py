@@ -0,0 +1,92 @@
+"""
+Cache des tokens JWT déjà vérifiés.
+
+Les clients renvoient le même token d'accès des milliers de fois par jour ;
+ce cache LRU borné conserve les claims décodés jusqu'à l'expiration du token
+afin d'éviter la vérification de signature à chaque requête.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from services.metrics import register_collector
+
+
+class VerifiedTokenCache:
+    """Cache LRU des claims vérifiés, indexé par empreinte du token."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _digest(token: str, secret: str) -> bytes:
+        # HMAC avec le secret : un token signé par un autre secret ne partage jamais d'entrée
+        return hmac.new(secret.encode(), token.encode(), hashlib.sha256).digest()
+
+    def configure(self, max_size: int):
+        """Redimensionne le cache et le vide."""
+        with self._lock:
+            self.max_size = max_size
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def get(self, token: str, secret: str) -> Optional[Dict]:
+        """Retourne les claims d'un token déjà vérifié et non expiré."""
+        key = self._digest(token, secret)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, token: str, secret: str, payload: Dict):
+        """Mémorise les claims d'un token vérifié jusqu'à son expiration."""
+        expires_at = payload.get('exp')
+        if not isinstance(expires_at, (int, float)) or self.max_size <= 0:
+            return
+        key = self._digest(token, secret)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, token: str, secret: str):
+        """Retire un token du cache (déconnexion, révocation)."""
+        with self._lock:
+            self._entries.pop(self._digest(token, secret), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+            }
+
+
+# Instance globale du cache de tokens
+token_cache = VerifiedTokenCache()
+register_collector('token_cache', token_cache.stats)
@@ -0,0 +1,124 @@
+"""
+Enregistrement différé (write-behind) des utilisations de clés API.
+
+Chaque utilisation d'une clé mettait à jour ``api_keys.last_used`` dans sa
+propre transaction ; sous SQLite, ces écritures fréquentes se disputent le
+verrou d'écriture unique. Les horodatages sont désormais accumulés en mémoire
+(le plus récent par clé) et écrits par un thread d'arrière-plan toutes les
+``API_KEY_USAGE_FLUSH_INTERVAL`` secondes, en un seul UPDATE exécuté par lot,
+ainsi qu'à l'arrêt du processus. Un intervalle de 0 écrit immédiatement.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, or_
+
+from models.user import db
+from services.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+
+class UsageRecorder:
+    """Tampon des dernières utilisations de clés API, vidé périodiquement en base."""
+
+    def __init__(self, flush_interval: float = 5):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[int, datetime] = {}
+        self._app = None
+        self._thread = None
+        self._wakeup = threading.Event()
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.errors = 0
+
+    def init_app(self, app, flush_interval: float):
+        """Associe l'application (contexte des écritures) et démarre le thread d'écriture."""
+        with self._lock:
+            self._app = app
+            self.flush_interval = flush_interval
+            self._pending.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='api-key-usage', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        self._wakeup.set()
+
+    def record(self, key_id: int, used_at: Optional[datetime] = None):
+        """Mémorise une utilisation ; l'écriture en base est différée."""
+        used_at = used_at or datetime.utcnow()
+        with self._lock:
+            previous = self._pending.get(key_id)
+            if previous is None or used_at > previous:
+                self._pending[key_id] = used_at
+        if not self.flush_interval:
+            self.flush()
+
+    def pending_for(self, key_id: int) -> Optional[datetime]:
+        """Dernière utilisation pas encore écrite (lecture de ses propres écritures)."""
+        with self._lock:
+            return self._pending.get(key_id)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval or None)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Écrit les utilisations en attente en un UPDATE par lot ; retourne le nombre de clés.
+
+        En cas d'échec, l'erreur est journalisée et les horodatages restent en
+        attente pour le prochain passage.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                app = self._app
+            if not pending or app is None:
+                return 0
+            from models.api_key import ApiKey  # import tardif : le modèle dépend des services
+            table = ApiKey.__table__
+            statement = (
+                table.update()
+                .where(table.c.id == bindparam('key_id'))
+                .where(or_(table.c.last_used.is_(None), table.c.last_used < bindparam('used_at')))
+                # last_used n'est pas une modification de la clé : updated_at est conservé
+                .values(last_used=bindparam('used_at'), updated_at=table.c.updated_at)
+            )
+            rows = [{'key_id': key_id, 'used_at': used_at} for key_id, used_at in pending.items()]
+            try:
+                with app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(statement, rows)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'écriture des utilisations de clés API: {str(e)}")
+                with self._lock:
+                    self.errors += 1
+                    for key_id, used_at in pending.items():
+                        if key_id not in self._pending or used_at > self._pending[key_id]:
+                            self._pending[key_id] = used_at
+                return 0
+            with self._lock:
+                self.flushes += 1
+                self.flushed_rows += len(rows)
+            return len(rows)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'flushes': self.flushes,
+                'flushed_rows': self.flushed_rows,
+                'errors': self.errors,
+            }
+
+
+# Instance globale du tampon d'utilisation
+usage_recorder = UsageRecorder()
+register_collector('api_key_usage', usage_recorder.stats)
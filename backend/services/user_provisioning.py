@@ -0,0 +1,195 @@
+"""
+Import en masse de comptes utilisateurs depuis un fichier JSONL ou CSV.
+
+Le fichier est lu en flux par lots de ``batch_size`` enregistrements. Pour
+chaque lot : validation des emails et mots de passe (mêmes règles que
+``/auth/signup``), détection des doublons dans le lot puis en base avec une
+seule requête ``IN``, hachage des mots de passe sur un pool de processus, et
+insertion en masse des ``User`` et de leurs ``NotificationPreferences`` par
+défaut dans une transaction par lot.
+
+Après chaque lot validé, un fichier de reprise enregistre la position du
+dernier enregistrement traité et les compteurs : relancer la même commande
+reprend à l'enregistrement suivant. Une ligne déjà importée par un lot
+interrompu avant l'écriture du fichier de reprise est simplement comptée
+comme doublon.
+"""
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+
+from models.user import db, User, credentials_error
+from models.notification import NotificationPreferences
+from services.notification_service import default_preference_rows
+from services.password_hasher import password_hasher
+
+# Champs de profil optionnels repris du fichier d'import
+PROFILE_FIELDS = ('username', 'first_name', 'last_name', 'location')
+
+
+def parse_records(handle: TextIO, fmt: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """Lit un flux texte JSONL ou CSV ligne à ligne ; produit ``(position, enregistrement)``.
+
+    La position commence à 1 (hors en-tête CSV et lignes vides) ; un
+    enregistrement illisible est produit sous la forme ``None``.
+    """
+    if fmt == 'csv':
+        yield from enumerate(csv.DictReader(handle), start=1)
+        return
+    position = 0
+    for line in handle:
+        if not line.strip():
+            continue
+        position += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield position, record if isinstance(record, dict) else None
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, Optional[dict]]]:
+    """Lit le fichier en flux (format déduit de l'extension par défaut), voir ``parse_records``."""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as handle:
+        yield from parse_records(handle, fmt)
+
+
+def load_checkpoint(path: str) -> Dict[str, int]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def save_checkpoint(path: str, state: Dict[str, int]):
+    """Écrit le fichier de reprise de façon atomique."""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(state, handle)
+    os.replace(tmp_path, path)
+
+
+class UserImporter:
+    """Importe des comptes par lots avec hachage parallèle et reprise sur incident."""
+
+    def __init__(self, batch_size: int = 500, workers: Optional[int] = None, method: Optional[str] = None,
+                 progress: Optional[Callable[[Dict[str, int]], None]] = None):
+        self.batch_size = batch_size
+        # 0 : hachage dans le processus courant (petits fichiers, tests)
+        self.workers = os.cpu_count() or 1 if workers is None else workers
+        self.method = method or password_hasher.method
+        self.progress = progress
+
+    def run(self, path: str, fmt: Optional[str] = None, checkpoint_path: Optional[str] = None,
+            errors_path: Optional[str] = None) -> Dict[str, int]:
+        """Importe le fichier ; retourne les compteurs finaux."""
+        checkpoint_path = checkpoint_path or f'{path}.checkpoint'
+        stats = {'position': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0}
+        stats.update(load_checkpoint(checkpoint_path))
+        stats['resumed_from'] = stats['position']
+
+        records = ((position, record) for position, record in read_records(path, fmt)
+                   if position > stats['resumed_from'])
+        pool = None
+        if self.workers > 0:
+            # spawn : les processus de hachage n'héritent pas des threads de l'application
+            pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        errors = open(errors_path, 'a', encoding='utf-8') if errors_path else None
+        try:
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+                self._import_batch(batch, pool, stats, errors)
+                stats['position'] = batch[-1][0]
+                save_checkpoint(checkpoint_path, stats)
+                if self.progress:
+                    self.progress(dict(stats))
+        finally:
+            if pool:
+                pool.shutdown()
+            if errors:
+                errors.close()
+
+        # Import complet : une nouvelle exécution repart du début (les doublons sont ignorés)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return stats
+
+    def _import_batch(self, batch: List[Tuple[int, Optional[dict]]], pool, stats: Dict[str, int], errors):
+        def reject(position, email, reason, counter):
+            stats[counter] += 1
+            if errors:
+                errors.write(json.dumps({'position': position, 'email': email, 'reason': reason}) + '\n')
+
+        candidates = {}
+        for position, record in batch:
+            if record is None:
+                reject(position, None, 'Enregistrement illisible', 'invalid')
+                continue
+            email = (record.get('email') or '').strip()
+            error = credentials_error(email, record.get('password'))
+            if error:
+                reject(position, email or None, error, 'invalid')
+            elif email in candidates:
+                reject(position, email, 'Email en double dans le fichier', 'duplicates')
+            else:
+                candidates[email] = (position, record)
+        if not candidates:
+            return
+
+        # Une requête IN par lot pour les emails, une pour les noms d'utilisateur
+        existing_emails = set(db.session.execute(
+            select(User.email).where(User.email.in_(list(candidates)))
+        ).scalars())
+        requested_usernames = [record['username'] for _, record in candidates.values() if record.get('username')]
+        taken_usernames = set(db.session.execute(
+            select(User.username).where(User.username.in_(requested_usernames))
+        ).scalars()) if requested_usernames else set()
+
+        accepted = []
+        for email, (position, record) in candidates.items():
+            username = record.get('username') or None
+            if email in existing_emails:
+                reject(position, email, 'Email existe déjà', 'duplicates')
+            elif username and username in taken_usernames:
+                reject(position, email, 'Nom d\'utilisateur déjà utilisé', 'duplicates')
+            else:
+                if username:
+                    taken_usernames.add(username)
+                accepted.append((email, record))
+        if not accepted:
+            return
+
+        passwords = [record['password'] for _, record in accepted]
+        if pool:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashes = pool.map(generate_password_hash, passwords, repeat(self.method), chunksize=chunksize)
+        else:
+            hashes = map(generate_password_hash, passwords, repeat(self.method))
+
+        user_rows = [
+            {'email': email, 'password_hash': password_hash,
+             **{field: record.get(field) or None for field in PROFILE_FIELDS}}
+            for (email, record), password_hash in zip(accepted, hashes)
+        ]
+        try:
+            db.session.execute(insert(User), user_rows)
+            user_ids = db.session.execute(
+                select(User.id).where(User.email.in_([email for email, _ in accepted]))
+            ).scalars().all()
+            preference_rows = [row for user_id in user_ids for row in default_preference_rows(user_id)]
+            db.session.execute(insert(NotificationPreferences), preference_rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        stats['imported'] += len(user_rows)
@@ -4,6 +4,7 @@ from models.user_plant import UserPlant
 from models.watering_history import WateringHistory
 from models.indoor_plant import IndoorPlant
 from services.weather_service import WeatherService
+from services.species_cache import species_cache
 from flask import current_app
 
 class WateringAlgorithm:
@@ -33,15 +34,15 @@ class WateringAlgorithm:
             if not user_plant:
                 return None
                 
-            # Données météorologiques
+            # Données météorologiques (coordonnées par défaut du service si la plante n'en a pas)
             weather_data = self.weather_service.get_weather_data(
                 user_id=user_id,
-                latitude=user_plant.latitude,
-                longitude=user_plant.longitude
+                latitude=getattr(user_plant, 'latitude', None),
+                longitude=getattr(user_plant, 'longitude', None)
             )
             
             # Calcul de la fréquence d'arrosage
-            base_frequency = self._get_base_frequency(user_plant.species)
+            base_frequency = self._get_base_frequency(species_cache.get(user_plant.species_id))
             season_factor = self._get_season_factor()
             weather_factor = self.weather_service.calculate_weather_factor(weather_data)
             plant_factor = self._calculate_plant_factor(user_plant)
@@ -162,7 +163,7 @@ class WateringAlgorithm:
                 return 1.0
                 
             avg_interval = sum(intervals) / len(intervals)
-            base_frequency = self._get_base_frequency(user_plant.species)
+            base_frequency = self._get_base_frequency(species_cache.get(user_plant.species_id))
             
             # Ajustement basé sur l'écart entre fréquence théorique et observée
             if avg_interval > base_frequency * 1.2:
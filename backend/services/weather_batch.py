@@ -0,0 +1,195 @@
+"""
+Récupération groupée de la météo de nombreuses cellules.
+
+Le recalcul des plannings de toute la flotte a besoin de la météo de milliers
+de cellules distinctes ; les appels séquentiels prennent des minutes. Les
+cellules d'un lot sont traitées sur une boucle asyncio : au plus
+``WEATHER_BATCH_CONCURRENCY`` appels simultanés (sémaphore et pool de threads
+dédié, le client HTTP restant synchrone), un délai par cellule
+(``WEATHER_BATCH_TIMEOUT``) et un quota d'appels par minute
+(``WEATHER_QUOTA_PER_MINUTE``) partagé par tout le processus, pour rester sous
+la limite du fournisseur. Le quota compte les requêtes réellement envoyées :
+chaque tentative du client HTTP ``weather_http`` (nouvelles tentatives et
+clés de repli d'une cellule comprises) consomme un jeton. Le lot réserve le
+jeton du premier appel de chaque cellule avant de la lancer, pour que
+l'attente du quota ne soit pas décomptée du délai de la cellule.
+``fetch`` est l'entrée synchrone utilisée par le scheduler. Chaque cellule passe par ``WeatherService.get_weather_data`` :
+cache, regroupement des appels, disjoncteur et mode dégradé s'appliquent.
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+from services.http_client import weather_http
+from services.metrics import register_collector
+from services.weather_cache import weather_cache
+
+
+class QuotaLimiter:
+    """Seau à jetons d'appels par minute ; ``reserve`` retourne l'attente nécessaire."""
+
+    def __init__(self, per_minute: float = 600):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.configure(per_minute)
+
+    def configure(self, per_minute: float):
+        with self._lock:
+            self.per_minute = per_minute
+            self.tokens = float(per_minute)
+            self.updated = time.monotonic()
+            self.waited = 0.0
+
+    def reserve(self) -> float:
+        """Réserve un appel ; retourne le délai (secondes) avant de pouvoir l'émettre (0 sans quota)."""
+        if not self.per_minute:
+            return 0.0
+        rate = self.per_minute / 60
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.per_minute, self.tokens + (now - self.updated) * rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = 0.0 if self.tokens >= 0 else -self.tokens / rate
+            self.waited += delay
+            return delay
+
+    @contextmanager
+    def prepaid(self):
+        """Dans ce bloc, le premier ``acquire`` du thread courant est déjà réservé."""
+        self._local.prepaid = True
+        try:
+            yield
+        finally:
+            self._local.prepaid = False
+
+    def acquire(self):
+        """Consomme un appel juste avant une requête au fournisseur, en attendant le quota si besoin."""
+        if getattr(self._local, 'prepaid', False):
+            self._local.prepaid = False
+            return
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class BatchWeatherFetcher:
+    """Récupère la météo d'un ensemble de cellules avec concurrence bornée et quota."""
+
+    def __init__(self, concurrency: int = 16, timeout: float = 10, per_minute: float = 600):
+        self._lock = threading.Lock()
+        self.quota = QuotaLimiter(per_minute)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.batches = 0
+        self.cells = 0
+        self.cached = 0
+        self.fetched = 0
+        self.failed = 0
+        self.timeouts = 0
+
+    def configure(self, concurrency: int, timeout: float, per_minute: float):
+        with self._lock:
+            self.concurrency = concurrency
+            self.timeout = timeout
+            self._reset_counters()
+        self.quota.configure(per_minute)
+
+    def _count(self, name: str, value: float = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    @staticmethod
+    def group_by_cell(locations: Iterable[Tuple[int, float, float]]) -> Dict[str, List[Tuple[int, float, float]]]:
+        """Regroupe ``(user_id, latitude, longitude)`` par cellule, un candidat par utilisateur."""
+        cells: Dict[str, List[Tuple[int, float, float]]] = {}
+        for user_id, latitude, longitude in locations:
+            candidates = cells.setdefault(weather_cache.cell_for(latitude, longitude), [])
+            if all(candidate != user_id for candidate, _, _ in candidates):
+                candidates.append((user_id, latitude, longitude))
+        return cells
+
+    def fetch(self, cells: Dict[str, List[Tuple[int, float, float]]],
+              fetch_one: Callable[[int, float, float], Optional[Dict]],
+              concurrency: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        """Entrée synchrone : retourne la météo de chaque cellule (None si indisponible).
+
+        Ne pas appeler depuis une boucle asyncio en cours : utiliser ``fetch_async``.
+        """
+        return asyncio.run(self.fetch_async(cells, fetch_one, concurrency))
+
+    async def fetch_async(self, cells: Dict[str, List[Tuple[int, float, float]]],
+                          fetch_one: Callable[[int, float, float], Optional[Dict]],
+                          concurrency: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        concurrency = max(1, concurrency or self.concurrency)
+        app = current_app._get_current_object()
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        self._count('batches')
+        self._count('cells', len(cells))
+
+        def fetch_cell(candidates):
+            with app.app_context(), self.quota.prepaid():
+                # La première clé valide de la cellule suffit : la réponse est partagée
+                for user_id, latitude, longitude in candidates:
+                    weather_data = fetch_one(user_id, latitude, longitude)
+                    if weather_data is not None:
+                        return weather_data
+                return None
+
+        async def run(cell, candidates):
+            cached = weather_cache.peek(cell, max_age=weather_cache.ttl, count=False)
+            if cached is not None:
+                self._count('cached')
+                return cell, cached
+            async with semaphore:
+                delay = self.quota.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+                try:
+                    weather_data = await asyncio.wait_for(
+                        loop.run_in_executor(executor, fetch_cell, candidates), self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._count('timeouts')
+                    return cell, None
+                except Exception as e:
+                    app.logger.error(f"Erreur lors de la récupération météo de la cellule {cell}: {e}")
+                    weather_data = None
+            self._count('fetched' if weather_data is not None else 'failed')
+            return cell, weather_data
+
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='weather-batch')
+        try:
+            results = await asyncio.gather(*(run(cell, candidates) for cell, candidates in cells.items()))
+        finally:
+            # Les appels ayant dépassé leur délai se terminent seuls (délai du client HTTP)
+            executor.shutdown(wait=False)
+        return dict(results)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'cells': self.cells,
+                'cached': self.cached,
+                'fetched': self.fetched,
+                'failed': self.failed,
+                'timeouts': self.timeouts,
+                'quota_wait_seconds': round(self.quota.waited, 3),
+            }
+
+
+# Instance globale de la récupération groupée
+weather_batch = BatchWeatherFetcher()
+register_collector('weather_batch', weather_batch.stats)
+# Toute requête au fournisseur météo, groupée ou non, consomme le quota
+weather_http.throttle = weather_batch.quota.acquire
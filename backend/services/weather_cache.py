@@ -0,0 +1,215 @@
+"""
+Cache météo partagé, indexé par cellule géographique.
+
+Des utilisateurs voisins obtiennent la même réponse du fournisseur : les
+coordonnées sont arrondies à une cellule geohash (``WEATHER_CELL_PRECISION``,
+5 caractères ≈ 5 km) et une seule entrée est gardée par cellule, quel que soit
+l'utilisateur. Une entrée fraîche (moins de ``WEATHER_CACHE_TTL`` secondes)
+est servie directement. Une entrée périmée mais encore dans la fenêtre
+``WEATHER_CACHE_STALE_TTL`` est servie immédiatement pendant qu'un
+rafraîchissement unique tourne en arrière-plan (stale-while-revalidate).
+Au-delà, l'appel attend le fournisseur ; les appels concurrents pour une même
+cellule attendent la même requête (voir services/single_flight.py).
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from services.metrics import register_collector
+from services.single_flight import SingleFlight
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 5) -> str:
+    """Encode des coordonnées en geohash de ``precision`` caractères."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def geohash_center(cell: str) -> Tuple[float, float]:
+    """Coordonnées du centre d'une cellule geohash."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        bits = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if (bits >> shift) & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+class WeatherCache:
+    """Cache LRU par cellule avec service des entrées périmées pendant leur rafraîchissement."""
+
+    def __init__(self, ttl: float = 600, stale_ttl: float = 3600, max_size: int = 10000,
+                 precision: int = 5, refresh_workers: int = 4):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._refreshing = set()
+        self._executor = None
+        self._flight = SingleFlight()
+        self.refresh_workers = refresh_workers
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.precision = precision
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.peek_hits = 0
+        self.peek_misses = 0
+        self._flight.reset_counters()
+
+    def configure(self, ttl: float, stale_ttl: float, max_size: int, precision: int):
+        """Modifie les limites du cache et le vide."""
+        with self._lock:
+            self.ttl = ttl
+            self.stale_ttl = stale_ttl
+            self.max_size = max_size
+            self.precision = precision
+            self._entries.clear()
+            self._refreshing.clear()
+            self._reset_counters()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def cell_for(self, latitude: float, longitude: float) -> str:
+        return geohash_encode(latitude, longitude, self.precision)
+
+    def peek(self, cell: str, max_age: Optional[float] = None, count: bool = True) -> Optional[Dict]:
+        """Retourne l'entrée d'une cellule sans jamais appeler le fournisseur."""
+        max_age = self.ttl + self.stale_ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(cell)
+            found = entry is not None and time.monotonic() - entry[1] <= max_age
+            if count:
+                if found:
+                    self.peek_hits += 1
+                else:
+                    self.peek_misses += 1
+        return entry[0] if found else None
+
+    def get_or_fetch(self, cell: str, fetch: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """Retourne la météo de la cellule, en appelant ``fetch`` seulement si nécessaire."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cell)
+            age = now - entry[1] if entry else None
+            if entry and age < self.ttl:
+                self._entries.move_to_end(cell)
+                self.hits += 1
+                return entry[0]
+            if entry and age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                start_refresh = cell not in self._refreshing
+                if start_refresh:
+                    self._refreshing.add(cell)
+            else:
+                self.misses += 1
+                entry = None
+        if entry is None:
+            return self._fetch_and_store(cell, fetch)
+        if start_refresh:
+            self._schedule_refresh(cell, fetch)
+        return entry[0]
+
+    def _fetch_and_store(self, cell: str, fetch: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        def fetch_and_store():
+            data = fetch()
+            if data is not None:
+                self.store(cell, data)
+            return data
+        return self._flight.do(cell, fetch_and_store)
+
+    def store(self, cell: str, data: Dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[cell] = (data, time.monotonic())
+            self._entries.move_to_end(cell)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _schedule_refresh(self, cell: str, fetch: Callable[[], Optional[Dict]]):
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def refresh():
+            try:
+                if app is not None:
+                    with app.app_context():
+                        data = self._fetch_and_store(cell, fetch)
+                else:
+                    data = self._fetch_and_store(cell, fetch)
+            except Exception:
+                data = None
+            with self._lock:
+                self._refreshing.discard(cell)
+                self.refreshes += 1
+                if data is None:
+                    self.refresh_failures += 1
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.refresh_workers,
+                                                    thread_name_prefix='weather-refresh')
+            executor = self._executor
+        executor.submit(refresh)
+
+    def stats(self) -> Dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - fetched_at for _, fetched_at in self._entries.values()]
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else 0,
+                'refreshes': self.refreshes,
+                'refresh_failures': self.refresh_failures,
+                'peek_hits': self.peek_hits,
+                'peek_misses': self.peek_misses,
+                'fetches': self._flight.executed,
+                'coalesced': self._flight.shared,
+                'in_flight': self._flight.in_flight(),
+                'size': len(self._entries),
+                'max_age_seconds': max(ages) if ages else 0,
+                'mean_age_seconds': sum(ages) / len(ages) if ages else 0,
+            }
+
+
+# Instance globale du cache météo
+weather_cache = WeatherCache()
+register_collector('weather_cache', weather_cache.stats)
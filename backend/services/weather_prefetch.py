@@ -0,0 +1,194 @@
+"""
+Préchauffage du cache météo avant chaque vague de notifications d'arrosage.
+
+Les notifications d'arrosage partent à l'heure préférée de chaque utilisateur
+(``preferred_hour``, bornée à 10 h comme dans ``calculate_optimal_time``).
+Quelques minutes avant chaque vague (``WEATHER_PREFETCH_LEAD``), le job calcule
+l'ensemble distinct des cellules météo des plantes à arroser des utilisateurs
+concernés et les charge dans le cache partagé par un lot (voir
+services/weather_batch.py) d'au plus ``WEATHER_PREFETCH_WORKERS`` appels
+simultanés. La génération des
+notifications ne fait ensuite que lire le cache (``get_cached_weather``) et
+ne bloque jamais sur le réseau. Chaque vague produit un rapport : couverture
+(cellules chargées / cellules nécessaires) et taux de succès des lectures
+faites pendant la vague.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import String, and_, cast, exists, func, or_, select
+
+from models.indoor_plant import IndoorPlant
+from models.notification import NotificationPreferences, NotificationType
+from models.user import db
+from models.user_plant import UserPlant
+from models.watering_history import WateringHistory
+from services.metrics import register_collector
+from services.weather_batch import BatchWeatherFetcher, weather_batch
+from services.weather_cache import weather_cache
+from services.weather_service import WeatherService, plant_coordinates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WATERING_HOUR = 9
+# Heure maximale des notifications d'arrosage (voir NotificationService.calculate_optimal_time)
+LATEST_WATERING_HOUR = 10
+DEFAULT_WATERING_FREQUENCY = 7
+
+
+class WeatherPrefetcher:
+    """Préchauffe les cellules météo d'une vague et mesure la couverture obtenue."""
+
+    def __init__(self, workers: int = 4, lead_minutes: float = 15):
+        self._lock = threading.Lock()
+        self.weather_service = WeatherService()
+        self.reports = deque(maxlen=24)
+        self._done_waves = set()
+        self._peek_baseline = (0, 0)
+        self.workers = workers
+        self.lead_minutes = lead_minutes
+
+    def configure(self, workers: int, lead_minutes: float):
+        with self._lock:
+            self.workers = workers
+            self.lead_minutes = lead_minutes
+            self.reports.clear()
+            self._done_waves.clear()
+            self._peek_baseline = (0, 0)
+
+    @staticmethod
+    def _wave_filter(hour: int):
+        """Condition SQL « la plante appartient à un utilisateur de la vague ``hour`` » (None : vague vide)."""
+        preference = and_(
+            NotificationPreferences.user_id == cast(UserPlant.user_id, String),
+            NotificationPreferences.notification_type == NotificationType.WATERING,
+        )
+        if hour < LATEST_WATERING_HOUR:
+            hour_match = NotificationPreferences.preferred_hour == hour
+        elif hour == LATEST_WATERING_HOUR:
+            hour_match = NotificationPreferences.preferred_hour >= LATEST_WATERING_HOUR
+        else:
+            return None
+        if hour != DEFAULT_WATERING_HOUR:
+            return exists().where(preference, hour_match)
+        # Vague par défaut : aussi les utilisateurs sans préférence ou sans heure préférée
+        return or_(
+            exists().where(preference, or_(hour_match, NotificationPreferences.preferred_hour.is_(None))),
+            ~exists().where(preference),
+        )
+
+    def plan_wave(self, hour: int, wave_at: datetime) -> Dict[str, List[Tuple[int, float, float]]]:
+        """Cellules à charger pour la vague : ``{cellule: [(user_id, latitude, longitude), ...]}``.
+
+        Seules les plantes des utilisateurs de la vague sont lues (heure
+        préférée filtrée en SQL, dernier arrosage lu par l'index de
+        ``watering_history``) : une vague sans utilisateur ne coûte qu'une
+        requête vide. Une plante est retenue si son prochain arrosage tombe
+        avant la fin de la journée qui suit la vague (ou si elle n'a jamais été
+        arrosée).
+        """
+        in_wave = self._wave_filter(hour)
+        if in_wave is None:
+            return {}
+        last_watered = select(func.max(WateringHistory.watered_at)) \
+            .where(WateringHistory.plant_id == UserPlant.id).correlate(UserPlant).scalar_subquery()
+        rows = db.session.query(UserPlant, IndoorPlant.watering_frequency, last_watered) \
+            .join(IndoorPlant, UserPlant.species_id == IndoorPlant.id) \
+            .filter(in_wave) \
+            .all()
+
+        horizon = wave_at + timedelta(days=1)
+        locations = []
+        for plant, frequency, last_watered_at in rows:
+            if last_watered_at is None \
+                    or last_watered_at + timedelta(days=frequency or DEFAULT_WATERING_FREQUENCY) <= horizon:
+                latitude, longitude = plant_coordinates(plant)
+                locations.append((plant.user_id, latitude, longitude))
+        return BatchWeatherFetcher.group_by_cell(locations)
+
+    def prefetch(self, hour: int, wave_at: datetime = None) -> Dict:
+        """Charge les cellules de la vague ``hour`` et retourne son rapport."""
+        started = time.monotonic()
+        wave_at = wave_at or datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0)
+        cells = self.plan_wave(hour, wave_at)
+        report = {'hour': hour, 'wave_at': wave_at.isoformat(), 'cells': len(cells),
+                  'already_cached': 0, 'warmed': 0, 'failed': 0}
+
+        missing = {}
+        for cell, candidates in cells.items():
+            # Fraîche pour toute la durée de vie du cache : rien à charger
+            if weather_cache.peek(cell, max_age=weather_cache.ttl, count=False) is not None:
+                report['already_cached'] += 1
+            else:
+                missing[cell] = candidates
+
+        budget = weather_batch.quota.per_minute * self.lead_minutes
+        if budget and len(missing) > budget:
+            logger.warning(f"Vague de {hour} h : {len(missing)} cellules à charger, le quota météo n'en permet "
+                           f"que {budget:.0f} en {self.lead_minutes:g} minutes (WEATHER_QUOTA_PER_MINUTE)")
+        if missing:
+            results = weather_batch.fetch(missing, self.weather_service.get_weather_data, concurrency=self.workers)
+            for weather_data in results.values():
+                report['warmed' if weather_data is not None else 'failed'] += 1
+
+        ready = report['already_cached'] + report['warmed']
+        report['coverage'] = ready / report['cells'] if report['cells'] else 1.0
+        report['duration_ms'] = round((time.monotonic() - started) * 1000)
+        stats = weather_cache.stats()
+        with self._lock:
+            self._peek_baseline = (stats['peek_hits'], stats['peek_misses'])
+            self.reports.append(report)
+        logger.info(f"Préchauffage météo de la vague de {hour} h : {ready}/{report['cells']} cellules prêtes")
+        return report
+
+    def run_due_wave(self, now: datetime = None) -> Optional[Dict]:
+        """Préchauffe la prochaine vague si elle commence dans moins de ``lead_minutes``, une seule fois."""
+        now = now or datetime.now()
+        wave_at = (now + timedelta(minutes=self.lead_minutes)).replace(minute=0, second=0, microsecond=0)
+        if wave_at <= now:
+            return None
+        with self._lock:
+            if wave_at in self._done_waves:
+                return None
+            self._done_waves = {wave for wave in self._done_waves if wave > now}
+            self._done_waves.add(wave_at)
+        return self.prefetch(wave_at.hour, wave_at)
+
+    def current_wave(self) -> Optional[Dict]:
+        """Dernier rapport, complété du taux de succès des lectures du cache depuis le préchauffage."""
+        stats = weather_cache.stats()
+        with self._lock:
+            if not self.reports:
+                return None
+            report = dict(self.reports[-1])
+            hits = stats['peek_hits'] - self._peek_baseline[0]
+            misses = stats['peek_misses'] - self._peek_baseline[1]
+        report['lookups'] = hits + misses
+        report['hit_rate'] = hits / (hits + misses) if hits + misses else 0
+        return report
+
+    def stats(self) -> Dict[str, float]:
+        report = self.current_wave()
+        with self._lock:
+            waves = len(self.reports)
+        if report is None:
+            return {'waves': waves}
+        return {
+            'waves': waves,
+            'last_wave_hour': report['hour'],
+            'last_wave_cells': report['cells'],
+            'last_wave_warmed': report['warmed'],
+            'last_wave_failed': report['failed'],
+            'last_wave_coverage': report['coverage'],
+            'last_wave_hit_rate': report['hit_rate'],
+            'last_wave_duration_ms': report['duration_ms'],
+        }
+
+
+# Instance globale du préchauffage météo
+weather_prefetcher = WeatherPrefetcher()
+register_collector('weather_prefetch', weather_prefetcher.stats)
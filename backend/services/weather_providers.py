@@ -0,0 +1,197 @@
+"""
+Fournisseurs de données météo et historique des observations.
+
+``WeatherService`` interroge le fournisseur actif (``WEATHER_PROVIDER``) :
+
+- ``openweathermap`` appelle l'API (``WEATHER_API_URL``) avec la clé de
+  l'utilisateur ; chaque réponse est enregistrée dans ``weather_observations``
+  (cellule, horodatage, champs utiles) si ``WEATHER_RECORD_OBSERVATIONS`` est
+  activé ;
+- ``replay`` rejoue les observations enregistrées, sans réseau ni clé API :
+  la dernière observation de la cellule, antérieure à ``WEATHER_REPLAY_AT``
+  si cette date est fixée. Les tests et mesures de performance de
+  ``WateringAlgorithm`` deviennent ainsi reproductibles.
+
+Quand le fournisseur en ligne ne répond pas (erreur, disjoncteur ouvert), la
+dernière observation de la cellule est servie en mode dégradé si elle a moins
+de ``WEATHER_DEGRADED_MAX_AGE`` secondes ; elle porte alors ``degraded: True``.
+"""
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import requests
+from flask import current_app
+
+from models.user import db
+from models.weather_observation import WeatherObservation
+from services.http_client import CircuitOpenError, weather_http
+from services.metrics import register_collector
+from services.usage_recorder import usage_recorder
+
+OPENWEATHERMAP_URL = 'https://api.openweathermap.org/data/2.5'
+
+
+class WeatherProvider(ABC):
+    """Source de données météo pour une cellule."""
+
+    name = None
+    # Appelle un service externe avec la clé de l'utilisateur (sinon : données locales)
+    requires_credential = True
+
+    @abstractmethod
+    def fetch(self, cell: str, latitude: float, longitude: float,
+              credential: Optional[Tuple[int, str]] = None) -> Optional[Dict]:
+        """Retourne les données météo formatées, ou None si indisponibles."""
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """Conditions actuelles de l'API OpenWeatherMap."""
+
+    name = 'openweathermap'
+
+    def __init__(self, base_url: str = OPENWEATHERMAP_URL):
+        self.base_url = base_url
+
+    def fetch(self, cell: str, latitude: float, longitude: float,
+              credential: Optional[Tuple[int, str]] = None) -> Optional[Dict]:
+        key_id, api_key = credential
+        try:
+            # Session partagée : nouvelles tentatives, puis échec immédiat tant que le disjoncteur est ouvert
+            response = weather_http.get(f"{self.base_url}/weather", params={
+                'lat': latitude,
+                'lon': longitude,
+                'appid': api_key,
+                'units': 'metric'
+            })
+            data = response.json()
+            usage_recorder.record(key_id)
+
+            # Formatage des données pertinentes pour l'algorithme d'arrosage
+            return {
+                'temperature': data['main']['temp'],
+                'humidity': data['main']['humidity'],
+                'pressure': data['main']['pressure'],
+                'weather_main': data['weather'][0]['main'],
+                'weather_description': data['weather'][0]['description'],
+                'wind_speed': data.get('wind', {}).get('speed', 0),
+                'timestamp': datetime.utcnow().isoformat()
+            }
+
+        except CircuitOpenError:
+            current_app.logger.debug("API météo indisponible, facteur météo neutre")
+            return None
+        except requests.exceptions.RequestException as e:
+            current_app.logger.error(f"Erreur lors de l'appel à l'API météo: {e}")
+            return None
+        except KeyError as e:
+            current_app.logger.error(f"Erreur dans le format des données météo: {e}")
+            return None
+
+
+class ReplayProvider(WeatherProvider):
+    """Rejoue les observations enregistrées dans ``weather_observations``."""
+
+    name = 'replay'
+    requires_credential = False
+
+    def __init__(self, replay_at: Optional[datetime] = None):
+        self.replay_at = replay_at
+
+    def fetch(self, cell: str, latitude: float, longitude: float,
+              credential: Optional[Tuple[int, str]] = None) -> Optional[Dict]:
+        return weather_observations.latest(cell, before=self.replay_at)
+
+
+class ObservationStore:
+    """Enregistre les observations et sert la plus récente d'une cellule."""
+
+    def __init__(self, record: bool = True, degraded_max_age: float = 21600):
+        self._lock = threading.Lock()
+        self.record_enabled = record
+        self.degraded_max_age = degraded_max_age
+        self.recorded = 0
+        self.errors = 0
+        self.degraded_served = 0
+
+    def configure(self, record: bool, degraded_max_age: float):
+        with self._lock:
+            self.record_enabled = record
+            self.degraded_max_age = degraded_max_age
+            self.recorded = 0
+            self.errors = 0
+            self.degraded_served = 0
+
+    def record(self, cell: str, weather_data: Dict):
+        """Insère une observation dans sa propre transaction (jamais celle de la requête en cours)."""
+        if not self.record_enabled:
+            return
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(WeatherObservation.__table__.insert(),
+                                   [WeatherObservation.row_from_weather_data(cell, weather_data)])
+        except Exception as e:
+            current_app.logger.error(f"Erreur lors de l'enregistrement de l'observation météo: {e}")
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.recorded += 1
+
+    def latest(self, cell: str, before: Optional[datetime] = None,
+               max_age: Optional[float] = None) -> Optional[Dict]:
+        """Dernière observation de la cellule, éventuellement antérieure à ``before`` ou plus récente que ``max_age``."""
+        query = WeatherObservation.query.filter(WeatherObservation.cell == cell)
+        if before is not None:
+            query = query.filter(WeatherObservation.observed_at <= before)
+        if max_age is not None:
+            query = query.filter(WeatherObservation.observed_at >= datetime.utcnow() - timedelta(seconds=max_age))
+        observation = query.order_by(WeatherObservation.observed_at.desc()).first()
+        return observation.to_weather_data() if observation else None
+
+    def degraded(self, cell: str) -> Optional[Dict]:
+        """Observation récente servie quand le fournisseur ne répond pas."""
+        if not self.degraded_max_age:
+            return None
+        weather_data = self.latest(cell, max_age=self.degraded_max_age)
+        if weather_data is None:
+            return None
+        with self._lock:
+            self.degraded_served += 1
+        return dict(weather_data, degraded=True)
+
+    def purge(self, older_than: datetime) -> int:
+        """Supprime les observations antérieures à ``older_than`` ; retourne le nombre de lignes."""
+        table = WeatherObservation.__table__
+        with db.engine.begin() as connection:
+            return connection.execute(table.delete().where(table.c.observed_at < older_than)).rowcount
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'recorded': self.recorded,
+                'errors': self.errors,
+                'degraded_served': self.degraded_served,
+            }
+
+
+class ProviderRegistry:
+    """Fournisseurs disponibles et fournisseur actif."""
+
+    def __init__(self):
+        self.providers = {provider.name: provider for provider in (OpenWeatherMapProvider(), ReplayProvider())}
+        self.active = self.providers['openweathermap']
+
+    def configure(self, name: str, base_url: str = OPENWEATHERMAP_URL, replay_at: Optional[datetime] = None):
+        if name not in self.providers:
+            raise ValueError(f"Fournisseur météo inconnu : {name} (attendu : {', '.join(sorted(self.providers))})")
+        self.providers['openweathermap'].base_url = base_url
+        self.providers['replay'].replay_at = replay_at
+        self.active = self.providers[name]
+
+
+# Instances globales : fournisseurs et historique des observations
+weather_providers = ProviderRegistry()
+weather_observations = ObservationStore()
+register_collector('weather_observations', weather_observations.stats)
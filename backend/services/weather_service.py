@@ -1,20 +1,35 @@
-import requests
-from typing import Dict, Optional
-from datetime import datetime
-from models.user import User
-from models.api_key import ApiKey
+from typing import Dict, Iterable, Optional, Tuple
+from services.credential_cache import credential_cache
+from services.weather_batch import weather_batch
+from services.weather_cache import geohash_center, weather_cache
+from services.weather_providers import WeatherProvider, weather_observations, weather_providers
 from flask import current_app
 
+# Coordonnées utilisées quand la plante n'est pas localisée (Paris)
+DEFAULT_COORDINATES = (48.8566, 2.3522)
+
+
+def plant_coordinates(user_plant) -> Tuple[float, float]:
+    """Coordonnées météo d'une plante, ou celles par défaut"""
+    latitude = getattr(user_plant, 'latitude', None)
+    longitude = getattr(user_plant, 'longitude', None)
+    if latitude is None or longitude is None:
+        return DEFAULT_COORDINATES
+    return latitude, longitude
+
+
 class WeatherService:
     """Service pour récupérer les données météorologiques via API externe"""
     
-    def __init__(self):
-        self.base_url = "https://api.openweathermap.org/data/2.5"
-    
     def get_weather_data(self, user_id: int, latitude: float = None, longitude: float = None) -> Optional[Dict]:
         """
         Récupère les données météorologiques pour une localisation donnée
         
+        Les réponses sont partagées par cellule geohash (voir services/weather_cache.py) :
+        les utilisateurs voisins ne déclenchent qu'un appel au fournisseur par cellule.
+        Si le fournisseur ne répond pas, la dernière observation enregistrée de la
+        cellule est servie en mode dégradé (voir services/weather_providers.py).
+        
         Args:
             user_id: ID de l'utilisateur
             latitude: Latitude de la localisation (optionnel)
@@ -24,59 +39,83 @@ class WeatherService:
             Dict avec les données météo ou None en cas d'erreur
         """
         try:
-            # Récupération de la clé API de l'utilisateur
-            api_key_record = ApiKey.query.filter_by(
-                user_id=user_id, 
-                service_name='openweathermap'
-            ).first()
-            
-            if not api_key_record:
-                current_app.logger.warning(f"Aucune clé API OpenWeatherMap trouvée pour l'utilisateur {user_id}")
-                return None
+            provider = weather_providers.active
+            credential = None
+            if provider.requires_credential:
+                # Clé API de l'utilisateur, déchiffrée et mise en cache
+                credential = credential_cache.lookup(user_id, 'openweathermap')
                 
-            api_key = api_key_record.api_key
+                if not credential:
+                    current_app.logger.warning(f"Aucune clé API OpenWeatherMap trouvée pour l'utilisateur {user_id}")
+                    return None
             
             # Utilisation de coordonnées par défaut si non fournies (Paris)
             if latitude is None or longitude is None:
-                latitude, longitude = 48.8566, 2.3522
-            
-            # Appel à l'API OpenWeatherMap
-            url = f"{self.base_url}/weather"
-            params = {
-                'lat': latitude,
-                'lon': longitude,
-                'appid': api_key,
-                'units': 'metric'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Formatage des données pertinentes pour l'algorithme d'arrosage
-            weather_data = {
-                'temperature': data['main']['temp'],
-                'humidity': data['main']['humidity'],
-                'pressure': data['main']['pressure'],
-                'weather_main': data['weather'][0]['main'],
-                'weather_description': data['weather'][0]['description'],
-                'wind_speed': data.get('wind', {}).get('speed', 0),
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            
+                latitude, longitude = DEFAULT_COORDINATES
+            
+            # Une seule requête par cellule, partagée entre voisins : on interroge le centre de la cellule
+            cell = weather_cache.cell_for(latitude, longitude)
+            center_latitude, center_longitude = geohash_center(cell)
+            weather_data = weather_cache.get_or_fetch(
+                cell, lambda: self._fetch_weather(provider, cell, center_latitude, center_longitude, credential)
+            )
+            if weather_data is None and provider.requires_credential:
+                weather_data = weather_observations.degraded(cell)
             return weather_data
             
-        except requests.exceptions.RequestException as e:
-            current_app.logger.error(f"Erreur lors de l'appel à l'API météo: {e}")
-            return None
-        except KeyError as e:
-            current_app.logger.error(f"Erreur dans le format des données météo: {e}")
-            return None
         except Exception as e:
             current_app.logger.error(f"Erreur inattendue dans le service météo: {e}")
             return None
     
+    def get_weather_batch(self, locations: Iterable[Tuple[int, float, float]],
+                          concurrency: int = None) -> Dict[str, Optional[Dict]]:
+        """
+        Récupère en parallèle la météo de nombreuses localisations (recalcul de toute la flotte)
+        
+        Args:
+            locations: ``(user_id, latitude, longitude)`` ; latitude/longitude None = coordonnées par défaut
+            concurrency: Appels simultanés (WEATHER_BATCH_CONCURRENCY par défaut)
+            
+        Returns:
+            Dict cellule geohash -> données météo (None si indisponibles)
+        """
+        normalized = [
+            (user_id, latitude, longitude) if latitude is not None and longitude is not None
+            else (user_id, *DEFAULT_COORDINATES)
+            for user_id, latitude, longitude in locations
+        ]
+        return weather_batch.fetch(weather_batch.group_by_cell(normalized), self.get_weather_data, concurrency)
+    
+    def get_cached_weather(self, user_id: int, latitude: float = None, longitude: float = None) -> Optional[Dict]:
+        """
+        Retourne la météo déjà en cache pour la cellule, sans jamais appeler le fournisseur
+        
+        Utilisé pendant la génération des notifications : le cache est préchauffé
+        avant chaque vague (voir services/weather_prefetch.py).
+        """
+        try:
+            provider = weather_providers.active
+            if provider.requires_credential and not credential_cache.lookup(user_id, 'openweathermap'):
+                return None
+            if latitude is None or longitude is None:
+                latitude, longitude = DEFAULT_COORDINATES
+            cell = weather_cache.cell_for(latitude, longitude)
+            weather_data = weather_cache.peek(cell)
+            if weather_data is None and provider.requires_credential:
+                weather_data = weather_observations.degraded(cell)
+            return weather_data
+        except Exception as e:
+            current_app.logger.error(f"Erreur lors de la lecture du cache météo: {e}")
+            return None
+    
+    def _fetch_weather(self, provider: WeatherProvider, cell: str, latitude: float, longitude: float,
+                       credential: Optional[Tuple[int, str]]) -> Optional[Dict]:
+        """Interroge le fournisseur et enregistre les observations reçues en ligne"""
+        weather_data = provider.fetch(cell, latitude, longitude, credential)
+        if weather_data is not None and provider.requires_credential:
+            weather_observations.record(cell, weather_data)
+        return weather_data
+    
     def calculate_weather_factor(self, weather_data: Dict) -> float:
         """
         Calcule un facteur météorologique pour ajuster la fréquence d'arrosage
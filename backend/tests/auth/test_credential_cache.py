@@ -0,0 +1,80 @@
+import pytest
+import jwt
+import datetime
+from unittest.mock import patch, MagicMock
+from models.user import db, User
+from models.api_key import ApiKey
+from services.credential_cache import credential_cache
+from services.weather_service import WeatherService
+
+OWM_KEY = 'a' * 32
+
+
+@pytest.fixture
+def user_with_key(app):
+    """Crée un utilisateur avec une clé OpenWeatherMap active et son token"""
+    user = User(email='weather@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    api_key = ApiKey(user_id=user.id, service_name='openweathermap', key_name='Météo')
+    api_key.encrypt_key(OWM_KEY)
+    db.session.add(api_key)
+    db.session.commit()
+    payload = {
+        'user_id': user.id,
+        'email': user.email,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }
+    token = jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+    return user.id, api_key.id, {'Authorization': f'Bearer {token}'}
+
+
+def test_credential_is_decrypted_once(app, user_with_key):
+    """Test les appels suivants ne requêtent ni ne déchiffrent la clé"""
+    user_id, _, _ = user_with_key
+    assert credential_cache.get(user_id, 'openweathermap') == OWM_KEY
+
+    with patch.object(ApiKey, 'get_active_key_for_service') as lookup:
+        assert credential_cache.get(user_id, 'openweathermap') == OWM_KEY
+        lookup.assert_not_called()
+
+
+def test_missing_credential_is_cached(app, user_with_key):
+    """Test l'absence de clé est aussi mémorisée"""
+    user_id, _, _ = user_with_key
+    assert credential_cache.get(user_id, 'openai') is None
+    with patch.object(ApiKey, 'get_active_key_for_service') as lookup:
+        assert credential_cache.get(user_id, 'openai') is None
+        lookup.assert_not_called()
+
+
+def test_routes_invalidate_cached_credential(client, user_with_key):
+    """Test désactivation, création et suppression invalident le cache"""
+    user_id, key_id, headers = user_with_key
+    assert credential_cache.get(user_id, 'openweathermap') == OWM_KEY
+
+    assert client.put(f'/api/keys/{key_id}', headers=headers, json={'is_active': False}).status_code == 200
+    assert credential_cache.get(user_id, 'openweathermap') is None
+
+    response = client.post('/api/keys/', headers=headers, json={
+        'service_name': 'openweathermap', 'api_key': 'b' * 32, 'key_name': 'Nouvelle'})
+    assert response.status_code == 201
+    assert credential_cache.get(user_id, 'openweathermap') == 'b' * 32
+
+    assert client.delete(f"/api/keys/{response.json['id']}", headers=headers).status_code == 200
+    assert credential_cache.get(user_id, 'openweathermap') is None
+
+
+def test_weather_service_uses_cached_credential(app, user_with_key):
+    """Test le service météo transmet la clé déchiffrée à l'API"""
+    user_id, _, _ = user_with_key
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        'main': {'temp': 21, 'humidity': 55, 'pressure': 1012},
+        'weather': [{'main': 'Clear', 'description': 'ciel dégagé'}],
+    }
+    with patch('requests.Session.get', return_value=response) as get:
+        weather = WeatherService().get_weather_data(user_id, 48.85, 2.35)
+
+    assert weather['temperature'] == 21
+    assert get.call_args.kwargs['params']['appid'] == OWM_KEY
@@ -0,0 +1,88 @@
+import pytest
+import jwt
+import datetime
+from sqlalchemy import event
+from models.user import db, User
+from werkzeug.security import generate_password_hash
+from services.identity_cache import identity_cache
+
+
+@pytest.fixture
+def user_token(app):
+    """Crée un utilisateur et retourne son identifiant et un token JWT"""
+    with app.app_context():
+        user = User(
+            email='identity@example.com',
+            password_hash=generate_password_hash('Password123!', method='pbkdf2:sha256'),
+            username='identity'
+        )
+        db.session.add(user)
+        db.session.commit()
+        payload = {
+            'user_id': user.id,
+            'email': user.email,
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
+        }
+        return user.id, jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+
+
+@pytest.fixture
+def users_selects(app):
+    """Compte les requêtes SELECT exécutées sur la table users"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM users' in statement:
+            statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_repeated_profile_reads_hit_cache(client, user_token, users_selects):
+    """Test les lectures répétées du profil n'interrogent la table users qu'une fois"""
+    user_id, token = user_token
+    headers = {'Authorization': f'Bearer {token}'}
+    for _ in range(3):
+        response = client.get('/auth/profile', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['username'] == 'identity'
+    assert len(users_selects) == 1
+
+
+def test_update_profile_invalidates_cache(client, user_token):
+    """Test la mise à jour du profil invalide l'instantané en cache"""
+    user_id, token = user_token
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/auth/profile', headers=headers)
+
+    response = client.put('/auth/profile', headers=headers, json={'first_name': 'Rose'})
+    assert response.status_code == 200
+
+    response = client.get('/auth/profile', headers=headers)
+    assert response.get_json()['first_name'] == 'Rose'
+
+
+def test_deactivation_invalidates_cache(app, client, user_token):
+    """Test une désactivation de compte via l'ORM invalide l'instantané en cache"""
+    user_id, token = user_token
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/auth/profile', headers=headers).get_json()['is_active'] is True
+
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.is_active = False
+        db.session.commit()
+
+    assert client.get('/auth/profile', headers=headers).get_json()['is_active'] is False
+
+
+def test_cached_snapshot_is_detached(app, user_token):
+    """Test l'instantané mis en cache ne dépend pas de la session"""
+    user_id, token = user_token
+    with app.app_context():
+        snapshot = identity_cache.get_user(user_id)
+        assert snapshot not in db.session
+        assert snapshot.email == 'identity@example.com'
@@ -0,0 +1,97 @@
+import pytest
+import jwt
+import time
+import datetime
+from models.user import db, User
+from models.api_key import ApiKey
+from services.key_probe import key_prober
+
+PROBE_DELAY = 0.4
+
+
+@pytest.fixture
+def stub_provider(stub_server):
+    """Fournisseur factice : /slow attend, /unauthorized refuse, /hang dépasse les délais"""
+    server = stub_server(body={}, routes={'/slow': (200, PROBE_DELAY), '/unauthorized': (401, 0), '/hang': (200, 2)})
+    return server, server.base_url
+
+
+@pytest.fixture
+def user_keys(app):
+    """Crée un utilisateur avec une clé active pour quatre fournisseurs"""
+    user = User(email='probe@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    for service_name, secret in [('openai', 'sk-' + 'a' * 30), ('claude', 'sk-ant-' + 'b' * 30),
+                                 ('huggingface', 'hf_' + 'c' * 30), ('openweathermap', 'd' * 32)]:
+        key = ApiKey(user_id=user.id, service_name=service_name, key_name=f'Clé {service_name}')
+        key.encrypt_key(secret)
+        db.session.add(key)
+    db.session.commit()
+    payload = {
+        'user_id': user.id,
+        'email': user.email,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }
+    token = jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_probes_run_concurrently(client, stub_provider, user_keys):
+    """Test quatre sondes lentes prennent le temps de la plus lente, pas la somme"""
+    server, base_url = stub_provider
+    key_prober.configure(8, 2, 5, urls={service: f'{base_url}/slow'
+                                        for service in ['openai', 'claude', 'huggingface', 'openweathermap']})
+
+    started = time.monotonic()
+    response = client.post('/api/keys/test-all', headers=user_keys)
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    assert response.json['total'] == 4
+    assert response.json['healthy'] == 4
+    assert elapsed < PROBE_DELAY * 2.5
+    # La clé est transmise selon le schéma de chaque fournisseur, jamais renvoyée au client
+    headers_by_key = {h.get('Authorization') or h.get('x-api-key') or q.get('appid', [None])[0]
+                      for _, h, q in server.requests}
+    assert 'Bearer sk-' + 'a' * 30 in headers_by_key
+    assert 'sk-ant-' + 'b' * 30 in headers_by_key
+    assert 'd' * 32 in headers_by_key
+    assert 'sk-' not in response.get_data(as_text=True)
+
+
+def test_per_service_status_and_timeouts(client, stub_provider, user_keys):
+    """Test clé refusée, délai par service dépassé et échéance globale"""
+    server, base_url = stub_provider
+    key_prober.configure(
+        8, 2, 1,
+        urls={'openai': f'{base_url}/ok', 'claude': f'{base_url}/unauthorized',
+              'huggingface': f'{base_url}/hang', 'openweathermap': f'{base_url}/hang'},
+        timeouts={'huggingface': 0.2},
+    )
+
+    started = time.monotonic()
+    response = client.post('/api/keys/test-all', headers=user_keys)
+    elapsed = time.monotonic() - started
+
+    statuses = {result['service_name']: result for result in response.json['results']}
+    assert statuses['openai']['status'] == 'ok'
+    assert statuses['claude']['status'] == 'invalid'
+    assert statuses['claude']['http_status'] == 401
+    assert statuses['huggingface']['status'] == 'timeout'
+    assert statuses['openweathermap']['status'] == 'timeout'
+    assert statuses['openweathermap']['message'] == 'Échéance globale dépassée'
+    assert response.json['healthy'] == 1
+    assert elapsed < 1.8
+
+
+def test_single_key_test_uses_probe(client, stub_provider, user_keys):
+    """Test la route /test existante interroge le fournisseur"""
+    server, base_url = stub_provider
+    key_prober.configure(8, 2, 5, urls={'openai': f'{base_url}/unauthorized'})
+    key_id = ApiKey.query.filter_by(service_name='openai').first().id
+
+    response = client.post(f'/api/keys/{key_id}/test', headers=user_keys)
+
+    assert response.status_code == 400
+    assert response.json['probe']['status'] == 'invalid'
@@ -0,0 +1,94 @@
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from models.user import db, User
+from models.api_key import ApiKey
+from services.keyring import Keyring, keyring, parse_keys
+from services.key_rotation import ReencryptionJob
+
+
+def test_parse_keys_keeps_primary_first():
+    """Test ENCRYPTION_KEY accepte une liste de clés séparées par des virgules"""
+    assert parse_keys(' a , b,,c ') == [b'a', b'b', b'c']
+    assert parse_keys(None) == []
+
+
+def test_rotation_keeps_old_tokens_readable():
+    """Test une clé retirée de la tête du trousseau déchiffre toujours"""
+    old_key, new_key = Fernet.generate_key(), Fernet.generate_key()
+    ring = Keyring()
+    ring.configure([old_key])
+    token = ring.encrypt('sk-secret')
+
+    ring.configure([new_key, old_key])
+    assert ring.decrypt(token) == 'sk-secret'
+    assert ring.needs_rotation(token)
+    rotated = ring.rotate(token)
+    assert not ring.needs_rotation(rotated)
+
+    ring.configure([new_key])
+    assert ring.decrypt(rotated) == 'sk-secret'
+    with pytest.raises(InvalidToken):
+        ring.decrypt(token)
+
+
+def _create_keys(count, key):
+    keyring.configure([key])
+    user = User(email='rotation@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    for i in range(count):
+        api_key = ApiKey(user_id=user.id, service_name=f'service{i}', key_name=f'Clé {i}')
+        api_key.encrypt_key(f'sk-{i:030d}')
+        db.session.add(api_key)
+    db.session.commit()
+    return user
+
+
+def test_reencryption_job_rotates_in_chunks(app):
+    """Test le job re-chiffre toutes les lignes par lots et suit sa progression"""
+    old_key, new_key = Fernet.generate_key(), Fernet.generate_key()
+    _create_keys(5, old_key)
+    keyring.configure([new_key, old_key])
+
+    chunks = []
+    progress = ReencryptionJob(chunk_size=2).run(on_chunk=chunks.append)
+
+    assert progress['status'] == 'done'
+    assert progress['total'] == 5
+    assert progress['rotated'] == 5
+    assert [chunk['processed'] for chunk in chunks] == [2, 4, 5]
+
+    # L'ancienne clé peut être retirée
+    keyring.configure([new_key])
+    db.session.expire_all()
+    assert sorted(key.decrypt_key() for key in ApiKey.query.all()) == [f'sk-{i:030d}' for i in range(5)]
+
+
+def test_reencryption_job_skips_current_and_unknown_keys(app):
+    """Test les lignes déjà à jour sont ignorées et les indéchiffrables comptées"""
+    key, unknown_key = Fernet.generate_key(), Fernet.generate_key()
+    user = _create_keys(2, key)
+    keyring.configure([unknown_key])
+    stray = ApiKey(user_id=user.id, service_name='other', key_name='Inconnue')
+    stray.encrypt_key('sk-orphan')
+    db.session.add(stray)
+    db.session.commit()
+    keyring.configure([key])
+
+    progress = ReencryptionJob().run()
+
+    assert progress['status'] == 'done'
+    assert progress['rotated'] == 0
+    assert progress['failed'] == 1
+
+
+def test_keys_rotate_cli(app):
+    """Test la commande flask keys rotate"""
+    old_key, new_key = Fernet.generate_key(), Fernet.generate_key()
+    _create_keys(3, old_key)
+    keyring.configure([new_key, old_key])
+
+    result = app.test_cli_runner().invoke(args=['keys', 'rotate', '--chunk-size', '2'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Rotation terminée : 3 clés re-chiffrées' in result.output
@@ -0,0 +1,92 @@
+import pytest
+import threading
+from models.user import db, User
+from werkzeug.security import generate_password_hash
+from services.password_hasher import PasswordHasher, HashingOverloaded, password_hasher
+
+
+def test_hash_and_verify_through_pool():
+    """Test le hachage et la vérification passent par le pool"""
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    password_hash = hasher.hash('Password123!')
+    assert hasher.verify(password_hash, 'Password123!') is True
+    assert hasher.verify(password_hash, 'wrong') is False
+    assert hasher.stats()['completed'] == 3
+
+
+def test_pool_rejects_beyond_queue_depth():
+    """Test les appels au-delà de la file maximale sont refusés immédiatement"""
+    hasher = PasswordHasher(workers=1, max_pending=1, retry_after=3)
+    release = threading.Event()
+    blocker = threading.Thread(target=hasher._run, args=(release.wait,))
+    blocker.start()
+    try:
+        while hasher.stats()['pending'] == 0:
+            pass
+        with pytest.raises(HashingOverloaded) as error:
+            hasher.hash('Password123!')
+        assert error.value.retry_after == 3
+        assert hasher.stats()['rejected'] == 1
+    finally:
+        release.set()
+        blocker.join()
+
+
+def test_login_returns_503_when_pool_saturated(client, app):
+    """Test la connexion répond 503 avec Retry-After quand le pool est saturé"""
+    with app.app_context():
+        db.session.add(User(email='storm@example.com',
+                            password_hash=generate_password_hash('Password123!', method='pbkdf2:sha256')))
+        db.session.commit()
+    password_hasher.configure(workers=1, max_pending=0, timeout=10, retry_after=2)
+
+    response = client.post('/auth/login', json={'email': 'storm@example.com', 'password': 'Password123!'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+
+
+def test_signup_returns_503_when_pool_saturated(client):
+    """Test l'inscription répond 503 quand le pool est saturé"""
+    password_hasher.configure(workers=1, max_pending=0, timeout=10, retry_after=1)
+    response = client.post('/auth/signup', json={'email': 'new@example.com', 'password': 'Password123!'})
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+
+def test_calibration_respects_floor():
+    """Test la calibration ne descend jamais sous le plancher d'itérations"""
+    from services.password_hasher import calibrate_iterations
+    assert calibrate_iterations(0.001, 310000) == 310000
+    assert calibrate_iterations(50, 1000) >= 1000
+
+
+def test_needs_rehash_detects_outdated_parameters():
+    """Test les hachages aux paramètres éloignés de la cible sont à recalculer"""
+    hasher = PasswordHasher()
+    hasher.configure(workers=1, max_pending=4, timeout=10, retry_after=1, iterations=400000)
+    assert hasher.needs_rehash('pbkdf2:sha256:400000$salt$hash') is False
+    assert hasher.needs_rehash('pbkdf2:sha256:420000$salt$hash') is False
+    assert hasher.needs_rehash('pbkdf2:sha256:1000$salt$hash') is True
+    assert hasher.needs_rehash('pbkdf2:sha256:2000000$salt$hash') is True
+    assert hasher.needs_rehash('scrypt:32768:8:1$salt$hash') is True
+
+
+def test_login_rehashes_outdated_hash(client, app):
+    """Test la connexion recalcule un hachage périmé sans changer le mot de passe"""
+    with app.app_context():
+        user = User(email='legacy@example.com',
+                    password_hash=generate_password_hash('Password123!', method='pbkdf2:sha256:1000'))
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    response = client.post('/auth/login', json={'email': 'legacy@example.com', 'password': 'Password123!'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        stored_hash = db.session.get(User, user_id).password_hash
+    assert stored_hash.startswith(password_hasher.method + '$')
+
+    response = client.post('/auth/login', json={'email': 'legacy@example.com', 'password': 'Password123!'})
+    assert response.status_code == 200
@@ -53,3 +53,26 @@ def test_protected_route_with_revoked_token(client):
     })
     assert revoked_response.status_code == 401
     assert revoked_response.get_json()['error'] == 'Token révoqué'
+
+def test_protected_route_decodes_token_once(client):
+    email = 'singledecode@example.com'
+    password = 'Password123!'
+    user = User(email=email, password_hash=generate_password_hash(password, method='pbkdf2:sha256'))
+    from models.user import db
+    from unittest.mock import patch
+    with client.application.app_context():
+        db.session.add(user)
+        db.session.commit()
+    response = client.post('/auth/login', json={
+        'email': email,
+        'password': password
+    })
+    token = response.get_json()['access_token']
+    # jwt_required vérifie le token, get_current_user réutilise les claims
+    with patch('routes.auth.jwt.decode', wraps=jwt.decode) as decode:
+        profile_response = client.get('/auth/profile', headers={
+            'Authorization': f'Bearer {token}'
+        })
+    assert profile_response.status_code == 200
+    assert profile_response.get_json()['email'] == email
+    assert decode.call_count == 1
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from models.user import db
+from models.revoked_token import RevokedToken
+from services.revocation_store import BloomFilter, RevocationStore
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test toutes les clés ajoutées sont reconnues par le filtre"""
+    bloom = BloomFilter(capacity=1000)
+    keys = [f'token-{i}' for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f'other-{i}' in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_unrevoked_token_is_answered_without_database(app):
+    """Test un token non révoqué est tranché par le filtre sans requête de vérification"""
+    with app.app_context():
+        store = RevocationStore(sync_interval=60)
+        store.revoke('revoked-jti', datetime.utcnow() + timedelta(hours=1))
+        assert store.is_revoked('unknown-jti') is False
+        assert store.is_revoked('revoked-jti') is True
+        stats = store.stats()
+        assert stats['bloom_negatives'] == 1
+        assert stats['db_checks'] == 1
+
+
+def test_revocation_is_visible_to_other_workers(app):
+    """Test une révocation faite par un worker est vue par les autres après synchronisation"""
+    with app.app_context():
+        worker_a = RevocationStore(sync_interval=0)
+        worker_b = RevocationStore(sync_interval=0)
+        assert worker_b.is_revoked('shared-jti') is False
+
+        worker_a.revoke('shared-jti', datetime.utcnow() + timedelta(hours=1))
+
+        assert worker_b.is_revoked('shared-jti') is True
+
+
+def test_purge_removes_expired_revocations(app):
+    """Test la purge supprime les révocations expirées"""
+    with app.app_context():
+        db.session.add(RevokedToken(jti='expired-jti', expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        db.session.add(RevokedToken(jti='active-jti', expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db.session.commit()
+
+        store = RevocationStore()
+        assert store.purge_expired() == 1
+        assert RevokedToken.query.filter_by(jti='expired-jti').first() is None
+        assert store.is_revoked('active-jti') is True
@@ -0,0 +1,81 @@
+import time
+import jwt
+import datetime
+from unittest.mock import patch
+from models.user import db, User
+from werkzeug.security import generate_password_hash
+from services.token_cache import VerifiedTokenCache, token_cache
+
+
+def make_token(secret, user_id=1, hours=24):
+    payload = {
+        'user_id': user_id,
+        'email': f'user{user_id}@example.com',
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=hours)
+    }
+    return jwt.encode(payload, secret, algorithm='HS256')
+
+
+def test_cache_returns_claims_until_expiry():
+    """Test les claims sont servis tant que le token n'est pas expiré"""
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put('token', 'secret', {'user_id': 1, 'exp': time.time() + 60})
+    assert cache.get('token', 'secret')['user_id'] == 1
+    cache.put('expired', 'secret', {'user_id': 2, 'exp': time.time() - 1})
+    assert cache.get('expired', 'secret') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_is_bounded_lru():
+    """Test le cache évince l'entrée la moins récemment utilisée"""
+    cache = VerifiedTokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put('a', 'secret', {'exp': exp})
+    cache.put('b', 'secret', {'exp': exp})
+    cache.get('a', 'secret')
+    cache.put('c', 'secret', {'exp': exp})
+    assert cache.get('b', 'secret') is None
+    assert cache.get('a', 'secret') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_cache_is_keyed_by_secret():
+    """Test un token n'est pas servi pour un autre secret"""
+    cache = VerifiedTokenCache()
+    cache.put('token', 'secret-1', {'exp': time.time() + 60})
+    assert cache.get('token', 'secret-2') is None
+
+
+def test_repeat_authentication_skips_signature_verification(client, app):
+    """Test les requêtes suivantes avec le même token ne redécodent pas le JWT"""
+    with app.app_context():
+        user = User(email='cached@example.com',
+                    password_hash=generate_password_hash('Password123!', method='pbkdf2:sha256'))
+        db.session.add(user)
+        db.session.commit()
+        token = make_token(app.config['SECRET_KEY'], user.id)
+
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/auth/protected', headers=headers).status_code == 200
+    with patch('routes.auth.jwt.decode', wraps=jwt.decode) as decode:
+        for _ in range(3):
+            assert client.get('/auth/protected', headers=headers).status_code == 200
+    assert decode.call_count == 0
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'bloomzy_token_cache_hits' in metrics
+
+
+def test_logout_evicts_cached_token(client, app):
+    """Test la déconnexion retire le token du cache"""
+    token = make_token(app.config['SECRET_KEY'])
+    assert client.get('/auth/protected', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    assert token_cache.get(token, app.config['SECRET_KEY']) is not None
+
+    client.post('/auth/logout', json={'access_token': token})
+
+    assert token_cache.get(token, app.config['SECRET_KEY']) is None
+    response = client.get('/auth/protected', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Token révoqué'
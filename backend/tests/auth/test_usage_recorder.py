@@ -0,0 +1,70 @@
+import pytest
+import jwt
+import datetime
+from unittest.mock import patch
+from models.user import db, User
+from models.api_key import ApiKey
+from services.usage_recorder import usage_recorder
+
+
+@pytest.fixture
+def api_key(app):
+    """Crée une clé API active et le token de son propriétaire"""
+    usage_recorder.init_app(app, 3600)  # Pas de vidage périodique pendant le test
+    user = User(email='usage@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    key = ApiKey(user_id=user.id, service_name='openai', key_name='Ma clé')
+    key.encrypt_key('sk-1234567890abcdef1234567890abcdef')
+    db.session.add(key)
+    db.session.commit()
+    payload = {
+        'user_id': user.id,
+        'email': user.email,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }
+    token = jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+    return key, {'Authorization': f'Bearer {token}'}
+
+
+def test_usage_is_buffered_until_flush(client, api_key):
+    """Test un test de clé ne déclenche aucune écriture avant le vidage"""
+    key, headers = api_key
+    updated_at = key.updated_at
+    with patch.object(ApiKey, 'test_connection', return_value={'status': 'ok'}):
+        assert client.post(f'/api/keys/{key.id}/test', headers=headers).status_code == 200
+
+    db.session.expire_all()
+    assert db.session.get(ApiKey, key.id).last_used is None
+    # Le processus relit ses propres utilisations en attente
+    assert client.get(f'/api/keys/{key.id}', headers=headers).json['last_used'] is not None
+
+    assert usage_recorder.flush() == 1
+    db.session.expire_all()
+    stored = db.session.get(ApiKey, key.id)
+    assert stored.last_used is not None
+    assert stored.updated_at == updated_at
+
+
+def test_flush_batches_and_keeps_latest_timestamp(app, api_key):
+    """Test plusieurs utilisations d'une clé produisent une seule ligne, la plus récente"""
+    key, _ = api_key
+    latest = datetime.datetime(2030, 1, 1, 12, 0)
+    usage_recorder.record(key.id, latest)
+    usage_recorder.record(key.id, latest - datetime.timedelta(minutes=5))
+    usage_recorder.record(999, latest)  # clé supprimée entre-temps : ignorée
+
+    assert usage_recorder.flush() == 2
+    db.session.expire_all()
+    assert db.session.get(ApiKey, key.id).last_used == latest
+    assert usage_recorder.flush() == 0
+
+
+def test_failed_flush_keeps_pending_usage(app, api_key):
+    """Test un échec d'écriture conserve les horodatages pour le prochain passage"""
+    key, _ = api_key
+    usage_recorder.record(key.id)
+    with patch.object(db.engine, 'begin', side_effect=RuntimeError('base verrouillée')):
+        assert usage_recorder.flush() == 0
+    assert usage_recorder.pending_for(key.id) is not None
+    assert usage_recorder.flush() == 1
@@ -0,0 +1,110 @@
+import pytest
+import json
+from models.user import db, User
+from models.notification import NotificationPreferences
+from services.notification_service import DEFAULT_PREFERENCE_SETTINGS
+from services.user_provisioning import UserImporter, load_checkpoint
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Hachage peu coûteux pour les tests
+FAST_METHOD = 'pbkdf2:sha256:1000'
+
+
+def write_jsonl(path, records):
+    path.write_text('\n'.join(json.dumps(record) for record in records) + '\n')
+    return str(path)
+
+
+def test_import_jsonl_creates_users_and_preferences(app, tmp_path):
+    """Test import en masse avec préférences par défaut"""
+    path = write_jsonl(tmp_path / 'users.jsonl', [
+        {'email': f'user{i}@example.com', 'password': 'Password123', 'username': f'user{i}'}
+        for i in range(5)
+    ])
+    progress = []
+    stats = UserImporter(batch_size=2, workers=0, method=FAST_METHOD, progress=progress.append).run(path)
+
+    assert stats['imported'] == 5
+    assert [report['position'] for report in progress] == [2, 4, 5]
+    user = User.query.filter_by(email='user3@example.com').first()
+    assert user.username == 'user3'
+    assert check_password_hash(user.password_hash, 'Password123')
+    assert NotificationPreferences.query.filter_by(user_id=user.id).count() == len(DEFAULT_PREFERENCE_SETTINGS)
+    # Import terminé : plus de fichier de reprise
+    assert not (tmp_path / 'users.jsonl.checkpoint').exists()
+
+
+def test_import_rejects_invalid_and_duplicates(app, tmp_path):
+    """Test validation, doublons en base et dans le fichier, rapport d'erreurs"""
+    db.session.add(User(email='taken@example.com',
+                        password_hash=generate_password_hash('Password123', method=FAST_METHOD)))
+    db.session.commit()
+    path = tmp_path / 'users.jsonl'
+    path.write_text('\n'.join([
+        json.dumps({'email': 'taken@example.com', 'password': 'Password123'}),
+        json.dumps({'email': 'new@example.com', 'password': 'Password123'}),
+        json.dumps({'email': 'new@example.com', 'password': 'Password456'}),
+        json.dumps({'email': 'not-an-email', 'password': 'Password123'}),
+        json.dumps({'email': 'weak@example.com', 'password': '12345678'}),
+        '{broken json',
+    ]) + '\n')
+    errors_path = tmp_path / 'errors.jsonl'
+
+    stats = UserImporter(workers=0, method=FAST_METHOD).run(str(path), errors_path=str(errors_path))
+
+    assert stats['imported'] == 1
+    assert stats['duplicates'] == 2
+    assert stats['invalid'] == 3
+    reasons = [json.loads(line)['reason'] for line in errors_path.read_text().splitlines()]
+    assert 'Email existe déjà' in reasons
+    assert 'Mot de passe trop faible' in reasons
+
+
+def test_import_csv_with_process_pool(app, tmp_path):
+    """Test lecture CSV et hachage sur un pool de processus"""
+    path = tmp_path / 'users.csv'
+    path.write_text('email,password,first_name\n'
+                    'a@example.com,Password123,Alice\n'
+                    'b@example.com,Password123,Bob\n')
+
+    stats = UserImporter(workers=2, method=FAST_METHOD).run(str(path))
+
+    assert stats['imported'] == 2
+    assert User.query.filter_by(email='b@example.com').first().first_name == 'Bob'
+
+
+def test_import_resumes_from_checkpoint(app, tmp_path):
+    """Test une exécution interrompue reprend après le dernier lot validé"""
+    path = write_jsonl(tmp_path / 'users.jsonl', [
+        {'email': f'user{i}@example.com', 'password': 'Password123'} for i in range(4)
+    ])
+    importer = UserImporter(batch_size=2, workers=0, method=FAST_METHOD)
+    original = importer._import_batch
+    calls = []
+
+    def crash_on_second_batch(batch, *args):
+        calls.append(batch)
+        if len(calls) == 2:
+            raise RuntimeError('interruption')
+        return original(batch, *args)
+
+    importer._import_batch = crash_on_second_batch
+    with pytest.raises(RuntimeError):
+        importer.run(path)
+    assert load_checkpoint(path + '.checkpoint')['position'] == 2
+    assert User.query.count() == 2
+
+    stats = UserImporter(batch_size=2, workers=0, method=FAST_METHOD).run(path)
+    assert stats['resumed_from'] == 2
+    assert stats['imported'] == 4
+    assert User.query.count() == 4
+
+
+def test_cli_import_command(app, tmp_path):
+    """Test la commande flask users import"""
+    path = write_jsonl(tmp_path / 'users.jsonl', [{'email': 'cli@example.com', 'password': 'Password123'}])
+    result = app.test_cli_runner().invoke(args=['users', 'import', path, '--workers', '0'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Import terminé : 1 comptes créés' in result.output
+    assert User.query.filter_by(email='cli@example.com').count() == 1
@@ -1,19 +1,51 @@
 import pytest
 from app import create_app
-from models.user import db
+from models.user import db, User
+from models.api_key import ApiKey
+from services.usage_recorder import usage_recorder
+from tests.stub_provider import StubServer
 
 @pytest.fixture
 def app():
     app = create_app()
     app.config['TESTING'] = True
     app.config['SECRET_KEY'] = 'test-secret-key'
+    app.config['RATELIMIT_ENABLED'] = False
     
     with app.app_context():
         db.create_all()
         yield app
+        usage_recorder.flush()  # Pas d'écriture différée après la suppression des tables
         db.drop_all()
 
 @pytest.fixture
 def client(app):
     with app.test_client() as client:
         yield client
+
+@pytest.fixture
+def stub_server():
+    """Démarre des fournisseurs HTTP factices (voir ``StubServer``), arrêtés en fin de test"""
+    servers = []
+
+    def start(**options):
+        server = StubServer(**options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def weather_api_key(app):
+    """Utilisateur disposant d'une clé OpenWeatherMap active ; retourne la clé"""
+    user = User(email='meteo@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    key = ApiKey(user_id=user.id, service_name='openweathermap', key_name='Météo')
+    key.encrypt_key('a' * 32)
+    db.session.add(key)
+    db.session.commit()
+    return key
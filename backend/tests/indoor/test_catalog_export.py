@@ -0,0 +1,69 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from sqlalchemy import insert
+from models.indoor_plant import IndoorPlant
+from app import db
+from services import catalog_export
+from services.catalog_import import CatalogImporter
+from services.user_provisioning import parse_records
+
+
+@pytest.fixture
+def catalog(app):
+    db.session.execute(insert(IndoorPlant), [
+        {'scientific_name': f'Species {index:04d}', 'common_names': 'Plante, « verte »',
+         'watering_frequency': 7, 'air_purification': index % 2 == 0}
+        for index in range(2500)
+    ])
+    db.session.commit()
+
+
+def test_jsonl_export_streams_every_row(app, client, catalog, monkeypatch):
+    """Test l'export JSONL est envoyé en plusieurs morceaux, sans Content-Length"""
+    monkeypatch.setattr(catalog_export, 'EXPORT_CHUNK_BYTES', 16 * 1024)
+
+    response = client.get('/indoor-plants/export?format=jsonl')
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert 'Content-Length' not in response.headers
+    assert len(list(response.response)) > 1
+    response = client.get('/indoor-plants/export?format=jsonl')
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 2500
+    assert rows[0]['scientific_name'] == 'Species 0000'
+    assert rows[0]['air_purification'] is True
+
+
+def test_csv_export_is_gzipped_on_request_and_reimportable(app, client, catalog):
+    """Test gzip négocié par Accept-Encoding et export CSV conforme à l'import"""
+    response = client.get('/indoor-plants/export?format=csv', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Content-Type'].startswith('text/csv')
+    text = gzip.decompress(response.get_data()).decode('utf-8')
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert len(rows) == 2500
+    assert rows[1]['common_names'] == 'Plante, « verte »'
+    assert rows[1]['air_purification'] == 'false'
+
+    # Catalogue vidé puis réimporté depuis l'export
+    IndoorPlant.query.delete()
+    db.session.commit()
+    stats = CatalogImporter().run(parse_records(io.StringIO(text, newline=''), 'csv'))
+    assert (stats['imported'], stats['invalid']) == (2500, 0)
+
+
+def test_export_is_not_gzipped_when_refused(app, client, catalog):
+    """Test gzip;q=0 interdit la compression"""
+    response = client.get('/indoor-plants/export?format=jsonl', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_data(as_text=True).splitlines()) == 2500
+
+
+def test_export_rejects_unknown_format(app, client):
+    assert client.get('/indoor-plants/export?format=xml').status_code == 400
@@ -0,0 +1,138 @@
+import datetime
+import json
+import jwt
+import pytest
+from sqlalchemy import event
+from models.indoor_plant import IndoorPlant
+from models.user import User
+from app import db
+from services.catalog_import import CatalogImporter, normalize_common_names
+from services.species_cache import species_cache
+
+
+def jsonl(records):
+    return '\n'.join(record if isinstance(record, str) else json.dumps(record) for record in records) + '\n'
+
+
+@pytest.fixture
+def auth_headers(app):
+    """En-tête Authorization d'un utilisateur connecté"""
+    user = User(email='catalogue@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    token = jwt.encode({'user_id': user.id, 'email': user.email,
+                        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       app.config['SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_import_endpoint_reports_row_errors_without_aborting(app, client, auth_headers):
+    """Test les lignes invalides ou en double sont rapportées, les autres importées"""
+    db.session.add(IndoorPlant(scientific_name='Ficus lyrata'))
+    db.session.commit()
+    body = jsonl([
+        {'scientific_name': 'Monstera deliciosa', 'common_names': ['Faux philodendron', ' faux  philodendron ', '']},
+        {'scientific_name': 'Ficus lyrata'},
+        '{pas du json',
+        {'common_names': 'Sans nom'},
+        {'scientific_name': 'Aloe vera', 'watering_frequency': 'souvent'},
+        {'scientific_name': 'Monstera  deliciosa'},
+        {'scientific_name': 'Aloe vera', 'watering_frequency': '21', 'air_purification': 'oui'},
+    ])
+
+    response = client.post('/indoor-plants/import', data=body, content_type='application/x-ndjson',
+                           headers=auth_headers)
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert (report['imported'], report['duplicates'], report['invalid']) == (2, 2, 3)
+    assert [(error['position'], error['reason']) for error in report['errors']] == [
+        (3, 'Enregistrement illisible'),
+        (4, 'scientific_name est obligatoire'),
+        (5, 'watering_frequency doit être un nombre de jours entier'),
+        (6, 'Espèce en double dans le fichier'),
+        (2, 'Espèce déjà présente dans le catalogue'),
+    ]
+    assert IndoorPlant.query.filter_by(scientific_name='Monstera deliciosa').one().common_names == 'Faux philodendron'
+    aloe = IndoorPlant.query.filter_by(scientific_name='Aloe vera').one()
+    assert aloe.watering_frequency == 21 and aloe.air_purification is True
+    # Index plein texte tenu à jour par ses triggers
+    assert [plant['scientific_name'] for plant in client.get('/indoor-plants/?search=philodendron').get_json()] == \
+        ['Monstera deliciosa']
+
+
+def test_import_endpoint_requires_token_and_bounds_the_body(app, client, auth_headers):
+    """Test l'import HTTP exige un token et refuse (413) un corps trop gros sans rien importer"""
+    body = jsonl([{'scientific_name': f'Species {index}'} for index in range(5)])
+    assert client.post('/indoor-plants/import', data=body, content_type='application/x-ndjson').status_code == 401
+
+    app.config['CATALOG_IMPORT_MAX_ROWS'] = 4
+    response = client.post('/indoor-plants/import', data=body, content_type='application/x-ndjson',
+                           headers=auth_headers)
+    assert response.status_code == 413
+    assert IndoorPlant.query.count() == 0
+
+    app.config['CATALOG_IMPORT_MAX_ROWS'] = 5
+    app.config['CATALOG_IMPORT_MAX_BYTES'] = len(body) - 1
+    response = client.post('/indoor-plants/import', data=body, content_type='application/x-ndjson',
+                           headers=auth_headers)
+    assert response.status_code == 413
+
+    app.config['CATALOG_IMPORT_MAX_BYTES'] = len(body) + 1
+    response = client.post('/indoor-plants/import', data=body, content_type='application/x-ndjson',
+                           headers=auth_headers)
+    assert response.status_code == 200
+    assert IndoorPlant.query.count() == 5
+
+
+def test_import_batches_dedupe_queries_and_commits(app):
+    """Test une requête de dédoublonnage par lot et des transactions périodiques"""
+    records = [(position, {'scientific_name': f'Species {position:04d}'}) for position in range(1, 1001)]
+    lookups = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT indoor_plants.scientific_name'.upper()):
+            lookups.append(statement)
+
+    version = species_cache.version()
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        stats = CatalogImporter(batch_size=100, commit_every=300).run(records)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert stats['imported'] == 1000
+    assert len(lookups) == 10
+    assert stats['commits'] == 4  # 300, 600, 900 puis le reste
+    assert IndoorPlant.query.count() == 1000
+    species_cache.expire()
+    assert species_cache.version() == version + 4
+
+    # Relancer l'import n'ajoute rien
+    assert CatalogImporter(batch_size=100).run(records)['duplicates'] == 1000
+
+
+def test_cli_imports_csv(app, tmp_path):
+    """Test la commande flask catalog import lit un CSV et écrit les rejets"""
+    path = tmp_path / 'catalogue.csv'
+    path.write_text(
+        'scientific_name,common_names,family,watering_frequency,air_purification\n'
+        'Calathea orbifolia,"Calathea; Prière | calathea",Marantaceae,5,false\n'
+        ',Anonyme,,,\n',
+        encoding='utf-8'
+    )
+    errors_path = tmp_path / 'rejets.jsonl'
+
+    result = app.test_cli_runner().invoke(args=['catalog', 'import', str(path), '--errors', str(errors_path)])
+
+    assert result.exit_code == 0, result.output
+    assert '1 espèces créées' in result.output
+    calathea = IndoorPlant.query.one()
+    assert calathea.common_names == 'Calathea, Prière'
+    assert calathea.family == 'Marantaceae'
+    assert json.loads(errors_path.read_text())['position'] == 2
+
+
+def test_normalize_common_names():
+    assert normalize_common_names('Pothos ;  Lierre du diable,pothos|') == 'Pothos, Lierre du diable'
+    assert normalize_common_names([]) is None
@@ -0,0 +1,94 @@
+import pytest
+from models.indoor_plant import IndoorPlant
+from app import db
+from services.catalog_pagination import catalog_pagination, encode_cursor, filters_fingerprint
+
+
+@pytest.fixture
+def catalog(app):
+    """Catalogue de 25 espèces, insérées dans le désordre"""
+    for index in reversed(range(25)):
+        db.session.add(IndoorPlant(scientific_name=f'Species {index:02d}', family='Araceae' if index % 2 else 'Moraceae'))
+    db.session.commit()
+
+
+def walk(client, url):
+    """Parcourt toutes les pages en suivant X-Next-Cursor"""
+    names, pages = [], 0
+    cursor = None
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        names += [plant['scientific_name'] for plant in response.get_json()]
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return names, pages
+
+
+def test_pages_follow_scientific_name_order(app, client, catalog):
+    """Test les pages couvrent tout le catalogue, dans l'ordre, sans doublon"""
+    names, pages = walk(client, '/indoor-plants/?limit=10')
+
+    assert names == [f'Species {index:02d}' for index in range(25)]
+    assert pages == 3
+
+
+def test_page_size_is_bounded_by_server(app, client, catalog):
+    """Test la taille par défaut et le plafond s'appliquent quel que soit le limit demandé"""
+    catalog_pagination.configure(page_size=5, max_page_size=8, count_ttl=60)
+
+    assert len(client.get('/indoor-plants/').get_json()) == 5
+    response = client.get('/indoor-plants/?limit=1000')
+    assert len(response.get_json()) == 8
+    assert 'rel="next"' in response.headers['Link']
+
+
+def test_cursor_is_bound_to_filters(app, client, catalog):
+    """Test un curseur est refusé avec d'autres filtres ou s'il est altéré"""
+    response = client.get('/indoor-plants/?family=Araceae&limit=5')
+    cursor = response.headers['X-Next-Cursor']
+
+    assert client.get(f'/indoor-plants/?family=Araceae&limit=5&cursor={cursor}').status_code == 200
+    assert client.get(f'/indoor-plants/?family=Moraceae&limit=5&cursor={cursor}').status_code == 400
+    assert client.get('/indoor-plants/?cursor=pas-un-curseur').status_code == 400
+
+    names, _ = walk(client, '/indoor-plants/?family=Araceae&limit=5')
+    assert names == [f'Species {index:02d}' for index in range(1, 25, 2)]
+
+
+def test_crafted_cursor_values_are_rejected(app, client, catalog):
+    """Test un curseur bien formé mais aux clés d'un type inattendu est refusé (400, pas 500)"""
+    fingerprint = filters_fingerprint({'search': None, 'difficulty': None, 'family': None})
+    valid = encode_cursor(['Species 04', 5], fingerprint)
+    assert client.get(f'/indoor-plants/?limit=5&cursor={valid}').status_code == 200
+
+    for values in ([{'a': 1}, 1], ['Species 04', '5'], ['Species 04', True], [['x'], 5], [None, 5]):
+        crafted = encode_cursor(values, fingerprint)
+        assert client.get(f'/indoor-plants/?limit=5&cursor={crafted}').status_code == 400
+
+
+def test_search_results_paginate_by_relevance(app, client):
+    """Test les résultats d'une recherche se parcourent page par page dans l'ordre de pertinence"""
+    for index in range(7):
+        db.session.add(IndoorPlant(scientific_name=f'Ficus {index}', common_names='Figuier'))
+    db.session.add(IndoorPlant(scientific_name='Ficus ficus', common_names='Figuier'))
+    db.session.commit()
+
+    names, pages = walk(client, '/indoor-plants/?search=ficus&limit=3')
+
+    assert pages == 3
+    assert len(names) == len(set(names)) == 8
+    assert names[0] == 'Ficus ficus'
+
+
+def test_total_count_is_optional_and_cached(app, client, catalog):
+    """Test X-Total-Count n'est calculé que sur demande, mis en cache et invalidé par les écritures"""
+    assert 'X-Total-Count' not in client.get('/indoor-plants/?limit=5').headers
+
+    assert client.get('/indoor-plants/?limit=5&count=true').headers['X-Total-Count'] == '25'
+    assert client.get('/indoor-plants/?limit=5&count=true').headers['X-Total-Count'] == '25'
+    assert catalog_pagination.stats()['count_hits'] == 1
+
+    client.post('/indoor-plants/', json={'scientific_name': 'Species 99'})
+    assert client.get('/indoor-plants/?limit=5&count=true').headers['X-Total-Count'] == '26'
@@ -0,0 +1,101 @@
+from sqlalchemy import text
+from models.indoor_plant import IndoorPlant
+from app import db
+from services.catalog_search import catalog_search
+
+
+def add_plants(*plants):
+    for scientific_name, common_names in plants:
+        db.session.add(IndoorPlant(scientific_name=scientific_name, common_names=common_names))
+    db.session.commit()
+
+
+def search(client, term):
+    response = client.get(f"/indoor-plants/?search={term}")
+    assert response.status_code == 200
+    return [plant["scientific_name"] for plant in response.get_json()]
+
+
+def test_search_uses_fts5_index(app):
+    """Test la base SQLite de test dispose de la table FTS5 et de ses triggers"""
+    assert catalog_search.stats()["fts5"] == 1
+    triggers = db.session.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'indoor_plants'"
+    )).scalars().all()
+    assert len(triggers) == 3
+
+
+def test_search_folds_accents_and_matches_prefixes(app, client):
+    """Test « fougere » trouve « Fougère » et un début de mot suffit"""
+    add_plants(
+        ("Nephrolepis exaltata", "Fougère de Boston"),
+        ("Monstera deliciosa", "Faux philodendron"),
+        ("Sansevieria trifasciata", "Langue de belle-mère"),
+    )
+
+    assert search(client, "fougere") == ["Nephrolepis exaltata"]
+    assert search(client, "Belle-Mère") == ["Sansevieria trifasciata"]
+    assert search(client, "monst") == ["Monstera deliciosa"]
+    assert search(client, "%22*)") == []
+
+
+def test_fragment_inside_a_word_falls_back_to_substring(app, client):
+    """Test « stera » trouve « Monstera » : aucun mot indexé ne correspond, recherche par sous-chaîne"""
+    add_plants(
+        ("Monstera deliciosa", "Faux philodendron"),
+        ("Ficus lyrata", "Figuier lyre"),
+    )
+    fallbacks = catalog_search.stats()["fallbacks"]
+
+    assert search(client, "stera") == ["Monstera deliciosa"]
+    assert search(client, "lodend") == ["Monstera deliciosa"]
+    assert catalog_search.stats()["fallbacks"] == fallbacks + 2
+
+
+def test_search_ranks_scientific_name_first(app, client):
+    """Test une correspondance sur le nom scientifique passe avant une mention dans les noms communs"""
+    add_plants(
+        ("Epipremnum aureum", "Pothos doré, Philodendron grimpant"),
+        ("Philodendron hederaceum", "Philodendron à feuilles de cœur"),
+    )
+
+    assert search(client, "philodendron") == ["Philodendron hederaceum", "Epipremnum aureum"]
+
+
+def test_index_follows_updates_and_deletes(app, client):
+    """Test les triggers tiennent l'index à jour, y compris pour les écritures hors API"""
+    add_plants(("Ficus elastica", "Caoutchouc"))
+    plant_id = IndoorPlant.query.one().id
+
+    client.put(f"/indoor-plants/{plant_id}", json={"common_names": "Arbre à caoutchouc, Figuier élastique"})
+    assert search(client, "elastique") == ["Ficus elastica"]
+
+    db.session.execute(text("UPDATE indoor_plants SET scientific_name = 'Ficus robusta'"))
+    db.session.commit()
+    assert search(client, "robusta") == ["Ficus robusta"]
+    assert search(client, "elastica") == []
+
+    client.delete(f"/indoor-plants/{plant_id}")
+    assert search(client, "caoutchouc") == []
+
+
+def test_index_is_rebuilt_only_when_stale(app, client):
+    """Test l'index n'est reconstruit qu'après recréation de la table des espèces, ou à la demande"""
+    add_plants(("Aloe vera", "Aloès"))
+    rebuilds = catalog_search.stats()["rebuilds"]
+
+    catalog_search.init_app(app)
+    assert catalog_search.stats()["rebuilds"] == rebuilds
+
+    # Table recréée : les triggers ont disparu avec elle, l'index FTS est périmé
+    IndoorPlant.__table__.drop(db.engine)
+    IndoorPlant.__table__.create(db.engine)
+    catalog_search.init_app(app)
+    assert catalog_search.stats()["rebuilds"] == rebuilds + 1
+    assert search(client, "aloe") == []
+    add_plants(("Aloe vera", "Aloès"))
+    assert search(client, "aloes") == ["Aloe vera"]
+
+    result = app.test_cli_runner().invoke(args=["catalog", "reindex"])
+    assert result.exit_code == 0, result.output
+    assert catalog_search.stats()["rebuilds"] == rebuilds + 2
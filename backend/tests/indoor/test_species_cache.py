@@ -0,0 +1,106 @@
+import datetime
+import jwt
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event, text
+from models.user import db, User
+from models.indoor_plant import IndoorPlant
+from models.user_plant import UserPlant
+from services.species_cache import species_cache
+from services.watering_algorithm import WateringAlgorithm
+
+
+@contextmanager
+def species_queries():
+    """Compte les requêtes SELECT qui lisent la table indoor_plants"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM indoor_plants' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def garden(app):
+    """Un utilisateur, trois espèces et cinq plantes ; retourne l'en-tête Authorization"""
+    user = User(email='jardin@example.com', password_hash='x')
+    species = [IndoorPlant(scientific_name=name, watering_frequency=days)
+               for name, days in [('Ficus lyrata', 7), ('Monstera deliciosa', 9), ('Aloe vera', 21)]]
+    db.session.add_all([user, *species])
+    db.session.commit()
+    for index in range(5):
+        db.session.add(UserPlant(user_id=user.id, species_id=species[index % 3].id, custom_name=f'Plante {index}'))
+    db.session.commit()
+    token = jwt.encode({'user_id': user.id, 'email': user.email,
+                        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       app.config['SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}, species
+
+
+def test_my_plants_reads_species_from_cache(app, client, garden):
+    """Test la liste des plantes ne relit pas le catalogue une fois l'espèce en cache"""
+    headers, species = garden
+
+    with species_queries() as statements:
+        response = client.get('/api/plants/my-plants', headers=headers)
+    assert response.status_code == 200
+    assert len(statements) == 1  # Une seule requête IN pour les trois espèces
+    assert {plant['species']['scientific_name'] for plant in response.json['plants']} == \
+        {'Ficus lyrata', 'Monstera deliciosa', 'Aloe vera'}
+
+    db.session.expire_all()
+    with species_queries() as statements:
+        assert client.get('/api/plants/my-plants', headers=headers).status_code == 200
+        plant = UserPlant.query.first()
+        assert WateringAlgorithm()._get_base_frequency(species_cache.get(plant.species_id)) in (7.0, 9.0, 21.0)
+    assert statements == []
+
+
+def test_catalog_write_changes_species_and_etag(app, client, garden):
+    """Test une modification du catalogue est visible aussitôt et change l'ETag de my-plants"""
+    headers, species = garden
+    response = client.get('/api/plants/my-plants', headers=headers)
+    etag = response.headers['ETag']
+
+    client.put(f'/indoor-plants/{species[0].id}', json={'common_names': 'Figuier lyre'})
+
+    response = client.get('/api/plants/my-plants', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    ficus = [plant for plant in response.json['plants'] if plant['species_id'] == species[0].id]
+    assert all(plant['species']['common_names'] == 'Figuier lyre' for plant in ficus)
+
+
+def test_other_worker_write_detected_by_version(app, garden):
+    """Test une écriture d'un autre worker (compteur incrémenté en base) vide le cache à la relecture"""
+    _, species = garden
+    species_cache.configure(100, 3600, 60)
+    assert species_cache.get(species[2].id).watering_frequency == 21
+
+    # Écriture d'un autre processus : ligne et compteur modifiés hors de ce cache
+    with db.engine.begin() as connection:
+        connection.execute(text('UPDATE indoor_plants SET watering_frequency = 14 WHERE id = :id'),
+                           {'id': species[2].id})
+        connection.execute(text("UPDATE catalog_versions SET version = version + 1 WHERE name = 'indoor_plants'"))
+    assert species_cache.get(species[2].id).watering_frequency == 21  # Version pas encore relue
+
+    species_cache.expire()
+    assert species_cache.get(species[2].id).watering_frequency == 14
+    assert species_cache.stats()['invalidations'] == 1
+
+
+def test_user_plant_creation_does_not_bump_version(app, garden):
+    """Test ajouter une plante utilisateur ne modifie pas la version du catalogue"""
+    _, species = garden
+    version = species_cache.version()
+    db.session.add(UserPlant(user_id=1, species=species[0], custom_name='Nouvelle'))
+    db.session.commit()
+
+    species_cache.expire()
+    assert species_cache.version() == version
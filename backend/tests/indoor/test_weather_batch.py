@@ -0,0 +1,102 @@
+import time
+import pytest
+from services.credential_cache import credential_cache
+from services.http_client import weather_http
+from services.weather_batch import QuotaLimiter, weather_batch
+from services.weather_providers import weather_observations, weather_providers
+from services.weather_service import WeatherService
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def stub_provider(stub_server):
+    server = stub_server(latency=LATENCY)
+    weather_providers.configure('openweathermap', base_url=server.base_url)
+    return server
+
+
+@pytest.fixture
+def fleet(weather_api_key):
+    """Un utilisateur avec clé et des plantes réparties sur douze cellules distinctes"""
+    user_id = weather_api_key.user_id
+    credential_cache.lookup(user_id, 'openweathermap')
+    weather_observations.configure(record=False, degraded_max_age=0)
+    return [(user_id, 40.0 + index, 2.0) for index in range(12)]
+
+
+def test_batch_fetches_cells_concurrently_under_cap(app, stub_provider, fleet):
+    """Test les cellules sont récupérées en parallèle, sans dépasser la concurrence demandée"""
+    weather_batch.configure(concurrency=4, timeout=5, per_minute=0)
+
+    started = time.monotonic()
+    results = WeatherService().get_weather_batch(fleet + [(fleet[0][0], None, None)])
+    elapsed = time.monotonic() - started
+
+    assert len(results) == 13
+    assert all(weather_data['temperature'] == 20 for weather_data in results.values())
+    assert stub_provider.max_in_flight <= 4
+    # 13 cellules par 4 : 4 vagues de latence, loin des 13 d'un parcours séquentiel
+    assert elapsed < LATENCY * 8
+    assert weather_batch.stats()['fetched'] == 13
+
+    # Les cellules désormais en cache ne sont pas redemandées
+    WeatherService().get_weather_batch(fleet)
+    assert weather_batch.stats()['cached'] == 12
+
+
+def test_slow_cells_time_out_individually(app, stub_provider, fleet):
+    """Test une cellule trop lente est rapportée absente sans bloquer le lot"""
+    stub_provider.latency = 1
+    weather_batch.configure(concurrency=12, timeout=0.2, per_minute=0)
+    weather_http.configure(12, 0.4, 0, 0, 100, 30)  # Les appels abandonnés échouent vite
+
+    started = time.monotonic()
+    results = WeatherService().get_weather_batch(fleet)
+
+    assert time.monotonic() - started < 0.8
+    assert all(weather_data is None for weather_data in results.values())
+    assert weather_batch.stats()['timeouts'] == 12
+    # Les appels abandonnés se terminent d'eux-mêmes, sans rien mettre en cache
+    for _ in range(100):
+        if weather_http.stats()['failures'] == 12:
+            break
+        time.sleep(0.02)
+    assert weather_http.stats()['failures'] == 12
+
+
+def test_quota_spaces_calls_beyond_burst():
+    """Test le quota laisse passer la rafale autorisée puis espace les appels"""
+    quota = QuotaLimiter(per_minute=120)
+    assert [quota.reserve() for _ in range(120)] == [0.0] * 120
+    assert quota.reserve() == pytest.approx(0.5, abs=0.05)
+    assert quota.reserve() == pytest.approx(1.0, abs=0.05)
+    assert QuotaLimiter(per_minute=0).reserve() == 0.0
+
+
+def test_batch_waits_for_quota(app, stub_provider, fleet):
+    """Test le lot attend le quota du fournisseur plutôt que de le dépasser"""
+    stub_provider.latency = 0
+    weather_batch.configure(concurrency=12, timeout=5, per_minute=600)
+    weather_batch.quota.tokens = 2  # Rafale presque épuisée : 10 appels à 10 par seconde
+
+    started = time.monotonic()
+    results = WeatherService().get_weather_batch(fleet)
+
+    assert all(weather_data is not None for weather_data in results.values())
+    assert time.monotonic() - started >= 0.9
+    assert weather_batch.stats()['quota_wait_seconds'] > 0
+
+
+def test_quota_counts_every_upstream_request(app, stub_server, fleet):
+    """Test chaque tentative vers le fournisseur consomme le quota, pas seulement chaque cellule"""
+    server = stub_server(status=503)
+    weather_providers.configure('openweathermap', base_url=server.base_url)
+    weather_http.configure(4, 1, 2, 0, 100, 30)  # Deux nouvelles tentatives, sans délai
+    weather_batch.configure(concurrency=4, timeout=5, per_minute=600)
+
+    results = WeatherService().get_weather_batch(fleet[:2])
+
+    assert all(weather_data is None for weather_data in results.values())
+    assert server.request_count == 6
+    assert 600 - weather_batch.quota.tokens == pytest.approx(6, abs=0.5)
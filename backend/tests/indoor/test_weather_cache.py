@@ -0,0 +1,115 @@
+import time
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+from models.user import db, User
+from models.api_key import ApiKey
+from services.weather_cache import weather_cache, geohash_encode, geohash_center
+from services.weather_service import WeatherService
+
+
+def owm_response(temperature):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        'main': {'temp': temperature, 'humidity': 55, 'pressure': 1012},
+        'weather': [{'main': 'Clear', 'description': 'ciel dégagé'}],
+    }
+    return response
+
+
+@pytest.fixture
+def weather_users(app):
+    """Crée deux utilisateurs voisins, chacun avec sa clé OpenWeatherMap"""
+    user_ids = []
+    for index, secret in enumerate(['a' * 32, 'b' * 32]):
+        user = User(email=f'voisin{index}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        key = ApiKey(user_id=user.id, service_name='openweathermap', key_name='Météo')
+        key.encrypt_key(secret)
+        db.session.add(key)
+        db.session.commit()
+        user_ids.append(user.id)
+    return user_ids
+
+
+def test_geohash_encode_and_center():
+    """Test l'encodage geohash de référence et le centre de cellule"""
+    assert geohash_encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geohash_encode(48.8566, 2.3522, 5) == geohash_encode(48.86, 2.35, 5)
+    latitude, longitude = geohash_center(geohash_encode(48.8566, 2.3522, 5))
+    assert abs(latitude - 48.8566) < 0.03 and abs(longitude - 2.3522) < 0.03
+
+
+def test_neighbours_share_one_provider_call(app, weather_users):
+    """Test deux utilisateurs d'une même cellule ne déclenchent qu'un appel"""
+    first, second = weather_users
+    with patch('requests.Session.get', return_value=owm_response(21)) as get:
+        assert WeatherService().get_weather_data(first, 48.8566, 2.3522)['temperature'] == 21
+        assert WeatherService().get_weather_data(second, 48.8570, 2.3530)['temperature'] == 21
+        # Une autre cellule déclenche son propre appel
+        WeatherService().get_weather_data(second, 45.7640, 4.8357)
+
+    assert get.call_count == 2
+    stats = weather_cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['size'] == 2
+
+
+def test_user_without_key_gets_no_shared_weather(app, weather_users):
+    """Test un utilisateur sans clé ne profite pas de la réponse d'un voisin"""
+    with patch('requests.Session.get', return_value=owm_response(21)):
+        WeatherService().get_weather_data(weather_users[0], 48.8566, 2.3522)
+    assert WeatherService().get_weather_data(999, 48.8566, 2.3522) is None
+
+
+def test_stale_entry_is_served_while_refreshing(app, weather_users):
+    """Test une entrée périmée est servie immédiatement et rafraîchie une seule fois en arrière-plan"""
+    weather_cache.configure(ttl=0.05, stale_ttl=60, max_size=100, precision=5)
+    release = threading.Event()
+
+    def slow_refresh(*args, **kwargs):
+        release.wait(2)
+        return owm_response(25)
+
+    with patch('requests.Session.get', return_value=owm_response(21)):
+        WeatherService().get_weather_data(weather_users[0], 48.8566, 2.3522)
+    time.sleep(0.1)
+
+    with patch('requests.Session.get', side_effect=slow_refresh) as get:
+        started = time.monotonic()
+        for user_id in weather_users * 3:
+            assert WeatherService().get_weather_data(user_id, 48.8566, 2.3522)['temperature'] == 21
+        assert time.monotonic() - started < 0.5
+        release.set()
+        for _ in range(100):
+            if weather_cache.stats()['refreshes']:
+                break
+            time.sleep(0.02)
+
+    assert get.call_count == 1
+    assert WeatherService().get_weather_data(weather_users[0], 48.8566, 2.3522)['temperature'] == 25
+    stats = weather_cache.stats()
+    assert stats['stale_hits'] == 6
+    assert stats['refresh_failures'] == 0
+
+
+def test_failed_fetch_is_not_cached(app, weather_users):
+    """Test une erreur du fournisseur n'est pas mémorisée"""
+    import requests
+    with patch('requests.Session.get', side_effect=requests.exceptions.ConnectionError()):
+        assert WeatherService().get_weather_data(weather_users[0], 48.8566, 2.3522) is None
+    with patch('requests.Session.get', return_value=owm_response(19)):
+        assert WeatherService().get_weather_data(weather_users[0], 48.8566, 2.3522)['temperature'] == 19
+
+
+def test_metrics_expose_hit_ratio_and_age(client, app, weather_users):
+    """Test le taux de succès et l'âge des entrées sont exposés sur /metrics"""
+    with patch('requests.Session.get', return_value=owm_response(21)):
+        WeatherService().get_weather_data(weather_users[0], 48.8566, 2.3522)
+        WeatherService().get_weather_data(weather_users[1], 48.8566, 2.3522)
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'bloomzy_weather_cache_hit_ratio 0.5' in metrics
+    assert 'bloomzy_weather_cache_max_age_seconds' in metrics
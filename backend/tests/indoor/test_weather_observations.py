@@ -0,0 +1,102 @@
+import pytest
+import requests
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from models.user import db
+from models.weather_observation import WeatherObservation
+from services.weather_cache import weather_cache
+from services.weather_providers import weather_observations, weather_providers
+from services.weather_service import WeatherService
+
+PARIS = (48.8566, 2.3522)
+
+
+def owm_response(temperature):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        'main': {'temp': temperature, 'humidity': 55, 'pressure': 1012},
+        'weather': [{'main': 'Clear', 'description': 'ciel dégagé'}],
+        'wind': {'speed': 3.5},
+    }
+    return response
+
+
+@pytest.fixture
+def user_id(weather_api_key):
+    """Utilisateur disposant d'une clé OpenWeatherMap active"""
+    return weather_api_key.user_id
+
+
+def test_fetched_weather_is_recorded_per_cell(app, user_id):
+    """Test chaque réponse du fournisseur est enregistrée avec sa cellule"""
+    with patch('requests.Session.get', return_value=owm_response(22.5)):
+        WeatherService().get_weather_data(user_id, *PARIS)
+
+    observation = WeatherObservation.query.one()
+    assert observation.cell == weather_cache.cell_for(*PARIS)
+    assert observation.temperature == 22.5
+    assert observation.wind_speed == 3.5
+    assert weather_observations.stats()['recorded'] == 1
+
+
+def test_replay_serves_recorded_data_without_network_or_key(app, user_id):
+    """Test le fournisseur de rejeu sert les observations enregistrées, à la date demandée"""
+    cell = weather_cache.cell_for(*PARIS)
+    morning = datetime(2030, 6, 3, 9, 0)
+    for hours, temperature in [(0, 18), (3, 24)]:
+        db.session.add(WeatherObservation(cell=cell, observed_at=morning + timedelta(hours=hours),
+                                          temperature=temperature, humidity=60))
+    db.session.commit()
+
+    weather_providers.configure('replay', replay_at=morning + timedelta(hours=1))
+    with patch('requests.Session.get') as get:
+        replayed = WeatherService().get_weather_data(999, *PARIS)
+    get.assert_not_called()
+    assert replayed['temperature'] == 18
+    assert 'degraded' not in replayed
+
+    weather_cache.configure(600, 3600, 100, 5)
+    weather_providers.configure('replay')
+    assert WeatherService().get_weather_data(999, *PARIS)['temperature'] == 24
+    # Le rejeu n'enregistre pas de nouvelles observations
+    assert WeatherObservation.query.count() == 2
+
+
+def test_degraded_mode_serves_latest_observation(app, user_id):
+    """Test fournisseur en panne : la dernière observation récente est servie, marquée dégradée"""
+    with patch('requests.Session.get', return_value=owm_response(26)):
+        WeatherService().get_weather_data(user_id, *PARIS)
+    weather_cache.configure(600, 3600, 100, 5)
+
+    with patch('requests.Session.get', side_effect=requests.exceptions.ConnectionError()):
+        weather_data = WeatherService().get_weather_data(user_id, *PARIS)
+    assert weather_data['temperature'] == 26
+    assert weather_data['degraded'] is True
+    assert weather_observations.stats()['degraded_served'] == 1
+
+    # Observation trop ancienne : facteur neutre
+    WeatherObservation.query.update({'observed_at': datetime.utcnow() - timedelta(days=1)})
+    db.session.commit()
+    with patch('requests.Session.get', side_effect=requests.exceptions.ConnectionError()):
+        assert WeatherService().get_weather_data(user_id, *PARIS) is None
+
+
+def test_unknown_provider_is_rejected():
+    """Test un fournisseur inconnu est refusé à la configuration"""
+    with pytest.raises(ValueError):
+        weather_providers.configure('meteo-magique')
+
+
+def test_purge_command_removes_old_observations(app):
+    """Test la commande de purge supprime les observations au-delà de la durée de conservation"""
+    db.session.add_all([
+        WeatherObservation(cell='u09tv', observed_at=datetime.utcnow() - timedelta(days=40), temperature=10, humidity=80),
+        WeatherObservation(cell='u09tv', observed_at=datetime.utcnow(), temperature=20, humidity=50),
+    ])
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['weather', 'purge'])
+
+    assert result.exit_code == 0
+    assert '1 observations' in result.output
+    assert WeatherObservation.query.count() == 1
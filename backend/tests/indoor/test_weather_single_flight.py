@@ -0,0 +1,75 @@
+import time
+import threading
+from services.credential_cache import credential_cache
+from services.single_flight import SingleFlight
+from services.weather_cache import weather_cache
+from services.weather_providers import weather_providers
+from services.weather_service import WeatherService
+from tests.stub_provider import owm_body
+
+CALLERS = 12
+UPSTREAM_DELAY = 0.3
+
+
+def test_concurrent_callers_share_one_upstream_request(app, stub_server, weather_api_key):
+    """Test N appels concurrents pour une même cellule ne font qu'une requête au fournisseur"""
+    server = stub_server(latency=UPSTREAM_DELAY, body=owm_body(18, humidity=70, pressure=1015,
+                                                               main='Clouds', description='nuageux'))
+    user_id = weather_api_key.user_id
+    credential_cache.lookup(user_id, 'openweathermap')  # Les threads lisent la clé en cache
+
+    weather_providers.configure('openweathermap', base_url=server.base_url)
+    service = WeatherService()
+    barrier = threading.Barrier(CALLERS)
+    results = []
+
+    def caller(index):
+        with app.app_context():
+            barrier.wait()
+            results.append(service.get_weather_data(user_id, 48.8566 + index * 1e-4, 2.3522))
+
+    threads = [threading.Thread(target=caller, args=(index,)) for index in range(CALLERS)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    elapsed = time.monotonic() - started
+
+    assert server.request_count == 1
+    assert len(results) == CALLERS
+    assert all(result['temperature'] == 18 for result in results)
+    assert elapsed < UPSTREAM_DELAY * 3
+    stats = weather_cache.stats()
+    assert stats['fetches'] == 1
+    assert stats['coalesced'] + stats['hits'] == CALLERS - 1
+
+
+def test_errors_are_shared_and_not_remembered():
+    """Test l'exception de l'appel en cours est propagée aux appelants en attente, pas au suivant"""
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(2)
+        raise RuntimeError('fournisseur en panne')
+
+    def caller():
+        try:
+            flight.do('u09tv', failing)
+        except RuntimeError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.in_flight() == 0 or flight.shared < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert len(errors) == 3
+    assert flight.executed == 1
+    assert flight.do('u09tv', lambda: 'ok') == 'ok'
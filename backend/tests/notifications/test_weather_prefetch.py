@@ -0,0 +1,129 @@
+"""
+Tests du préchauffage météo avant les vagues de notifications d'arrosage.
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from models.user import db, User
+from models.api_key import ApiKey
+from models.indoor_plant import IndoorPlant
+from models.user_plant import UserPlant
+from models.watering_history import WateringHistory
+from models.notification import NotificationPreferences, NotificationType
+from services.credential_cache import credential_cache
+from services.notification_service import NotificationService
+from services.weather_prefetch import weather_prefetcher
+
+WAVE_AT = datetime(2030, 6, 3, 9, 0)
+
+
+def owm_response(temperature):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        'main': {'temp': temperature, 'humidity': 55, 'pressure': 1012},
+        'weather': [{'main': 'Clear', 'description': 'ciel dégagé'}],
+    }
+    return response
+
+
+@pytest.fixture
+def gardeners(app):
+    """Trois utilisateurs : deux à 9 h (dont un sans clé), un à 18 h (vague de 10 h)"""
+    species = IndoorPlant(scientific_name='Monstera deliciosa', common_names='Monstera', watering_frequency=7)
+    db.session.add(species)
+    users = []
+    for index, preferred_hour in enumerate([None, 9, 18]):
+        user = User(email=f'jardinier{index}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        if index != 1:
+            key = ApiKey(user_id=user.id, service_name='openweathermap', key_name='Météo')
+            key.encrypt_key(chr(ord('a') + index) * 32)
+            db.session.add(key)
+        if preferred_hour is not None:
+            db.session.add(NotificationPreferences(user_id=str(user.id), notification_type=NotificationType.WATERING,
+                                                   preferred_hour=preferred_hour))
+        db.session.add(UserPlant(user_id=user.id, species_id=species.id, custom_name=f'Plante {index}'))
+        users.append(user)
+    # Plante arrosée hier : pas encore à arroser
+    watered = UserPlant(user_id=users[0].id, species_id=species.id, custom_name='Arrosée')
+    db.session.add(watered)
+    db.session.commit()
+    db.session.add(WateringHistory(plant_id=watered.id, watered_at=WAVE_AT - timedelta(days=1)))
+    db.session.commit()
+    for user in users:
+        credential_cache.lookup(user.id, 'openweathermap')
+    return users
+
+
+def test_plan_wave_groups_due_plants_by_cell(app, gardeners):
+    """Test seules les plantes à arroser des utilisateurs de la vague sont retenues, une cellule par lieu"""
+    cells = weather_prefetcher.plan_wave(9, WAVE_AT)
+
+    assert len(cells) == 1
+    candidates = next(iter(cells.values()))
+    assert sorted(user_id for user_id, _, _ in candidates) == [gardeners[0].id, gardeners[1].id]
+    assert list(weather_prefetcher.plan_wave(10, WAVE_AT).values())[0][0][0] == gardeners[2].id
+
+
+def test_plan_wave_reads_only_the_wave_users(app, gardeners):
+    """Test seules les plantes des utilisateurs de la vague sont lues ; une vague vide ne charge rien"""
+    early = User(email='matinal@example.com', password_hash='x')
+    db.session.add(early)
+    db.session.commit()
+    db.session.add(NotificationPreferences(user_id=str(early.id), notification_type=NotificationType.WATERING,
+                                           preferred_hour=7))
+    db.session.add(UserPlant(user_id=early.id, species_id=gardeners[0].plants[0].species_id, custom_name='Matin'))
+    db.session.commit()
+    loaded = []
+
+    with patch('services.weather_prefetch.plant_coordinates', side_effect=lambda plant: loaded.append(plant.user_id)
+               or (48.8566, 2.3522)):
+        assert [user_id for user_id, _, _ in next(iter(weather_prefetcher.plan_wave(7, WAVE_AT).values()))] == [early.id]
+        assert weather_prefetcher.plan_wave(8, WAVE_AT) == {}
+        assert weather_prefetcher.plan_wave(14, WAVE_AT) == {}
+    assert loaded == [early.id]
+
+
+def test_prefetch_warms_cache_and_generation_never_calls_provider(app, gardeners):
+    """Test la génération après préchauffage lit le cache sans appel réseau"""
+    with patch('requests.Session.get', return_value=owm_response(30)) as get:
+        report = weather_prefetcher.prefetch(9, WAVE_AT)
+    assert get.call_count == 1
+    assert report['cells'] == 1
+    assert report['warmed'] == 1
+    assert report['coverage'] == 1.0
+
+    plant = UserPlant.query.filter_by(user_id=gardeners[0].id, custom_name='Plante 0').first()
+    with patch('requests.Session.get') as get:
+        notification = NotificationService().create_watering_notification(plant, 8)
+    get.assert_not_called()
+    assert 'Température élevée' in notification.content
+    assert notification.content.count('Votre Monstera') == 1
+
+    wave = weather_prefetcher.current_wave()
+    assert wave['lookups'] == 1
+    assert wave['hit_rate'] == 1.0
+
+
+def test_unwarmed_cell_degrades_without_blocking(app, gardeners):
+    """Test sans préchauffage, la notification part sans contexte météo ni appel réseau"""
+    plant = UserPlant.query.filter_by(user_id=gardeners[2].id).first()
+    with patch('requests.Session.get') as get:
+        notification = NotificationService().create_watering_notification(plant, 8)
+    get.assert_not_called()
+    assert 'Température' not in notification.content
+
+
+def test_run_due_wave_prefetches_once_within_lead(app, gardeners):
+    """Test la vague est préchauffée une seule fois, dans la fenêtre d'avance"""
+    weather_prefetcher.configure(workers=2, lead_minutes=15)
+    with patch('requests.Session.get', return_value=owm_response(21)) as get:
+        assert weather_prefetcher.run_due_wave(WAVE_AT - timedelta(minutes=30)) is None
+        report = weather_prefetcher.run_due_wave(WAVE_AT - timedelta(minutes=10))
+        assert weather_prefetcher.run_due_wave(WAVE_AT - timedelta(minutes=5)) is None
+
+    assert report['hour'] == 9
+    assert report['coverage'] == 1.0
+    assert get.call_count == 1
+    assert weather_prefetcher.stats()['last_wave_coverage'] == 1.0
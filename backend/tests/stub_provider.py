@@ -0,0 +1,88 @@
+"""
+Fournisseur HTTP factice pour les tests et les benchmarks (sondes de clés, météo).
+
+Un seul serveur threadé configurable : latence injectée, statut et corps JSON,
+surcharges par chemin, requêtes reçues et requêtes simultanées comptées. Les
+tests l'obtiennent par la fixture ``stub_server`` de ``conftest.py`` ; les
+benchmarks, qui ne chargent pas ``conftest.py``, l'importent directement.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+def owm_body(temperature: float, humidity: int = 60, pressure: int = 1013,
+             main: str = 'Clear', description: str = 'ciel dégagé') -> Dict:
+    """Réponse OpenWeatherMap minimale (météo actuelle)."""
+    return {
+        'main': {'temp': temperature, 'humidity': humidity, 'pressure': pressure},
+        'weather': [{'main': main, 'description': description}],
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Répond ``server.body`` avec ``server.status`` après ``server.latency`` secondes (ou selon le chemin)."""
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        status, latency = server.routes.get(url.path, (server.status, server.latency))
+        with server.lock:
+            server.requests.append((url.path, dict(self.headers), parse_qs(url.query)))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(latency)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+        body = json.dumps(server.body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Serveur factice local ; ``routes`` associe un chemin à ``(statut, latence)``."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0, status: int = 200, body: Optional[Dict] = None,
+                 routes: Optional[Dict[str, Tuple[int, float]]] = None):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.latency = latency
+        self.status = status
+        self.body = owm_body(20) if body is None else body
+        self.routes = routes or {}
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    @property
+    def request_count(self) -> int:
+        with self.lock:
+            return len(self.requests)
+
+    def start(self) -> 'StubServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        pass  # Le client a abandonné une requête trop lente
@@ -0,0 +1,111 @@
+import pytest
+import jwt
+import datetime
+from models.user import db, User
+from models.indoor_plant import IndoorPlant
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Crée un utilisateur et retourne l'en-tête Authorization"""
+    user = User(
+        email='etag@example.com',
+        password_hash=generate_password_hash('password123', method='pbkdf2:sha256'),
+        username='etaguser'
+    )
+    db.session.add(user)
+    db.session.commit()
+    payload = {
+        'user_id': user.id,
+        'email': user.email,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }
+    token = jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def species_id(app):
+    species = IndoorPlant(scientific_name='Ficus benjamina', watering_frequency='Weekly')
+    db.session.add(species)
+    db.session.commit()
+    return species.id
+
+
+def test_profile_revalidation_returns_304(client, auth_headers):
+    """Test un If-None-Match identique renvoie 304 sans corps"""
+    response = client.get('/auth/profile', headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Last-Modified' in response.headers
+
+    response = client.get('/auth/profile', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_profile_update_changes_etag(client, auth_headers):
+    """Test une mise à jour du profil invalide le validateur"""
+    etag = client.get('/auth/profile', headers=auth_headers).headers['ETag']
+    assert client.put('/auth/profile', headers=auth_headers, json={'bio': 'Nouvelle bio'}).status_code == 200
+
+    response = client.get('/auth/profile', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['bio'] == 'Nouvelle bio'
+    assert response.headers['ETag'] != etag
+
+
+def test_my_plants_etag_follows_collection(client, auth_headers, species_id):
+    """Test l'ETag de la collection change à la création puis à la suppression"""
+    empty_etag = client.get('/api/plants/my-plants', headers=auth_headers).headers['ETag']
+    assert client.get('/api/plants/my-plants',
+                      headers={**auth_headers, 'If-None-Match': empty_etag}).status_code == 304
+
+    created = client.post('/api/plants/my-plants', headers=auth_headers,
+                          json={'species_id': species_id, 'custom_name': 'Ficus'})
+    assert created.status_code == 201
+    response = client.get('/api/plants/my-plants', headers={**auth_headers, 'If-None-Match': empty_etag})
+    assert response.status_code == 200
+    assert response.json['total'] == 1
+    full_etag = response.headers['ETag']
+
+    assert client.delete(f"/api/plants/my-plants/{created.json['id']}", headers=auth_headers).status_code == 200
+    response = client.get('/api/plants/my-plants', headers={**auth_headers, 'If-None-Match': full_etag})
+    assert response.status_code == 200
+    assert response.json['total'] == 0
+
+
+def test_my_plants_etag_follows_species(client, auth_headers, species_id):
+    """Test une modification de l'espèce incluse dans la réponse change l'ETag de la collection"""
+    client.post('/api/plants/my-plants', headers=auth_headers, json={'species_id': species_id, 'custom_name': 'Ficus'})
+    etag = client.get('/api/plants/my-plants', headers=auth_headers).headers['ETag']
+
+    assert client.put(f'/indoor-plants/{species_id}', json={'common_names': 'Figuier pleureur'}).status_code == 200
+    response = client.get('/api/plants/my-plants', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['plants'][0]['species']['common_names'] == 'Figuier pleureur'
+
+
+def test_query_parameters_have_distinct_etags(client, auth_headers):
+    """Test chaque filtre ou page possède son propre validateur"""
+    first = client.get('/api/notifications?limit=10', headers=auth_headers)
+    second = client.get('/api/notifications?limit=20', headers=auth_headers)
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.headers['ETag'] != second.headers['ETag']
+    assert client.get('/api/notifications?limit=10',
+                      headers={**auth_headers, 'If-None-Match': first.headers['ETag']}).status_code == 304
+
+
+def test_preferences_etag_accounts_for_default_creation(client, auth_headers):
+    """Test la création des préférences par défaut produit un ETag stable ensuite"""
+    response = client.get('/api/notifications/preferences', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json['preferences']) > 0
+
+    response = client.get('/api/notifications/preferences',
+                          headers={**auth_headers, 'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
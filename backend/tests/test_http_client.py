@@ -0,0 +1,74 @@
+import time
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from services.http_client import HttpClient, CircuitOpenError, weather_http
+from services.weather_service import WeatherService
+
+
+def status_response(status_code):
+    response = MagicMock(status_code=status_code)
+    response.raise_for_status.side_effect = (
+        requests.exceptions.HTTPError(str(status_code)) if status_code >= 400 else None
+    )
+    return response
+
+
+def test_transient_errors_are_retried():
+    """Test une erreur réseau puis un 503 sont retentés jusqu'au succès"""
+    client = HttpClient(retries=2, backoff=0.01)
+    side_effects = [requests.exceptions.ConnectionError(), status_response(503), status_response(200)]
+    with patch('requests.Session.get', side_effect=side_effects) as get:
+        assert client.get('http://meteo.test').status_code == 200
+
+    assert get.call_count == 3
+    assert client.stats()['retries'] == 2
+    assert client.stats()['failures'] == 0
+
+
+def test_client_errors_are_not_retried_and_keep_circuit_closed():
+    """Test un 401 est renvoyé sans nouvelle tentative ni ouverture du disjoncteur"""
+    client = HttpClient(retries=2, backoff=0.01, failure_threshold=1)
+    with patch('requests.Session.get', return_value=status_response(401)) as get:
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get('http://meteo.test')
+
+    assert get.call_count == 1
+    assert client.stats()['circuit_open'] == 0
+
+
+def test_circuit_opens_then_allows_one_trial_call():
+    """Test le disjoncteur court-circuite les appels puis se referme après un essai réussi"""
+    client = HttpClient(retries=0, failure_threshold=2, reset_timeout=0.1)
+    with patch('requests.Session.get', side_effect=requests.exceptions.Timeout()) as get:
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.Timeout):
+                client.get('http://meteo.test')
+        with pytest.raises(CircuitOpenError):
+            client.get('http://meteo.test')
+    assert get.call_count == 2
+    assert client.stats()['circuit_open'] == 1
+    assert client.stats()['short_circuits'] == 1
+
+    time.sleep(0.15)
+    with patch('requests.Session.get', return_value=status_response(200)):
+        assert client.get('http://meteo.test').status_code == 200
+    assert client.stats()['circuit_open'] == 0
+    assert client.stats()['circuit_trips'] == 1
+
+
+def test_open_circuit_gives_neutral_weather_factor_without_waiting(app, weather_api_key):
+    """Test disjoncteur ouvert : facteur météo neutre sans appel au fournisseur"""
+    user_id = weather_api_key.user_id
+    weather_http.configure(10, 5, 0, 0, 1, 60)
+
+    service = WeatherService()
+    with patch('requests.Session.get', side_effect=requests.exceptions.Timeout()):
+        assert service.get_weather_data(user_id, 48.8566, 2.3522) is None
+
+    with patch('requests.Session.get') as get:
+        started = time.monotonic()
+        weather_data = service.get_weather_data(user_id, 45.7640, 4.8357)
+        assert time.monotonic() - started < 0.1
+    get.assert_not_called()
+    assert service.calculate_weather_factor(weather_data) == 1.0
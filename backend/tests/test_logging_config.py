@@ -0,0 +1,91 @@
+import json
+import logging
+from services.logging_config import JsonFormatter, SamplingFilter, NonBlockingQueueHandler
+
+
+def make_record(name='app', level=logging.INFO, **extra):
+    record = logging.makeLogRecord({'name': name, 'levelno': level, 'levelname': logging.getLevelName(level),
+                                    'msg': 'message %s', 'args': ('test',)})
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_includes_correlation_id_and_extras():
+    """Test le format JSON contient l'identifiant de corrélation et les champs additionnels"""
+    record = make_record(request_id='abc123', method='GET', path='/health', plant_id=7)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['message'] == 'message test'
+    assert entry['request_id'] == 'abc123'
+    assert entry['path'] == '/health'
+    assert entry['plant_id'] == 7
+
+
+def test_sampling_only_drops_info_of_sampled_loggers():
+    """Test l'échantillonnage ne touche que les logs INFO des loggers à fort volume"""
+    sampling = SamplingFilter(rate=0.0, loggers=['werkzeug'])
+    assert sampling.filter(make_record('werkzeug')) is False
+    assert sampling.filter(make_record('werkzeug', logging.WARNING)) is True
+    assert sampling.filter(make_record('routes.auth')) is True
+    assert sampling.dropped == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """Test une file pleine abandonne l'enregistrement sans bloquer la requête"""
+    import queue
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.enqueue(make_record())
+    handler.enqueue(make_record())
+    assert handler.dropped == 1
+
+
+def test_exception_survives_the_queue():
+    """Test la trace d'une exception journalisée traverse la file jusqu'au champ JSON exception"""
+    import io
+    import logging.handlers
+    import queue
+    log_queue = queue.Queue()
+    output = io.StringIO()
+    stream = logging.StreamHandler(output)
+    stream.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream)
+    logger = logging.getLogger('tests.queue_exception')
+    logger.propagate = False
+    logger.addHandler(NonBlockingQueueHandler(log_queue))
+    listener.start()
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception('échec %s', 'calcul')
+    finally:
+        listener.stop()
+        logger.handlers.clear()
+        logger.propagate = True
+    entry = json.loads(output.getvalue())
+    assert entry['message'] == 'échec calcul'
+    assert 'ZeroDivisionError' in entry['exception']
+    assert 'Traceback' in entry['exception']
+
+
+def test_request_id_is_generated_and_echoed(client):
+    """Test chaque réponse porte un identifiant de corrélation, repris de la requête s'il est fourni"""
+    response = client.get('/health')
+    assert len(response.headers['X-Request-ID']) == 32
+    response = client.get('/health', headers={'X-Request-ID': 'client-id-1'})
+    assert response.headers['X-Request-ID'] == 'client-id-1'
+
+
+def test_signup_dump_is_gated_and_redacted(client, app, caplog):
+    """Test le dump de la requête signup n'a lieu que sous drapeau, mot de passe masqué"""
+    with caplog.at_level(logging.INFO, logger='routes.auth'):
+        client.post('/auth/signup', json={'email': 'a@example.com', 'password': 'Password123!'})
+    assert not [r for r in caplog.records if hasattr(r, 'body')]
+
+    app.config['LOG_REQUEST_BODIES'] = True
+    with caplog.at_level(logging.INFO, logger='routes.auth'):
+        client.post('/auth/signup', json={'email': 'b@example.com', 'password': 'Password123!'})
+    dumps = [r for r in caplog.records if hasattr(r, 'body')]
+    assert len(dumps) == 1
+    assert dumps[0].body['password'] == '***'
+    assert dumps[0].body['email'] == 'b@example.com'
@@ -0,0 +1,33 @@
+from services.metrics import scrape_allowed
+
+
+def test_metrics_served_to_local_scrapers_only(client):
+    """Test sans jeton configuré, /metrics ne répond qu'aux requêtes locales"""
+    assert client.get('/metrics').status_code == 200
+    response = client.get('/metrics', environ_overrides={'REMOTE_ADDR': '203.0.113.7'})
+    assert response.status_code == 401
+    assert 'bloomzy_' not in response.get_data(as_text=True)
+
+
+def test_metrics_token_is_required_when_configured(client, app):
+    """Test avec METRICS_TOKEN, seul le jeton porteur attendu donne accès, même en local"""
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'},
+                          environ_overrides={'REMOTE_ADDR': '203.0.113.7'})
+    assert response.status_code == 200
+    assert 'bloomzy_' in response.get_data(as_text=True)
+
+
+def test_metrics_can_be_disabled(client, app):
+    """Test METRICS_ENABLED=false retire la route"""
+    app.config['METRICS_ENABLED'] = False
+    assert client.get('/metrics').status_code == 404
+
+
+def test_scrape_allowed_rejects_malformed_addresses():
+    """Test une adresse illisible n'est jamais considérée comme locale"""
+    assert scrape_allowed(None, '::1', None) is True
+    assert scrape_allowed(None, 'unix-socket', None) is False
+    assert scrape_allowed(None, None, None) is False
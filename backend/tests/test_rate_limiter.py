@@ -0,0 +1,124 @@
+import pytest
+import time
+import jwt
+import datetime
+from app import create_app
+from services.rate_limiter import MemoryBucketStore, RateLimiter, SQLiteBucketStore, rate_limiter
+
+
+@pytest.fixture
+def limited_app(app):
+    """Active la limitation avec un petit seau en mémoire"""
+    app.config['RATELIMIT_ENABLED'] = True
+    rate_limiter.configure('memory', capacity=20, rate=0.001)
+    return app
+
+
+def test_rate_limit_headers_on_success(client, limited_app):
+    """Test les en-têtes standards de limitation sont émis"""
+    response = client.get('/indoor-plants/')
+    assert response.status_code == 200
+    assert response.headers['RateLimit-Limit'] == '20'
+    assert int(response.headers['RateLimit-Remaining']) == 19
+
+
+def test_login_is_weighted_and_limited(client, limited_app):
+    """Test les connexions coûteuses épuisent le seau plus vite que le catalogue"""
+    rate_limiter.configure('memory', capacity=21, rate=0.001)
+    credentials = {'email': 'nobody@example.com', 'password': 'Password123!'}
+    assert client.post('/auth/login', json=credentials).status_code == 401
+    assert client.post('/auth/login', json=credentials).status_code == 401
+
+    response = client.post('/auth/login', json=credentials)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+    # Le dernier jeton restant suffit encore pour des lectures bon marché du catalogue
+    assert client.get('/indoor-plants/').status_code == 200
+
+
+def test_test_all_costs_one_probe_per_supported_service():
+    """Test tester toutes les clés coûte autant que tester chaque clé une à une"""
+    from routes.api_keys import SUPPORTED_SERVICES
+    single = RateLimiter.cost_for('api_keys.test_api_key')
+    assert RateLimiter.cost_for('api_keys.test_all_api_keys') >= single * len(SUPPORTED_SERVICES)
+
+
+def test_buckets_are_keyed_by_user(client, limited_app):
+    """Test un utilisateur authentifié a son propre seau, distinct de l'adresse IP"""
+    payload = {'user_id': 42, 'email': 'u@example.com',
+               'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)}
+    token = jwt.encode(payload, limited_app.config['SECRET_KEY'], algorithm='HS256')
+    for _ in range(2):
+        client.post('/auth/login', json={'email': 'x@example.com', 'password': 'Password123!'})
+
+    response = client.get('/auth/protected', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert int(response.headers['RateLimit-Remaining']) == 19
+
+
+def test_health_and_metrics_are_exempt(client, limited_app):
+    """Test les routes d'infrastructure ne sont pas limitées"""
+    rate_limiter.configure('memory', capacity=1, rate=0.001)
+    for _ in range(5):
+        assert client.get('/health').status_code == 200
+        assert client.get('/metrics').status_code == 200
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    """Test deux workers partageant le fichier SQLite consomment le même seau"""
+    path = str(tmp_path / 'ratelimit.db')
+    worker_a = SQLiteBucketStore(path)
+    worker_b = SQLiteBucketStore(path)
+    now = time.time()
+    assert worker_a.consume('ip:1.2.3.4', 6, 10, 0.001, now) == (True, 4)
+    allowed, tokens = worker_b.consume('ip:1.2.3.4', 6, 10, 0.001, now)
+    assert allowed is False
+    assert tokens == pytest.approx(4)
+
+
+def test_bucket_refills_over_time():
+    """Test le seau se recharge au débit configuré"""
+    limiter = RateLimiter()
+    limiter.configure('memory', capacity=10, rate=1)
+    store = limiter.store
+    assert store.consume('k', 10, 10, 1, 1000.0) == (True, 0)
+    assert store.consume('k', 1, 10, 1, 1000.5)[0] is False
+    assert store.consume('k', 1, 10, 1, 1002.0)[0] is True
+
+
+def test_memory_store_evicts_idle_and_least_recent_buckets():
+    """Test le stockage en mémoire reste borné : seaux inactifs purgés, les moins récents oubliés"""
+    store = MemoryBucketStore(max_buckets=3)
+    store.PURGE_EVERY = 5
+    for index in range(4):
+        store.consume(f'ip:10.0.0.{index}', 1, 10, 1, 1000.0)
+    assert len(store) == 3
+
+    # 10 s plus tard, les seaux de 1000 s sont pleins : la purge les retire
+    store.consume('ip:10.0.0.9', 1, 10, 1, 1011.0)
+    assert len(store) == 1
+
+
+def test_client_address_resolved_behind_trusted_proxy(app, monkeypatch):
+    """Test derrière un proxy de confiance, chaque client anonyme a son propre seau"""
+    monkeypatch.setenv('TRUSTED_PROXY_COUNT', '1')
+    proxied = create_app()
+    proxied.config['RATELIMIT_ENABLED'] = True
+    rate_limiter.configure('memory', capacity=0.5, rate=0.001)  # Une lecture du catalogue par client
+    client = proxied.test_client()
+
+    assert client.get('/indoor-plants/', headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 200
+    assert client.get('/indoor-plants/', headers={'X-Forwarded-For': '203.0.113.2'}).status_code == 200
+    assert client.get('/indoor-plants/', headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+
+
+def test_key_function_is_configurable(app, client, monkeypatch):
+    """Test la fonction de clé (``init_app(app, key_func=...)``) remplace l'identification par défaut"""
+    monkeypatch.setattr(rate_limiter, 'key_func', lambda: 'tenant:bloomzy')
+    app.config['RATELIMIT_ENABLED'] = True
+    rate_limiter.configure('memory', capacity=0.5, rate=0.001)
+
+    assert client.get('/indoor-plants/').status_code == 200
+    assert client.get('/indoor-plants/', headers={'Authorization': 'Bearer autre'}).status_code == 429
+    assert len(rate_limiter.store) == 1
@@ -20,10 +20,32 @@ apiClient.interceptors.request.use((config) => {
 })
 
 // Indoor Plants API (Catalogue des espèces)
-export const fetchIndoorPlants = async (search?: string): Promise<any[]> => {
-  const params = search ? { search } : {}
+// Le catalogue est paginé par curseur : une page par appel, la suivante est désignée par X-Next-Cursor
+export interface IndoorPlantsPage {
+  items: any[]
+  nextCursor: string | null
+  // Nombre total de résultats, seulement si la page a été demandée avec count
+  total: number | null
+}
+
+export const fetchIndoorPlants = async (
+  search?: string,
+  cursor?: string | null,
+  limit?: number,
+  count = false
+): Promise<IndoorPlantsPage> => {
+  const params: Record<string, string | number> = {}
+  if (search) params.search = search
+  if (cursor) params.cursor = cursor
+  if (limit) params.limit = limit
+  if (count) params.count = 'true'
   const res = await apiClient.get<any[]>('/indoor-plants/', { params })
-  return res.data
+  const total = res.headers?.['x-total-count']
+  return {
+    items: res.data,
+    nextCursor: res.headers?.['x-next-cursor'] ?? null,
+    total: total !== undefined ? Number(total) : null
+  }
 }
 
 export const createIndoorPlant = async (payload: Record<string, any>): Promise<any> => {
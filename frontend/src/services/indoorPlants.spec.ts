@@ -4,7 +4,10 @@ import { fetchIndoorPlants, createIndoorPlant, updateIndoorPlant, deleteIndoorPl
 vi.mock('axios', () => ({
   default: {
     create: () => ({
-      get: vi.fn().mockResolvedValue({ data: [{ id: 1, name: 'Ficus' }] }),
+      get: vi.fn().mockResolvedValue({
+        data: [{ id: 1, name: 'Ficus' }],
+        headers: { 'x-next-cursor': 'page-2', 'x-total-count': '42' }
+      }),
       post: vi.fn().mockResolvedValue({ data: { id: 2, name: 'Monstera' } }),
       put: vi.fn().mockResolvedValue({ data: { id: 1, name: 'Ficus modifié' } }),
       delete: vi.fn().mockResolvedValue({}),
@@ -28,14 +31,16 @@ describe('deleteIndoorPlant', () => {
 })
 
 describe('fetchIndoorPlants', () => {
-  it('retourne la liste des plantes', async () => {
+  it('retourne une page et le curseur de la suivante', async () => {
     const res = await fetchIndoorPlants()
-    expect(Array.isArray(res)).toBe(true)
-    expect(res[0].name).toBe('Ficus')
+    expect(Array.isArray(res.items)).toBe(true)
+    expect(res.items[0].name).toBe('Ficus')
+    expect(res.nextCursor).toBe('page-2')
+    expect(res.total).toBe(42)
   })
-  it('accepte un paramètre de recherche', async () => {
-    const res = await fetchIndoorPlants('ficus')
-    expect(res[0].name).toBe('Ficus')
+  it('accepte un paramètre de recherche et un curseur', async () => {
+    const res = await fetchIndoorPlants('ficus', 'page-2')
+    expect(res.items[0].name).toBe('Ficus')
   })
 })
 
@@ -8,7 +8,11 @@ vi.mock('../services/api', () => {
     updated_at: ''
   }
   return {
-    fetchIndoorPlants: vi.fn().mockResolvedValue([mockPlant]),
+    fetchIndoorPlants: vi.fn().mockImplementation((_search, cursor) => Promise.resolve(
+      cursor
+        ? { items: [{ ...mockPlant, id: 2 }], nextCursor: null, total: null }
+        : { items: [mockPlant], nextCursor: 'page-2', total: 2 }
+    )),
     createIndoorPlant: vi.fn().mockResolvedValue(mockPlant),
     updateIndoorPlant: vi.fn().mockImplementation((_id, payload) => Promise.resolve({ ...mockPlant, ...payload })),
     deleteIndoorPlant: vi.fn().mockResolvedValue(undefined)
@@ -23,6 +27,7 @@ const mockPlant = {
 }
 import { setActivePinia, createPinia } from 'pinia'
 import { useIndoorPlantsStore } from './indoorPlants'
+import { fetchIndoorPlants } from '../services/api'
 
 describe('IndoorPlants Pinia Store', () => {
   beforeEach(() => {
@@ -32,7 +37,20 @@ describe('IndoorPlants Pinia Store', () => {
   it('fetches plants and updates state', async () => {
     const store = useIndoorPlantsStore()
     await store.fetchPlants()
+    expect(fetchIndoorPlants).toHaveBeenLastCalledWith(undefined, null, undefined, true)
     expect(store.plants).toEqual([mockPlant])
+    expect(store.total).toBe(2)
+    expect(store.hasMore).toBe(true)
+  })
+
+  it('loadMore ajoute la page suivante', async () => {
+    const store = useIndoorPlantsStore()
+    await store.fetchPlants({ search: ' monstera ' })
+    expect(fetchIndoorPlants).toHaveBeenLastCalledWith('monstera', null, undefined, true)
+    await store.loadMore()
+    expect(fetchIndoorPlants).toHaveBeenLastCalledWith('monstera', 'page-2')
+    expect(store.plants.map((p) => p.id)).toEqual([1, 2])
+    expect(store.hasMore).toBe(false)
   })
 
   it('addPlant ajoute une plante', async () => {
@@ -2,41 +2,72 @@ import { defineStore } from 'pinia'
 import { fetchIndoorPlants, createIndoorPlant, updateIndoorPlant, deleteIndoorPlant } from '../services/api'
 import type { IndoorPlant } from '../types'
 
+const toIndoorPlant = (p: any): IndoorPlant => ({
+  id: p.id,
+  scientific_name: p.scientific_name,
+  common_names: p.common_names,
+  family: p.family,
+  difficulty: p.difficulty,
+  origin: p.origin,
+  watering_frequency: p.watering_frequency,
+  light: p.light,
+  humidity: p.humidity,
+  temperature: p.temperature,
+  soil_type: p.soil_type,
+  adult_size: p.adult_size,
+  growth_rate: p.growth_rate,
+  toxicity: p.toxicity,
+  air_purification: p.air_purification,
+  flowering: p.flowering
+})
 
 export const useIndoorPlantsStore = defineStore('indoorPlants', {
   state: () => ({
     plants: [] as IndoorPlant[],
     loading: false,
+    loadingMore: false,
+    search: undefined as string | undefined,
+    nextCursor: null as string | null,
+    total: null as number | null,
     error: null as string | null
   }),
+  getters: {
+    hasMore: (state) => state.nextCursor !== null
+  },
   actions: {
-    async fetchPlants(search?: string) {
+    // Première page du catalogue (recherche côté serveur) et total ; les suivantes sont chargées par loadMore
+    async fetchPlants({ search }: { search?: string } = {}) {
+      const requested = search?.trim() || undefined
+      this.search = requested
       this.loading = true
       try {
-        const backendPlants = await fetchIndoorPlants(search)
-        this.plants = backendPlants.map((p: any) => ({
-          id: p.id,
-          scientific_name: p.scientific_name,
-          common_names: p.common_names,
-          family: p.family,
-          difficulty: p.difficulty,
-          origin: p.origin,
-          watering_frequency: p.watering_frequency,
-          light: p.light,
-          humidity: p.humidity,
-          temperature: p.temperature,
-          soil_type: p.soil_type,
-          adult_size: p.adult_size,
-          growth_rate: p.growth_rate,
-          toxicity: p.toxicity,
-          air_purification: p.air_purification,
-          flowering: p.flowering
-        }))
+        const page = await fetchIndoorPlants(requested, null, undefined, true)
+        // Réponse d'une recherche déjà remplacée par une plus récente
+        if (this.search !== requested) return
+        this.plants = page.items.map(toIndoorPlant)
+        this.nextCursor = page.nextCursor
+        this.total = page.total
+        this.error = null
+      } catch (e: any) {
+        if (this.search === requested) this.error = e.message
+      } finally {
+        if (this.search === requested) this.loading = false
+      }
+    },
+    async loadMore() {
+      if (!this.nextCursor || this.loadingMore) return
+      const search = this.search
+      this.loadingMore = true
+      try {
+        const page = await fetchIndoorPlants(search, this.nextCursor)
+        if (this.search !== search) return
+        this.plants.push(...page.items.map(toIndoorPlant))
+        this.nextCursor = page.nextCursor
         this.error = null
       } catch (e: any) {
         this.error = e.message
       } finally {
-        this.loading = false
+        this.loadingMore = false
       }
     },
     async addPlant(payload: Omit<IndoorPlant, 'id' | 'created_at' | 'updated_at'>) {
@@ -63,6 +94,7 @@ export const useIndoorPlantsStore = defineStore('indoorPlants', {
           flowering: backendPlant.flowering
         }
         this.plants.unshift(plant)
+        if (this.total !== null) this.total += 1
         this.error = null
       } catch (e: any) {
         this.error = e.message
@@ -88,6 +120,7 @@ export const useIndoorPlantsStore = defineStore('indoorPlants', {
       try {
         await deleteIndoorPlant(id)
         this.plants = this.plants.filter((p) => p.id !== id)
+        if (this.total !== null) this.total -= 1
         this.error = null
       } catch (e: any) {
         this.error = e.message
@@ -56,4 +56,41 @@ describe('IndoorPlants.vue', () => {
       difficulty: ''
     })
   })
+
+  it('envoie la recherche au serveur après la frappe', async () => {
+    vi.useFakeTimers()
+    const pinia = createTestingPinia()
+    const store = useIndoorPlantsStore()
+    const wrapper = mount(IndoorPlants, { global: { plugins: [pinia] } })
+    await wrapper.find('.search-input').setValue('mons')
+    await wrapper.find('.search-input').setValue('monstera')
+    vi.advanceTimersByTime(300)
+    expect(store.fetchPlants).toHaveBeenCalledTimes(2)
+    expect(store.fetchPlants).toHaveBeenLastCalledWith({ search: 'monstera' })
+    vi.useRealTimers()
+  })
+
+  it('affiche le total du catalogue et le bouton de chargement même sans résultat sur les pages chargées', async () => {
+    const pinia = createTestingPinia({
+      initialState: {
+        indoorPlants: {
+          plants: [
+            { id: 1, scientific_name: 'Ficus lyrata', common_names: 'Ficus', family: 'Moraceae', difficulty: 'Facile' }
+          ],
+          total: 120,
+          nextCursor: 'page-2',
+          loading: false,
+          error: null
+        }
+      }
+    })
+    const wrapper = mount(IndoorPlants, { global: { plugins: [pinia] } })
+    expect(wrapper.text()).toContain('120 espèce(s) dans le catalogue')
+    expect(wrapper.find('.load-more').exists()).toBe(true)
+    // Aucune plante fleurie parmi les lignes chargées : le bouton reste proposé
+    const flowering = wrapper.findAll('.filter-btn').find((button) => button.text().includes('Fleuries'))
+    await flowering!.trigger('click')
+    expect(wrapper.find('.plants-catalog').exists()).toBe(false)
+    expect(wrapper.find('.load-more').exists()).toBe(true)
+  })
 })
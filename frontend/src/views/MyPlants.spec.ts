@@ -1,8 +1,9 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest'
-import { mount } from '@vue/test-utils'
+import { mount, flushPromises } from '@vue/test-utils'
 import { createTestingPinia } from '@pinia/testing'
 import MyPlants from '@/views/MyPlants.vue'
 import { useMyPlantsStore } from '@/stores/myPlants'
+import { fetchIndoorPlants } from '@/services/api'
 
 // Mock du composant BaseForm
 vi.mock('@/components/BaseForm.vue', () => ({
@@ -15,9 +16,11 @@ vi.mock('@/components/BaseForm.vue', () => ({
 
 // Mock des API
 vi.mock('@/services/api', () => ({
-  fetchIndoorPlants: vi.fn().mockResolvedValue([
-    { id: 1, scientific_name: 'Ficus benjamina', common_names: 'Ficus pleureur' }
-  ])
+  fetchIndoorPlants: vi.fn().mockResolvedValue({
+    items: [{ id: 1, scientific_name: 'Ficus benjamina', common_names: 'Ficus pleureur' }],
+    nextCursor: null,
+    total: null
+  })
 }))
 
 const mockUserPlant = {
@@ -114,6 +117,19 @@ describe('MyPlants.vue', () => {
     expect(wrapper.find('[data-testid="base-form"]').exists()).toBe(true)
   })
 
+  it('propose toutes les pages du catalogue comme espèces', async () => {
+    await flushPromises() // Chargement du composant monté dans beforeEach
+    vi.mocked(fetchIndoorPlants)
+      .mockResolvedValueOnce({ items: [{ id: 1, scientific_name: 'Ficus benjamina', common_names: 'Ficus' }], nextCursor: 'page-2', total: null })
+      .mockResolvedValueOnce({ items: [{ id: 2, scientific_name: 'Monstera deliciosa', common_names: 'Monstera' }], nextCursor: null, total: null })
+    const other = mount(MyPlants, {
+      global: { plugins: [createTestingPinia({ createSpy: vi.fn })], stubs: { 'router-link': true } }
+    })
+    await flushPromises()
+    expect(fetchIndoorPlants).toHaveBeenLastCalledWith(undefined, 'page-2', 200)
+    expect(other.vm.speciesOptions.map((o: any) => o.value)).toEqual(['1', '2'])
+  })
+
   it('appelle fetchPlants au montage', async () => {
     // Le composant est déjà monté dans beforeEach
     await wrapper.vm.$nextTick()